@@ -15,20 +15,33 @@ Basically a sigil from Kimja's Blender Fast To Unity
 """
 from . import utils
 from . import preprocess
+from . import worker
+from . import writer
 from . import properties
 from . import ui_panel
 
-from .blender2game import ExportOperator, auto_export_gltf
+from .blender2game import ExportOperator, auto_export_gltf, live_link_update
 
 modules = [
   utils,
-  preprocess
+  preprocess,
+  worker,
+  writer
 ]
 
 classes = (
     properties.ExportMessage,
+    properties.ExportGroup,
+    properties.SplitRule,
     properties.SectionToggles,
     properties.ExportSettings,
+    ui_panel.KIMJAFASU_UL_export_groups,
+    ui_panel.KIMJAFASU_OT_add_export_group,
+    ui_panel.KIMJAFASU_OT_remove_export_group,
+    ui_panel.KIMJAFASU_UL_split_rules,
+    ui_panel.KIMJAFASU_OT_add_split_rule,
+    ui_panel.KIMJAFASU_OT_remove_split_rule,
+    ui_panel.KIMJAFASU_UL_log,
     ui_panel.Blender2UnityPanel,
     ExportOperator,
 )
@@ -47,6 +60,10 @@ def register():
     
     # Add new handler
     bpy.app.handlers.save_post.append(auto_export_gltf)
+    
+    # Live link listens to every edit, it returns right away unless it's turned on
+    bpy.app.handlers.depsgraph_update_post[:] = [h for h in bpy.app.handlers.depsgraph_update_post if h.__name__ != "live_link_update"]
+    bpy.app.handlers.depsgraph_update_post.append(live_link_update)
 
 def unregister():
     for mod in reversed(modules):
@@ -59,6 +76,8 @@ def unregister():
     
     if auto_export_gltf in bpy.app.handlers.save_post:
       bpy.app.handlers.save_post.remove(auto_export_gltf)
+    
+    bpy.app.handlers.depsgraph_update_post[:] = [h for h in bpy.app.handlers.depsgraph_update_post if h.__name__ != "live_link_update"]
 
 
 """ chatty explains
@@ -0,0 +1,215 @@
+"""
+Export pipeline benchmark, runs in a headless Blender:
+
+    blender --background --factory-startup --python benchmarks/bench_export.py -- \\
+        --objects 10,100,1000,5000 --verts 100,2000 --vertex-group-fraction 0.25 --output results.json
+
+For every combination of object count and vertices per object a synthetic scene is generated
+(grid meshes, a fraction of them with a "Vertex" group so the splitter has work to do), saved to a temp
+.blend and exported with export_gltf in three scenarios:
+
+- full:      forced export, what a Manual Export costs
+- unchanged: nothing changed since the last export, what a no-op Ctrl+S costs
+- one_moved: a single object moved, the common "tweak and save" case
+
+Results (end to end and per phase, min and median over --repeat runs) are written as json,
+compare two of those with benchmarks/compare_results.py.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import importlib
+import statistics
+import tempfile
+
+import bpy
+import numpy as np
+
+SCENARIOS = ("full", "unchanged", "one_moved")
+
+def _parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark the blender-2-game-engine-4-goblins export pipeline")
+    parser.add_argument("--objects", default="10,100,1000", help="Comma separated object counts")
+    parser.add_argument("--verts", default="100,2000", help="Comma separated vertex counts per object")
+    parser.add_argument("--vertex-group-fraction", type=float, default=0.25, help="Fraction of objects with a 'Vertex' group")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario, min and median are reported")
+    parser.add_argument("--format", default='GLB', choices=('GLB', 'GLTF_SEPARATE'))
+    parser.add_argument("--direct-writer", action="store_true", help="Export through the direct writer instead of the stock exporter")
+    parser.add_argument("--addon-module", help="Module name of the installed add-on, imported from this checkout if not set")
+    parser.add_argument("--output", help="Results json, printed to stdout if not set")
+    parser.add_argument("--keep-files", action="store_true", help="Don't delete the generated .blend and exports")
+    return parser.parse_args(argv)
+
+def _int_list(text):
+    return [int(value) for value in text.split(",") if value.strip()]
+
+def _import_addon(module_name):
+    if module_name:
+        return importlib.import_module(module_name)
+    addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.path.dirname(addon_dir))
+    return importlib.import_module(os.path.basename(addon_dir))
+
+def _clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+    for material in list(bpy.data.materials):
+        bpy.data.materials.remove(material)
+
+def _grid_arrays(verts_per_object):
+    """Quad grid with roughly verts_per_object vertices, as flat arrays ready for foreach_set"""
+    n = max(2, int(round(verts_per_object ** 0.5)))
+    xs, ys = np.meshgrid(np.linspace(-1.0, 1.0, n), np.linspace(-1.0, 1.0, n))
+    # a bit of noise, so meshes aren't trivially compressible
+    zs = np.random.default_rng(n).random(n * n) * 0.05
+    co = np.column_stack((xs.ravel(), ys.ravel(), zs)).astype(np.float32)
+
+    cell = np.arange((n - 1) * (n - 1))
+    v0 = (cell // (n - 1)) * n + cell % (n - 1)
+    quads = np.column_stack((v0, v0 + 1, v0 + n + 1, v0 + n)).astype(np.int32)
+    return n, co, quads
+
+def _new_grid_mesh(name, n, co, quads):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set("vertex_index", quads.ravel())
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, quads.size, 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    mesh.validate()
+    return mesh
+
+def kimjafasu_build_synthetic_scene(object_count, verts_per_object, vertex_group_fraction):
+    _clear_scene()
+    scene = bpy.context.scene
+    n, co, quads = _grid_arrays(verts_per_object)
+    material = bpy.data.materials.new("BenchMaterial")
+
+    grouped = int(round(object_count * vertex_group_fraction))
+    side = max(1, int(np.ceil(object_count ** 0.5)))
+    # Bottom rows of the grid go into the "Vertex" group
+    group_indices = list(range(0, n * max(1, n // 3)))
+
+    for index in range(object_count):
+        mesh = _new_grid_mesh(f"BenchMesh{index}", n, co, quads)
+        mesh.materials.append(material)
+        obj = bpy.data.objects.new(f"Bench{index}", mesh)
+        obj.location = (index % side * 2.5, index // side * 2.5, 0.0)
+        scene.collection.objects.link(obj)
+        if index < grouped:
+            obj.vertex_groups.new(name="Vertex").add(group_indices, 1.0, 'REPLACE')
+    return n * n
+
+def _configure(settings, export_dir, export_format, use_direct_writer=False):
+    settings.export_dir = export_dir
+    settings.export_format = export_format
+    settings.export_target = 'Everything'
+    settings.use_simple_mode = True
+    settings.use_project_name = True
+    settings.auto_export_on_save = False
+    settings.skip_unchanged = True
+    settings.use_background_worker = False
+    settings.use_direct_writer = use_direct_writer
+
+def _run(addon, settings, force):
+    addon.utils.kimjafasu_clear_log(settings)
+    addon.blender2game.export_gltf(bpy.context, settings, force=force)
+    timer = addon.utils.kimjafasu_get_timing_history()[-1]
+    for msg in addon.utils.kimjafasu_log_lines(settings):
+        if msg.level == 'ERROR':
+            raise RuntimeError(msg.text)
+    return timer
+
+def _summarize(timers):
+    totals = [t.total for t in timers]
+    phases = {}
+    for timer in timers:
+        for name, seconds in timer.phase_totals().items():
+            phases.setdefault(name, []).append(seconds)
+    return {
+        "total": {"min": min(totals), "median": statistics.median(totals)},
+        "phases": {name: {"min": min(values), "median": statistics.median(values)} for name, values in phases.items()},
+        "files_written": timers[-1].files_written,
+    }
+
+def kimjafasu_benchmark_case(addon, work_dir, object_count, verts_per_object, vertex_group_fraction, repeat, export_format, use_direct_writer=False):
+    real_verts = kimjafasu_build_synthetic_scene(object_count, verts_per_object, vertex_group_fraction)
+    blend_path = os.path.join(work_dir, f"bench_{object_count}_{verts_per_object}.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path)
+
+    settings = bpy.context.scene.gltf_export_settings
+    export_dir = os.path.join(work_dir, f"export_{object_count}_{verts_per_object}")
+    _configure(settings, export_dir, export_format, use_direct_writer)
+
+    runs = {scenario: [] for scenario in SCENARIOS}
+    moved = bpy.data.objects[0]
+    for _ in range(repeat):
+        runs["full"].append(_run(addon, settings, force=True))
+        runs["unchanged"].append(_run(addon, settings, force=False))
+        moved.location.z += 0.01
+        bpy.context.view_layer.update()
+        runs["one_moved"].append(_run(addon, settings, force=False))
+
+    case_id = f"objects={object_count},verts={verts_per_object},vgroup={vertex_group_fraction}"
+    return [
+        {
+            "id": f"{case_id},scenario={scenario}",
+            "objects": object_count,
+            "verts_per_object": real_verts,
+            "vertex_group_fraction": vertex_group_fraction,
+            "scenario": scenario,
+            **_summarize(timers),
+        }
+        for scenario, timers in runs.items()
+    ]
+
+def main():
+    args = _parse_args()
+    addon = _import_addon(args.addon_module)
+    if not hasattr(bpy.types.Scene, "gltf_export_settings"):
+        addon.register()
+
+    work_dir = tempfile.mkdtemp(prefix="kimjafasu-bench-")
+    results = {
+        "meta": {
+            "blender": bpy.app.version_string,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "format": args.format,
+            "direct_writer": args.direct_writer,
+        },
+        "cases": [],
+    }
+
+    try:
+        for object_count in _int_list(args.objects):
+            for verts_per_object in _int_list(args.verts):
+                print(f"⏱️  Benchmarking {object_count} objects x {verts_per_object} verts")
+                results["cases"].extend(kimjafasu_benchmark_case(
+                    addon, work_dir, object_count, verts_per_object,
+                    args.vertex_group_fraction, args.repeat, args.format, args.direct_writer))
+    finally:
+        if not args.keep_files:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(results, indent=1)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+        print(f"⏱️  Results written to {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares two results files of bench_export.py, plain python, no Blender needed:
+
+    python benchmarks/compare_results.py baseline.json candidate.json --threshold 0.10
+
+A case (or one of its phases) regressed when its median got slower by more than --threshold
+(relative) and more than --min-seconds (absolute, so tiny phases don't flap).
+Exits with 1 when anything regressed, so it can gate a CI job.
+"""
+import sys
+import json
+import argparse
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two export benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="Ignore absolute differences below this")
+    return parser.parse_args(argv)
+
+def _load_cases(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return {case["id"]: case for case in json.load(file)["cases"]}
+
+def _is_regression(old, new, threshold, min_seconds):
+    return new - old > min_seconds and new > old * (1.0 + threshold)
+
+def kimjafasu_compare(baseline, candidate, threshold, min_seconds):
+    """Returns (rows, regressions), rows being (id, what, old, new) for everything measured in both"""
+    rows = []
+    regressions = []
+    for case_id, new_case in candidate.items():
+        old_case = baseline.get(case_id)
+        if old_case is None:
+            continue
+
+        measured = [("total", old_case["total"]["median"], new_case["total"]["median"])]
+        for phase, new_phase in new_case["phases"].items():
+            old_phase = old_case["phases"].get(phase)
+            if old_phase:
+                measured.append((phase, old_phase["median"], new_phase["median"]))
+
+        for what, old, new in measured:
+            rows.append((case_id, what, old, new))
+            if _is_regression(old, new, threshold, min_seconds):
+                regressions.append((case_id, what, old, new))
+    return rows, regressions
+
+def main(argv=None):
+    args = _parse_args(argv)
+    baseline = _load_cases(args.baseline)
+    candidate = _load_cases(args.candidate)
+    rows, regressions = kimjafasu_compare(baseline, candidate, args.threshold, args.min_seconds)
+
+    for case_id, what, old, new in rows:
+        change = (new - old) / old * 100 if old else 0.0
+        marker = "🔥" if (case_id, what, old, new) in regressions else "  "
+        print(f"{marker} {case_id:<60} {what:<20} {old:9.4f}s -> {new:9.4f}s ({change:+6.1f}%)")
+
+    missing = sorted(set(baseline) - set(candidate))
+    for case_id in missing:
+        print(f"⚠️  {case_id} is missing from {args.candidate}")
+
+    if regressions:
+        print(f"\n🔥 {len(regressions)} regression(s) over {args.threshold:.0%}")
+        return 1
+    print("\n🕊️  No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Checks the direct writer against the stock glTF exporter, runs in a headless Blender:
+
+    blender --background --factory-startup --python benchmarks/validate_direct_writer.py -- --objects 50 --verts 400
+
+--optimize turns on Optimize Meshes for the direct writer, reordering must not change any of the above.
+
+Builds a synthetic scene (the one from bench_export.py plus rotated/scaled/parented objects, node materials,
+several material slots, uvs, vertex colors and concave/folded quads), exports it once through each path,
+imports both files back and compares what came out per object: triangle count, world space bounds,
+surface area and materials.
+Exits with 1 on any mismatch.
+"""
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bench_export
+
+TOLERANCE = 1e-4
+
+def _parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Compare the direct writer output with the stock glTF exporter")
+    parser.add_argument("--objects", type=int, default=50)
+    parser.add_argument("--verts", type=int, default=400)
+    parser.add_argument("--vertex-group-fraction", type=float, default=0.25)
+    parser.add_argument("--format", default='GLB', choices=('GLB', 'GLTF_SEPARATE'))
+    parser.add_argument("--engine", default='Unity', choices=('Unity', 'Unreal'))
+    parser.add_argument("--optimize", action="store_true", help="Direct writer with Optimize Meshes, the reordered output has to match too")
+    parser.add_argument("--addon-module", help="Module name of the installed add-on, imported from this checkout if not set")
+    return parser.parse_args(argv)
+
+def _add_variety():
+    """Everything the plain benchmark scene doesn't have but the direct writer supports"""
+    objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+
+    principled = bpy.data.materials.new("BenchPrincipled")
+    principled.use_nodes = True
+    node = principled.node_tree.nodes.get("Principled BSDF")
+    node.inputs["Base Color"].default_value = (0.2, 0.4, 0.8, 1.0)
+    node.inputs["Metallic"].default_value = 0.7
+    node.inputs["Roughness"].default_value = 0.3
+
+    for index, obj in enumerate(objects):
+        if index % 3 == 0:
+            obj.rotation_euler = (0.3 * index, 0.1, 0.7)
+            obj.scale = (1.0, 2.0, 0.5)
+        if index % 4 == 1:
+            # Second slot on half of the faces
+            obj.data.materials.append(principled)
+            material_indices = np.zeros(len(obj.data.polygons), dtype=np.int32)
+            material_indices[::2] = 1
+            obj.data.polygons.foreach_set("material_index", material_indices)
+        if index % 5 == 2:
+            obj.data.uv_layers.new(name="UVMap")
+            obj.data.color_attributes.new("Col", 'FLOAT_COLOR', 'POINT')
+        if index % 9 == 4:
+            # Pushed diagonally into the next cell and up, the quads around it are concave and folded,
+            # they only come out right when split along the same diagonal Blender uses
+            n = int(round(len(obj.data.vertices) ** 0.5))
+            vertex = obj.data.vertices[(n // 2) * n + n // 2]
+            cell = 2.0 / (n - 1)
+            vertex.co.x += 0.8 * cell
+            vertex.co.y += 0.8 * cell
+            vertex.co.z += 0.5 * cell
+        if index % 7 == 3 and index > 0:
+            obj.parent = objects[index - 1]
+        if index % 7 == 5 and index + 1 < len(objects):
+            # Parent sorts after the child, the child gets written first
+            obj.parent = objects[index + 1]
+    bpy.context.view_layer.update()
+
+def _export(addon, settings, path, use_direct_writer):
+    settings.use_direct_writer = use_direct_writer
+    settings.simple_export_filename = os.path.splitext(os.path.basename(path))[0]
+    settings.use_project_name = False
+    addon.utils.kimjafasu_clear_log(settings)
+    addon.blender2game.export_gltf(bpy.context, settings, force=True)
+    for msg in addon.utils.kimjafasu_log_lines(settings):
+        print(f"   [{msg.level}] {msg.text}")
+        if msg.level == 'ERROR':
+            raise RuntimeError(msg.text)
+
+def _summarize_import(path):
+    bench_export._clear_scene()
+    bpy.ops.import_scene.gltf(filepath=path)
+    summary = {}
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.data
+        mesh.calc_loop_triangles()
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        co = co.reshape(-1, 3)
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        world = co @ matrix[:3, :3].T + matrix[:3, 3]
+        area = np.empty(len(mesh.loop_triangles), dtype=np.float32)
+        mesh.loop_triangles.foreach_get("area", area)
+        summary[obj.name] = {
+            "triangles": len(mesh.loop_triangles),
+            "vertices": len(mesh.vertices),
+            "min": world.min(axis=0) if len(world) else np.zeros(3),
+            "max": world.max(axis=0) if len(world) else np.zeros(3),
+            "area": float(area.sum()),
+            "materials": sorted(slot.material.name for slot in obj.material_slots if slot.material),
+        }
+    return summary
+
+def _compare(stock, direct, labels=("stock exporter", "direct writer")):
+    problems = []
+    for name in sorted(set(stock) | set(direct)):
+        if name not in direct:
+            problems.append(f"{name}: missing from the {labels[1]} output")
+            continue
+        if name not in stock:
+            problems.append(f"{name}: only in the {labels[1]} output")
+            continue
+        a, b = stock[name], direct[name]
+        if a["triangles"] != b["triangles"]:
+            problems.append(f"{name}: {a['triangles']} triangles vs {b['triangles']}")
+        if not (np.allclose(a["min"], b["min"], atol=TOLERANCE) and np.allclose(a["max"], b["max"], atol=TOLERANCE)):
+            problems.append(f"{name}: bounds {a['min']}..{a['max']} vs {b['min']}..{b['max']}")
+        if abs(a["area"] - b["area"]) > TOLERANCE * max(1.0, a["area"]):
+            problems.append(f"{name}: surface area {a['area']} vs {b['area']}")
+        if a["materials"] != b["materials"]:
+            problems.append(f"{name}: materials {a['materials']} vs {b['materials']}")
+        if a["vertices"] != b["vertices"]:
+            # Welding may differ slightly, worth a look but not wrong
+            print(f"⚠️  {name}: {a['vertices']} vertices vs {b['vertices']}")
+    return problems
+
+def main():
+    args = _parse_args()
+    addon = bench_export._import_addon(args.addon_module)
+    if not hasattr(bpy.types.Scene, "gltf_export_settings"):
+        addon.register()
+
+    work_dir = tempfile.mkdtemp(prefix="kimjafasu-validate-")
+    try:
+        bench_export.kimjafasu_build_synthetic_scene(args.objects, args.verts, args.vertex_group_fraction)
+        _add_variety()
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.join(work_dir, "validate.blend"))
+
+        settings = bpy.context.scene.gltf_export_settings
+        bench_export._configure(settings, work_dir, args.format)
+        settings.engine = args.engine
+        extension = ".glb" if args.format == 'GLB' else ".gltf"
+        stock_path = os.path.join(work_dir, "stock" + extension)
+        direct_path = os.path.join(work_dir, "direct" + extension)
+
+        _export(addon, settings, stock_path, use_direct_writer=False)
+        settings.optimize_meshes = args.optimize
+        _export(addon, settings, direct_path, use_direct_writer=True)
+        print(f"📦 stock {os.path.getsize(stock_path)} bytes, direct {os.path.getsize(direct_path)} bytes")
+
+        problems = _compare(_summarize_import(stock_path), _summarize_import(direct_path))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems:
+        print(f"🔥 {problem}")
+    if problems:
+        print(f"🔥 {len(problems)} mismatch(es) between the stock exporter and the direct writer")
+        sys.exit(1)
+    print("🕊️  Direct writer output matches the stock exporter")
+
+if __name__ == "__main__":
+    main()
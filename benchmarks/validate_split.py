@@ -0,0 +1,189 @@
+"""
+Checks the bmesh vertex group split against the old operator one, runs in a headless Blender:
+
+    blender --background --factory-startup --python benchmarks/validate_split.py -- --objects 50 --verts 400
+
+--two-rules adds a second, overlapping `Collider` group and rule, so the "first rule wins" order gets checked too.
+
+Builds the synthetic scene from bench_export.py (plus hidden verts, a modifier and the odd empty group),
+exports it through the stock exporter once with the split the add-on does now and once with the old
+edit mode + vertex_group_select + mesh.separate split (kept in here, it's not in the add-on anymore)
+and compares the two files byte for byte. When they differ the import summaries from
+validate_direct_writer.py are compared too, to show which objects it's about.
+Exits with 1 on any difference.
+"""
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bench_export
+import validate_direct_writer
+
+def _parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Compare the bmesh vertex group split with the old operator split")
+    parser.add_argument("--objects", type=int, default=50)
+    parser.add_argument("--verts", type=int, default=400)
+    parser.add_argument("--vertex-group-fraction", type=float, default=0.5)
+    parser.add_argument("--format", default='GLB', choices=('GLB', 'GLTF_SEPARATE'))
+    parser.add_argument("--two-rules", action="store_true", help="Add a second rule with a group overlapping the 'Vertex' one")
+    parser.add_argument("--addon-module", help="Module name of the installed add-on, imported from this checkout if not set")
+    return parser.parse_args(argv)
+
+def _add_variety(two_rules):
+    """Whatever the split has to get right besides plain grids"""
+    objects = [obj for obj in bpy.data.objects if obj.type == 'MESH' and "Vertex" in obj.vertex_groups]
+    for index, obj in enumerate(objects):
+        mesh = obj.data
+        if index % 4 == 1:
+            # Hidden verts are never selected by vertex_group_select
+            hide = np.zeros(len(mesh.vertices), dtype=bool)
+            hide[::5] = True
+            mesh.vertices.foreach_set("hide", hide)
+        if index % 5 == 2:
+            obj.modifiers.new("Mirror", 'MIRROR')
+        if index % 6 == 3:
+            # A group with no verts, nothing to split
+            obj.vertex_groups["Vertex"].remove(list(range(len(mesh.vertices))))
+        if two_rules:
+            # Overlaps the "Vertex" rows, those faces have to stay with the first rule
+            n = int(round(len(mesh.vertices) ** 0.5))
+            obj.vertex_groups.new(name="Collider").add(list(range(n * (n // 4), n * (n // 2))), 1.0, 'REPLACE')
+    bpy.context.view_layer.update()
+
+def _operator_split_object(context, obj, plan, pre_objects):
+    """The split as it was before bmesh: duplicate, then separate every rule's verts off the duplicate"""
+    base_suffix, outputs = plan
+
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    context.view_layer.objects.active = obj
+    bpy.ops.object.duplicate()
+    duplicate = context.active_object
+    duplicate.name = f"{obj.name}{base_suffix}"
+
+    parts = [(base_suffix, duplicate)]
+    known = pre_objects | {duplicate}
+    for suffix, groups in outputs:
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='DESELECT')
+        for group in groups:
+            duplicate.vertex_groups.active_index = group
+            bpy.ops.object.vertex_group_select()
+        # Selection is only readable in object mode
+        bpy.ops.object.mode_set(mode='OBJECT')
+        if not any(v.select for v in duplicate.data.vertices):
+            continue
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.separate(type='SELECTED')
+        bpy.ops.object.mode_set(mode='OBJECT')
+        for separated in set(context.scene.objects) - known:
+            separated.name = f"{obj.name}{suffix}"
+            parts.append((suffix, separated))
+            known.add(separated)
+
+    bpy.ops.object.select_all(action='DESELECT')
+    return parts
+
+def kimjafasu_operator_split(preprocess):
+    """Drop-in for preprocess.kimjafasu_preprocess_split_vertex_groups that splits with operators"""
+    def split(context, objects_to_be_exported, split_rules):
+        split_map = {}
+        new_objects = []
+        split_parts = {}
+        for obj in objects_to_be_exported:
+            plan = preprocess.kimjafasu_get_split_plan(obj, split_rules)
+            # Same check the add-on does, an object whose groups are all empty isn't split at all
+            if plan is None or preprocess.kimjafasu_split_face_outputs(obj.data, plan[1]) is None:
+                continue
+            parts = _operator_split_object(context, obj, plan, set(context.scene.objects))
+            split_map[obj] = [part for _, part in parts]
+            new_objects.extend(split_map[obj])
+            for suffix, part in parts:
+                split_parts[part] = (obj, suffix)
+        return split_map, new_objects, split_parts
+    return split
+
+def _first_difference(a, b):
+    for offset, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return offset
+    return min(len(a), len(b))
+
+def _compare_files(bmesh_path, operator_path):
+    problems = []
+    # GLTF_SEPARATE writes a .bin next to the .gltf, both have to match
+    paths = [(bmesh_path, operator_path)]
+    if bmesh_path.endswith(".gltf"):
+        paths.append((os.path.splitext(bmesh_path)[0] + ".bin", os.path.splitext(operator_path)[0] + ".bin"))
+    for new_path, old_path in paths:
+        with open(new_path, "rb") as f:
+            new = f.read()
+        with open(old_path, "rb") as f:
+            old = f.read()
+        if new != old:
+            problems.append(f"{os.path.basename(new_path)}: {len(new)} bytes vs {len(old)}, first difference at byte {_first_difference(new, old)}")
+    return problems
+
+def main():
+    args = _parse_args()
+    addon = bench_export._import_addon(args.addon_module)
+    if not hasattr(bpy.types.Scene, "gltf_export_settings"):
+        addon.register()
+
+    work_dir = tempfile.mkdtemp(prefix="kimjafasu-validate-split-")
+    bmesh_split = addon.preprocess.kimjafasu_preprocess_split_vertex_groups
+    try:
+        bench_export.kimjafasu_build_synthetic_scene(args.objects, args.verts, args.vertex_group_fraction)
+        _add_variety(args.two_rules)
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.join(work_dir, "validate.blend"))
+
+        settings = bpy.context.scene.gltf_export_settings
+        bench_export._configure(settings, work_dir, args.format)
+        settings.apply_modifiers = True
+        if args.two_rules:
+            settings.split_rules.clear()
+            for pattern, suffix in (("Vertex", ".vertex"), ("Collider", ".collider")):
+                rule = settings.split_rules.add()
+                rule.pattern, rule.suffix = pattern, suffix
+        # Same file name in two dirs, a .gltf has the name of its .bin in it
+        extension = ".glb" if args.format == 'GLB' else ".gltf"
+        bmesh_path = os.path.join(work_dir, "bmesh", "split" + extension)
+        operator_path = os.path.join(work_dir, "operator", "split" + extension)
+
+        settings.export_dir = os.path.dirname(bmesh_path)
+        validate_direct_writer._export(addon, settings, bmesh_path, use_direct_writer=False)
+        settings.export_dir = os.path.dirname(operator_path)
+        addon.preprocess.kimjafasu_preprocess_split_vertex_groups = kimjafasu_operator_split(addon.preprocess)
+        try:
+            validate_direct_writer._export(addon, settings, operator_path, use_direct_writer=False)
+        finally:
+            addon.preprocess.kimjafasu_preprocess_split_vertex_groups = bmesh_split
+        print(f"📦 bmesh {os.path.getsize(bmesh_path)} bytes, operator {os.path.getsize(operator_path)} bytes")
+
+        problems = _compare_files(bmesh_path, operator_path)
+        if problems:
+            # Bytes differ, the import summaries say whether it's geometry or just naming/order
+            summary_problems = validate_direct_writer._compare(
+                validate_direct_writer._summarize_import(operator_path), validate_direct_writer._summarize_import(bmesh_path),
+                labels=("operator split", "bmesh split"))
+            problems.extend(summary_problems)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems:
+        print(f"🔥 {problem}")
+    if problems:
+        print(f"🔥 {len(problems)} difference(s) between the bmesh split and the operator split")
+        sys.exit(1)
+    print("🕊️  bmesh split output is byte identical to the operator split")
+
+if __name__ == "__main__":
+    main()
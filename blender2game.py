@@ -1,10 +1,15 @@
 import bpy
 import os
+import time
+import functools
 from datetime import datetime
+from bpy.app.handlers import persistent
 
 # ⚔️ Remember to import local modules like that!
 from . import utils
 from . import preprocess
+from . import worker
+from . import writer
 
 """
 AI Disclaimer & Excuses
@@ -22,6 +27,27 @@ There are a bunch of code comments that explain to myself for future what some o
 the things do, I hope this is not too clumsy!
 """
 
+DEFERRED_AUTO_EXPORT_KEY = "auto_export"
+LIVE_LINK_KEY = "live_link"
+
+# A drag that goes on and on still gets exported every now and then
+LIVE_LINK_MAX_WAIT = 10.0
+
+# Edits to these can change what ends up in the files, everything else (selection, viewport...) can't
+LIVE_LINK_TYPES = (
+    bpy.types.Object,
+    bpy.types.Mesh,
+    bpy.types.Armature,
+    bpy.types.Material,
+    bpy.types.Image,
+    bpy.types.NodeTree,
+    bpy.types.Action,
+)
+
+# The export itself creates and removes temp objects, those updates mustn't trigger another one
+_live_link_exporting = False
+_live_link_last_export = 0.0
+
 class ExportOperator(bpy.types.Operator):
     """Export Selected Meshes to GLTF"""
     bl_idname = "export_scene.gltf_manual"
@@ -33,203 +59,491 @@ class ExportOperator(bpy.types.Operator):
     If there is an error, you can return {'CANCELLED'}.
     """
     def execute(self, context):
-        safe_export(context, "Manual Export")
+        safe_export(context, "Manual Export", force=True)
         return {'FINISHED'}
 
-def safe_export(context, message):
+def safe_export(context, message, force=False, scene=None, saved_jobs=None, clear_log=True):
+    """saved_jobs and clear_log are for the deferred auto export, see auto_export_gltf"""
     print("✨ Starting Export")
-    settings = context.scene.gltf_export_settings
-    settings.messages.clear() # Clear previous messages
+    scene = scene or context.scene
+    settings = scene.gltf_export_settings
+    if clear_log:
+        utils.kimjafasu_clear_log(settings) # Clear previous messages
     utils.kimjafasu_log_message(settings, message, "INFO")
     
     try:
-        export_gltf(bpy.context, settings)
+        if settings.use_background_worker and _can_use_background_worker(settings):
+            # 🪶 Only bother starting a whole new Blender when something needs exporting
+            pending_jobs = [] if _log_export_errors(settings) else _get_pending_jobs(bpy.context, settings, force, saved_jobs=saved_jobs)
+            if pending_jobs:
+                worker_count = settings.worker_count if settings.use_parallel_workers else 1
+                worker.kimjafasu_start_background_export(scene, settings, pending_jobs, worker_count, force=force)
+        else:
+            export_gltf(bpy.context, settings, force=force, saved_jobs=saved_jobs)
     except Exception as e:
         utils.kimjafasu_log_message(settings, f"Export failed: {e}.", 'ERROR')
         
     utils.kimjafasu_refresh_ui()
 
+def _can_use_background_worker(settings):
+    if bpy.app.background:
+        return False  # we are the worker (or a script), export right here
+    if bpy.data.is_dirty:
+        # The worker exports the file on disk, unsaved changes would be missing
+        utils.kimjafasu_log_message(settings, "Unsaved changes, exporting in this Blender instead of the background worker.", 'WARNING')
+        return False
+    return True
+
 def auto_export_gltf(dummy):
     settings = bpy.context.scene.gltf_export_settings
-    if settings.auto_export_on_save:
-        safe_export(bpy.context, "Auto Export")
-        
-def export_gltf(context, settings):
-    errors = utils.kimjafasu_get_export_errors(settings)
-    
-    if errors:
-        for error in errors:
-            utils.logging.kimjafasu_log_message(settings, error, 'WARNING')
+    if not settings.auto_export_on_save:
         return
     
-    # Filename
-    if (settings.use_project_name):
-        blend_filepath = bpy.data.filepath
-        blend_name = os.path.splitext(os.path.basename(blend_filepath))[0]
-        filename = blend_name
+    if settings.use_background_worker:
+        # Doesn't block anyway, no need to defer
+        safe_export(bpy.context, "Auto Export")
+    elif settings.use_deferred_export:
+        # 🪶 Don't block the save, export a moment later from a timer
+        utils.kimjafasu_clear_log(settings)
+        try:
+            saved_jobs = _snapshot_saved_jobs(settings)
+        except Exception as e:
+            utils.kimjafasu_log_message(settings, f"Auto Export failed: {e}.", 'ERROR')
+            saved_jobs = None
+        if saved_jobs:
+            # Snapshot which file/scene was saved, the timer checks it still is the one open
+            callback = functools.partial(_run_deferred_auto_export, bpy.context.scene.name, bpy.data.filepath, saved_jobs)
+            utils.kimjafasu_schedule_deferred(DEFERRED_AUTO_EXPORT_KEY, callback, settings.deferred_export_delay)
+            utils.kimjafasu_log_message(settings, f"Auto Export queued, runs in {settings.deferred_export_delay:.1f}s.")
+        else:
+            # Nothing to export as saved, whatever an earlier save queued is out of date too
+            utils.kimjafasu_cancel_deferred(DEFERRED_AUTO_EXPORT_KEY)
+        utils.kimjafasu_refresh_ui()
     else:
-        filename = settings.simple_export_filename
-    
-    # Export location
-    export_dir = bpy.path.abspath(settings.export_dir)
+        safe_export(bpy.context, "Auto Export")
 
-    # Making sure it exists
-    if not os.path.exists(export_dir):
-        os.makedirs(export_dir)
-        
-    # 🪶 Neat oneliners    
-    apply_modifiers = settings.apply_modifiers
-    export_textures = settings.export_textures
-    export_vertex_color = settings.export_vertex_color
-    export_yup = False if settings.engine == 'Unreal' else True
+def _snapshot_saved_jobs(settings):
+    """
+    Path -> (settings fingerprint, object fingerprints) of every job the save needs exported.
+    Edits made before the timer fires aren't in the saved file, the deferred export skips jobs they touched.
+    """
+    if _log_export_errors(settings):
+        return {}
+    pending_jobs = _get_pending_jobs(bpy.context, settings, force=False)
+    return {job.path: (job.settings_fingerprint, job.fingerprints) for job in pending_jobs}
+
+def _run_deferred_auto_export(scene_name, blend_filepath, saved_jobs, coalesced_saves):
+    scene = bpy.data.scenes.get(scene_name)
+    if scene is None or bpy.data.filepath != blend_filepath:
+        print("⚠️  [WARNING] Deferred Auto Export dropped, the saved file/scene isn't open anymore.")
+        return
     
-    # 🪶 Export Path & Format
-    gltf_export_format = settings.export_format
+    message = "Deferred Auto Export"
+    if coalesced_saves > 1:
+        message += f" ({coalesced_saves} saves merged)"
     
-    if (settings.engine != "Procreate"):
-        file_extension = {
-            'GLB': ".glb",
-            'GLTF_SEPARATE': ".gltf",
-        }[gltf_export_format]
-    else:
-        file_extension = ".obj"
+    # Timers run without a window/area, operators used by the export need one
+    # The log still has what the save found to export, keep it
+    with bpy.context.temp_override(**utils.kimjafasu_get_context_override()):
+        safe_export(bpy.context, message, scene=scene, saved_jobs=saved_jobs, clear_log=False)
+        
+def _is_live_link_edit(update):
+    datablock = getattr(update.id, "original", update.id)
+    if not isinstance(datablock, LIVE_LINK_TYPES):
+        return False
+    if isinstance(datablock, bpy.types.Object):
+        # Selecting only tags the object, without a transform or geometry change
+        return update.is_updated_transform or update.is_updated_geometry
+    return True
+
+@persistent
+def live_link_update(scene, depsgraph):
+    """depsgraph_update_post handler, queues a live export once the edits stop for a moment"""
+    settings = scene.gltf_export_settings
+    if not settings.use_live_link or _live_link_exporting or bpy.app.background or not bpy.data.filepath:
+        return
+    if not any(_is_live_link_edit(update) for update in depsgraph.updates):
+        return
     
-    export_path = os.path.join(export_dir, filename + file_extension)
+    # 🪶 Edit mode edits only reach the mesh once synced, and half done edits aren't worth exporting,
+    # so there it waits until the user leaves edit mode (that's an edit too) or stops for longer
+    in_edit_mode = bpy.context.mode.startswith('EDIT')
+    delay = settings.live_link_edit_delay if in_edit_mode else settings.live_link_delay
+    # Rate limit, never sooner than min interval after the previous live export
+    delay = max(delay, _live_link_last_export + settings.live_link_min_interval - time.monotonic())
+    callback = functools.partial(_run_live_link_export, scene.name, bpy.data.filepath)
+    utils.kimjafasu_schedule_deferred(LIVE_LINK_KEY, callback, delay, max_wait=max(delay, LIVE_LINK_MAX_WAIT))
+
+def _run_live_link_export(scene_name, blend_filepath, coalesced_edits):
+    global _live_link_exporting, _live_link_last_export
     
-    # 🪶 Save pre-export selection and mode
-    # In order to later return to that state
+    scene = bpy.data.scenes.get(scene_name)
+    if scene is None or bpy.data.filepath != blend_filepath or not scene.gltf_export_settings.use_live_link:
+        return
+    settings = scene.gltf_export_settings
     
-    # Active object mode before exporting
-    # https://docs.blender.org/api/current/bpy_types_enum_items/object_mode_items.html#rna-enum-object-mode-items
+    _live_link_exporting = True
+    try:
+        # Timers run without a window/area, operators used by the export need one
+        with bpy.context.temp_override(**utils.kimjafasu_get_context_override()):
+            # 🪶 The log is a ring buffer, no need to clear it, live exports just keep appending
+            # (export errors too, export_gltf logs those itself)
+            export_gltf(bpy.context, settings, only_changed=True)
+    except Exception as e:
+        utils.kimjafasu_log_message(settings, f"Live export failed: {e}.", 'ERROR')
+    finally:
+        _live_link_exporting = False
+        _live_link_last_export = time.monotonic()
+    utils.kimjafasu_refresh_ui()
+
+def _log_export_errors(settings):
+    errors = utils.kimjafasu_get_export_errors(settings)
+    for error in errors:
+        utils.logging.kimjafasu_log_message(settings, error, 'WARNING')
+    return bool(errors)
+        
+def export_gltf(context, settings, force=False, only_paths=None, only_changed=False, saved_jobs=None):
     """
-    bpy.context.active_object: the last selected, 'active' object 
-    bpy.context.selected_objects: all currently selected object
+    only_paths limits the export to jobs writing these files, that's how parallel workers share the work.
+    only_changed (live link) always skips unchanged jobs, quietly, and doesn't report anything when all were.
+    saved_jobs (deferred auto export) limits it to the jobs pending at save time, see _snapshot_saved_jobs.
+    """
+    if _log_export_errors(settings):
+        return
     
-    bpy.context.active_object is equal to bpy.context.object (in most cases)
+    # ⏱️ Every phase of the pipeline gets timed, see utils/timing.py
+    with utils.kimjafasu_export_timer(settings.timing_history_size) as timer:
+        exported = _export_gltf(context, settings, force, only_paths, only_changed, saved_jobs)
     
-    using active_object is safer cos:
+    if exported or not only_changed:
+        _report_timings(settings, timer)
+
+def _report_timings(settings, timer):
+    phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timer.phase_totals().items())
+    utils.kimjafasu_log_message(settings, f"Took {timer.total:.2f}s ({phases})")
+    if utils.kimjafasu_is_regression(timer):
+        utils.kimjafasu_log_message(settings, "That's a lot slower than the previous exports, check the Performance section.", 'WARNING')
     
-    "[...] during some modal operators or 
-    when you're inside non-3D View editors, bpy.context.object might return 
-    None, even though bpy.context.active_object still works."
-    """
-    original_selected_objects = [obj for obj in context.selected_objects] 
-    active_object = bpy.context.active_object
-    if active_object:
-        original_mode = active_object.mode
-    else: 
-        # If no object is selected, default to Object Mode
-        original_mode = 'OBJECT'
-      
-    # 🪶 Switch to Object mode if not already in it
-    if original_mode != 'OBJECT':
-        bpy.ops.object.mode_set(mode='OBJECT')
-        
-    export_target = settings.export_target
+    if settings.write_timing_trace:
+        try:
+            export_dir = bpy.path.abspath(settings.export_dir)
+            utils.kimjafasu_write_timing_trace(timer, export_dir, settings.timing_trace_format)
+        except OSError as e:
+            utils.kimjafasu_log_message(settings, f"Couldn't write timing trace: {e}", 'WARNING')
+
+def _export_gltf(context, settings, force, only_paths, only_changed=False, saved_jobs=None):
+    """Returns whether there was anything to export"""
+    with utils.kimjafasu_timed("change check"):
+        pending_jobs = _get_pending_jobs(context, settings, force, only_paths, only_changed, saved_jobs)
+    if not pending_jobs:
+        return False
     
-    if export_target != 'Selection':
+    # 🪶 Selection and mode are never touched: stock exporters get their objects through a temp collection,
+    # edit mode changes are synced by _get_pending_jobs, so there is nothing to save and restore
     
-        bpy.ops.object.select_all(action='DESELECT')
-        
-        if export_target == 'Everything':
-            for obj in bpy.data.objects:
-                if obj.type in {'MESH', 'ARMATURE'}:
-                    obj.select_set(True)
-        elif export_target == 'Collection':
-            export_collection = settings.export_collection
-            for obj in export_collection.all_objects:
-                if obj.type in {'MESH', 'ARMATURE'}:
-                    obj.select_set(True)
-                    
-    if len(context.selected_objects) == 0:
+    # 🪶 Preprocess every object once, no matter in how many groups it ends up
+    objects_to_be_exported = list({obj: None for job in pending_jobs for obj in job.objects})
+    
+    if len(objects_to_be_exported) == 0:
       utils.logging.kimjafasu_log_message(settings, "Empty selected_objects array, can't proceed.", 'ERROR')
-      utils.kimjafasu_cleanup_after(export_target, original_selected_objects, original_mode)
-      return
+      return False
     
-    # [<expression> for <variable> in <iterable> if <condition>]
-    # "For each obj in context.selected_objects, evaluate the expression obj, and add it to a list."
-    objects_to_be_exported = [obj for obj in context.selected_objects]
+    # 🪶 Plain static meshes skip the stock exporter
+    direct_jobs = _get_direct_jobs(settings, pending_jobs)
+    
+    # 🪶 The direct writer splits meshes without modifiers on the fly, no temp objects needed for those
+    # (unless a stock exported job wants the same object too)
+    stock_objects = {obj for job in pending_jobs if job not in direct_jobs for obj in job.objects}
+    split_rules = preprocess.kimjafasu_split_rules(settings)
+    split_plans = {}
+    for obj in {obj: None for job in pending_jobs if job in direct_jobs for obj in job.objects}:
+      plan = preprocess.kimjafasu_get_split_plan(obj, split_rules)
+      if plan and obj not in stock_objects and not (settings.apply_modifiers and obj.modifiers):
+        split_plans[obj] = plan
     
     try:
-      split_objects, new_objects = preprocess.kimjafasu_preprocess_split_vertex_groups(bpy.context, objects_to_be_exported)
+      with utils.kimjafasu_timed("vertex group split"):
+        objects_to_split = [obj for obj in objects_to_be_exported if obj not in split_plans]
+        split_map, new_objects, split_parts = preprocess.kimjafasu_preprocess_split_vertex_groups(bpy.context, objects_to_split, split_rules)
     except Exception as e:
+      # Whatever got split before it blew up is still in the scratch collection
+      preprocess.kimjafasu_postprocess_cleanup([])
       raise ValueError(f"Critical error in vertex group splitting process. Exception: {e}")
-      
-    # Combine original and split objects
-    # Convert to sets, subtract, then combine
-    # Now you can create the final export list:
-    #   obj for obj → This means: for each obj in the list, include it in the new list.
-    #   in objects_to_be_exported → You're looping through each object in that original list.
-    #   if obj not in split_objects → Only include the object if it was not split by the preprocessing.
-    final_objects = [obj for obj in objects_to_be_exported if obj not in split_objects] + new_objects
+    
+    # 🪶 What the mesh cache of the direct writer is keyed by
+    geometry_fingerprints = {}
+    if settings.use_direct_writer:
+      geometry_fingerprints = writer.kimjafasu_collect_geometry_fingerprints(context, objects_to_be_exported, split_map, settings.apply_modifiers)
+    
+    # 🪶 Static meshes are swapped for a LOD group, decimated meshes come from memory when unchanged
+    lod_map = {}
+    if settings.use_lods:
+      try:
+        with utils.kimjafasu_timed("LODs"):
+          objects_for_lods = [obj for obj in objects_to_be_exported if obj not in split_map and obj not in split_plans]
+          lod_map, lod_objects, lod_fingerprints, lod_stats = preprocess.kimjafasu_preprocess_lods(
+            context, settings, objects_for_lods, geometry_fingerprints)
+      except Exception as e:
+        preprocess.kimjafasu_postprocess_cleanup(new_objects)
+        raise ValueError(f"Critical error while generating LODs. Exception: {e}")
+      new_objects.extend(lod_objects)
+      geometry_fingerprints.update(lod_fingerprints)
+      if lod_stats["objects"]:
+        utils.kimjafasu_log_message(
+          settings,
+          f"LODs: {lod_stats['objects']} objects, {lod_stats['decimated']} meshes decimated, {lod_stats['cached']} from cache.")
+    
+    # 🪶 Changed files also go straight to the engine when it listens, see utils/transport.py
+    push = utils.kimjafasu_push_connection(settings)
+    
     print("✨")
-    bpy.ops.object.select_all(action='DESELECT')
+    try:
+      for job in pending_jobs:
+        # Split objects are swapped for their parts (.base, .vertex...), objects with LODs for their LOD group
+        final_objects = []
+        for obj in job.objects:
+            final_objects.extend(split_map.get(obj) or lod_map.get(obj) or [obj])
+        
+        if not final_objects:
+            utils.kimjafasu_log_message(settings, f"{job.name} has nothing to export, skipped.", 'WARNING')
+            continue
+        
+        # Compressed files are cached by what went into them, see utils/compression.py
+        compression_key = None
+        if settings.geometry_compression != 'NONE' and settings.engine != 'Procreate':
+          compression_key = utils.kimjafasu_compression_cache_key(job)
+        
+        try:
+          written, unchanged = _write_export_atomic(
+            context, settings, job.path, job.export_format, final_objects, job in direct_jobs, geometry_fingerprints, split_plans, compression_key, split_parts)
+        except Exception as e:
+          utils.kimjafasu_log_message(settings, f"Exporting {job.name} failed: {e}.", 'ERROR')
+        else:
+          with utils.kimjafasu_timed("manifest"):
+            utils.kimjafasu_remember_export(job.path, job.settings_fingerprint, job.fingerprints, job.chunk_of)
+          utils.kimjafasu_count_written_files(len(written))
+          if push:
+            with utils.kimjafasu_timed("push"):
+              for path in written:
+                push.send_file(os.path.dirname(job.path), path)
+          if written:
+            utils.kimjafasu_log_message(
+            settings, 
+            f"Successfuly exported {job.name} to {job.path}")
+          else:
+            utils.kimjafasu_log_message(
+            settings,
+            f"Exported {job.name}, output is identical to {job.path} so it was left untouched")
+    finally:
+      if push:
+        push.close()
+        _log_push(settings, push)
+      with utils.kimjafasu_timed("cleanup"):
+        preprocess.kimjafasu_postprocess_cleanup(new_objects)
+    return True
 
-    # Select all final objects
-    for obj in final_objects:
-        obj.select_set(True)
+def _get_direct_jobs(settings, jobs):
+    """Jobs the direct writer can handle, logs why the others can't"""
+    direct_jobs = set()
+    if not settings.use_direct_writer:
+        return direct_jobs
+    for job in jobs:
+        # Split parts are copies of their object, so checking the originals is enough
+        blocker = writer.kimjafasu_direct_export_blocker(settings, job.export_format, job.objects)
+        if blocker:
+            utils.kimjafasu_log_message(settings, f"{job.name} goes through the stock exporter, {blocker}.")
+        else:
+            direct_jobs.add(job)
+    return direct_jobs
 
-    # Set one of them (e.g., the first one) as active
-    if final_objects:
-        context.view_layer.objects.active = final_objects[0]
+def _get_pending_jobs(context, settings, force, only_paths=None, only_changed=False, saved_jobs=None):
+    """
+    Export jobs that actually need exporting, logs why the others are skipped (unless only_changed).
+    With saved_jobs only the jobs in there, unless they changed since they went in.
+    """
+    # Export location
+    export_dir = bpy.path.abspath(settings.export_dir)
 
-    try:
-    # 🪶 Finally export.
-    # A little override for procreate, everything else exported with gltf
-      if (settings.engine == 'Procreate'):
-          bpy.ops.wm.obj_export(
-              filepath=export_path,
-              check_existing=False,
-              export_selected_objects=True,
-              apply_modifiers=apply_modifiers,
-              export_triangulated_mesh=True,
-              export_object_groups=True,
-              export_materials=True,
-              forward_axis='NEGATIVE_Z',
-              up_axis='Y'
-          )
-      else:
-          # https://docs.blender.org/api/current/bpy.ops.export_scene.html#bpy.ops.export_scene.gltf
-          bpy.ops.export_scene.gltf(
-              filepath=export_path,
-              # basics
-              use_selection=True,
-              export_yup=export_yup,
-              export_apply=apply_modifiers,
-              export_format=gltf_export_format,
-              # animation
-              export_skins=True,
-              export_animations=True,
-              # vertex color
-              export_vertex_color=export_vertex_color,
-              export_all_vertex_colors=True,
-              export_active_vertex_color_when_no_material=True,
-              # uvs
-              export_texcoords=True,
-              # compression
-              # requires com.unity.draco
-              # export_draco_mesh_compression_enable=True,
-              # textures
-              export_image_format='AUTO' if export_textures else 'NONE'
-          )
-    except Exception as e:
-      print("🔥 Export Exception: " + e)
+    # Making sure it exists
+    if not os.path.exists(export_dir):
+        os.makedirs(export_dir)
+    
+    utils.kimjafasu_sync_edit_mode(context)
+    
+    # 🪶 One job per output file, simple mode is just a single job
+    jobs = utils.kimjafasu_get_export_jobs(context, settings)
+    if saved_jobs is not None:
+        # The save already checked these against the manifest and removed stale chunks
+        only_paths = saved_jobs
+    if only_paths is not None:
+        jobs = [job for job in jobs if job.path in only_paths]
     else:
-      utils.kimjafasu_log_message(
-      settings, 
-      f"Successfuly exported {export_target} to {export_path}")
+        # Workers only see their share, the full set of chunks is known here
+        _remove_stale_chunks(settings, jobs)
+    
+    # 🪶 Incremental export, skip jobs where nothing that would be exported changed
+    # Fingerprints are cached per datablock and only recomputed for what the depsgraph saw changing
+    all_objects = list({obj: None for job in jobs for obj in job.objects})
+    fingerprints = utils.kimjafasu_collect_fingerprints(context, all_objects, settings.apply_modifiers)
+    
+    pending_jobs = []
+    for job in jobs:
+        job.fingerprints = {obj.name: fingerprints[obj.name] for obj in job.objects}
+        if saved_jobs is not None:
+            # 🪶 Exporting it now would put edits that aren't saved into the files (and the manifest)
+            if saved_jobs[job.path] != (job.settings_fingerprint, job.fingerprints):
+                utils.kimjafasu_log_message(
+                    settings, f"Skipped {job.name}, it was edited after the save. The next save exports it.", 'WARNING')
+                continue
+            pending_jobs.append(job)
+            continue
+        if not force and (settings.skip_unchanged or only_changed) and os.path.exists(job.path):
+            reasons = utils.kimjafasu_describe_changes(job.path, job.settings_fingerprint, job.fingerprints)
+            if not reasons:
+                if only_changed:
+                    continue
+                utils.kimjafasu_log_message(
+                    settings,
+                    f"Skipped {job.name}, none of the {len(job.objects)} objects or export settings changed since the last export to {job.path}")
+                continue
+            utils.kimjafasu_log_message(settings, f"Exporting {job.name} because: {'; '.join(reasons)}")
+        pending_jobs.append(job)
+    return pending_jobs
+
+def _remove_stale_chunks(settings, jobs):
+    chunk_paths = {}
+    for job in jobs:
+        if job.chunk_of:
+            chunk_paths.setdefault(job.chunk_of, []).append(job.path)
+    for chunk_of, paths in chunk_paths.items():
+        removed = utils.kimjafasu_remove_stale_chunks(chunk_of, paths)
+        if removed:
+            utils.kimjafasu_log_message(
+                settings,
+                f"Removed {len(removed)} chunk file(s) of {os.path.basename(chunk_of)} that the current chunks replace")
+
+def _write_export_atomic(context, settings, export_path, gltf_export_format, objects, use_direct_writer=False, geometry_fingerprints=None, split_plans=None, compression_key=None, split_parts=None):
+    """
+    Exports objects into a staging dir first, then only moves files whose content changed over the old ones.
+    They go through the direct writer when use_direct_writer, through the stock exporter otherwise.
+    With compression_key the compressed files come from the compression cache when it has them.
+    Returns (written, unchanged) lists of paths.
+    """
+    export_dir = os.path.dirname(export_path)
+    staging_dir = utils.kimjafasu_create_staging_dir(export_dir)
+    try:
+        staged_path = os.path.join(staging_dir, os.path.basename(export_path))
+        with utils.kimjafasu_timed("compression"):
+            from_cache = compression_key is not None and utils.kimjafasu_restore_compressed(export_dir, compression_key, staging_dir)
+        if from_cache:
+            utils.kimjafasu_log_message(settings, f"{os.path.basename(export_path)} is unchanged, compressed file taken from the cache")
+        else:
+            with utils.kimjafasu_timed("glTF export"):
+                if use_direct_writer:
+                    stats = writer.kimjafasu_write_direct(
+                        context, settings, staged_path, gltf_export_format, objects, geometry_fingerprints, split_plans, split_parts)
+                    _log_mesh_cache(settings, stats["hits"], stats["misses"])
+                    _log_texture_cache(settings, stats["texture_hits"], stats["texture_misses"])
+                    _log_instancing(settings, stats["mesh_nodes"], stats["unique_meshes"])
+                    _log_optimization(settings, stats)
+                else:
+                    _write_export(context, settings, staged_path, gltf_export_format, objects)
+        if not os.path.exists(staged_path):
+            raise RuntimeError("exporter didn't write any file")
+        if compression_key is not None and not from_cache:
+            with utils.kimjafasu_timed("compression"):
+                if settings.geometry_compression == 'MESHOPT':
+                    utils.kimjafasu_meshopt_compress(utils.kimjafasu_find_gltfpack(settings), staged_path, settings)
+                utils.kimjafasu_store_compressed(export_dir, compression_key, staging_dir, settings.compression_cache_size * 1024 * 1024)
+        with utils.kimjafasu_timed("commit files"):
+            return utils.kimjafasu_commit_staged_files(staging_dir, export_dir)
     finally:
-      preprocess.kimjafasu_postprocess_cleanup(new_objects)
-      
-      # 🪶 Restore previous object selection
-      if export_target != 'Selection':
-          bpy.ops.object.select_all(action='DESELECT')
-          for obj in original_selected_objects:
-              obj.select_set(True)
-          
-      # Restore original mode
-      if original_mode != 'OBJECT':
-          bpy.ops.object.mode_set(mode=original_mode)
-    
-    
-    
\ No newline at end of file
+        utils.kimjafasu_remove_staging_dir(staging_dir)
+
+def _log_push(settings, push):
+    if push.sent:
+        utils.kimjafasu_log_message(settings, f"Pushed {push.sent} file(s) to the engine on port {push.port}")
+    if push.refused:
+        utils.kimjafasu_log_message(settings, f"Nothing listening on port {push.port}, files only.")
+    if push.error:
+        utils.kimjafasu_log_message(settings, f"Push stopped, {push.error}. Files are in the export dir as usual.", 'WARNING')
+
+def _log_mesh_cache(settings, hits, misses):
+    if hits or misses:
+        meshes, cached_bytes = writer.kimjafasu_mesh_cache_usage()
+        utils.kimjafasu_log_message(
+            settings,
+            f"Mesh cache: {hits} hit(s), {misses} miss(es), {meshes} meshes ({cached_bytes / (1024 * 1024):.1f} MB) cached")
+
+def _log_texture_cache(settings, hits, misses):
+    if hits or misses:
+        utils.kimjafasu_log_message(settings, f"Texture cache: {hits} hit(s), {misses} miss(es)")
+
+def _log_instancing(settings, mesh_nodes, unique_meshes):
+    if unique_meshes and mesh_nodes > unique_meshes:
+        utils.kimjafasu_log_message(
+            settings,
+            f"Instancing: {mesh_nodes} mesh nodes share {unique_meshes} meshes ({mesh_nodes / unique_meshes:.1f}x)")
+
+def _log_optimization(settings, stats):
+    if stats["optimized"] and stats["triangles_before"]:
+        acmr_before = stats["vertex_misses_before"] / stats["triangles_before"]
+        acmr_after = stats["vertex_misses_after"] / max(stats["triangles_after"], 1)
+        utils.kimjafasu_log_message(
+            settings,
+            f"Optimized {stats['optimized']} meshes: {stats['vertices_before']} -> {stats['vertices_after']} vertices, ACMR {acmr_before:.2f} -> {acmr_after:.2f}")
+
+def _write_export(context, settings, export_path, gltf_export_format, objects):
+    # 🪶 Neat oneliners    
+    apply_modifiers = settings.apply_modifiers
+    export_textures = settings.export_textures
+    export_vertex_color = settings.export_vertex_color
+    export_yup = False if settings.engine == 'Unreal' else True
+    
+    # Draco is done by the exporter itself, meshopt afterwards (see _write_export_atomic)
+    compression = utils.kimjafasu_draco_export_args(settings) if settings.geometry_compression == 'DRACO' else {}
+    
+    # 🪶 Finally export.
+    # The objects come in through a temp collection, the user's selection stays as it is
+    with utils.kimjafasu_export_collection(context, objects) as collection_name:
+        # No collection means the exporter has to go by the selection (before 4.2)
+        source = {"collection": collection_name} if collection_name else {}
+        # A little override for procreate, everything else exported with gltf
+        if (settings.engine == 'Procreate'):
+            bpy.ops.wm.obj_export(
+                filepath=export_path,
+                check_existing=False,
+                export_selected_objects=collection_name is None,
+                **source,
+                apply_modifiers=apply_modifiers,
+                export_triangulated_mesh=True,
+                export_object_groups=True,
+                export_materials=True,
+                forward_axis='NEGATIVE_Z',
+                up_axis='Y'
+            )
+        else:
+            # https://docs.blender.org/api/current/bpy.ops.export_scene.html#bpy.ops.export_scene.gltf
+            bpy.ops.export_scene.gltf(
+                filepath=export_path,
+                # basics
+                use_selection=collection_name is None,
+                **source,
+                export_yup=export_yup,
+                export_apply=apply_modifiers,
+                export_format=gltf_export_format,
+                # animation
+                export_skins=True,
+                export_animations=True,
+                # vertex color
+                export_vertex_color=export_vertex_color,
+                export_all_vertex_colors=True,
+                export_active_vertex_color_when_no_material=True,
+                # uvs
+                export_texcoords=True,
+                # compression
+                # Draco requires com.unity.draco
+                **compression,
+                # textures
+                export_image_format='AUTO' if export_textures else 'NONE'
+            )
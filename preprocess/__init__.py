@@ -2,11 +2,25 @@
 # This is safe cos u wont have accidental collistions with other packages
 from .splitVertexGroup import (
   kimjafasu_preprocess_split_vertex_groups,
-  kimjafasu_postprocess_cleanup
+  kimjafasu_postprocess_cleanup,
+  kimjafasu_split_rules,
+  kimjafasu_get_split_plan,
+  kimjafasu_split_face_outputs
+)
+
+from .optimizeMesh import (
+  kimjafasu_optimize_primitive,
+  kimjafasu_acmr,
+)
+
+from . import generateLods
+from .generateLods import (
+  kimjafasu_preprocess_lods,
+  kimjafasu_lod_blocker,
 )
 
 def register():
-    pass
+    generateLods.register()
 
 def unregister():
-    pass
\ No newline at end of file
+    generateLods.unregister()
\ No newline at end of file
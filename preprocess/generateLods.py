@@ -0,0 +1,274 @@
+import bpy
+import numpy as np
+from collections import OrderedDict
+from bpy.app.handlers import persistent
+from mathutils import Matrix
+
+from .. import utils
+from .splitVertexGroup import _scratch_collection
+
+"""
+LOD chains for static meshes, generated at export time.
+
+Every eligible object is swapped (in the export only, like split parts) for
+
+    <name>_LODGroup          an empty where the object was
+      <name>_LOD0            the object as it is
+      <name>_LOD1 ... _LODn  decimated copies, each keeping LOD Ratio of the triangles of the one before
+
+Those are the names Unity's model importer builds a LOD Group from, but only for FBX. The glTF importers
+(glTFast, UnityGLTF) and Godot don't, they import the LODs as plain child objects, so the LOD Group has to
+be set up by an import hook on the engine side (or by hand). Nothing in here does that.
+Only plain static meshes get LODs: no armature, animation or shape keys, not split by vertex group rules
+and not inside collection instances.
+
+Decimating is done by the Decimate modifier (collapse) on temp objects in the scratch collection, all of
+them evaluated in one go. The results are kept in memory as arrays, keyed by the geometry fingerprint of the
+object (see utils/change_tracking.py) and the LOD level, so an unchanged mesh only gets its LOD meshes
+rebuilt from arrays on later exports instead of decimated again. Bounded like the mesh cache,
+least recently used first out.
+"""
+
+LOD_GROUP_SUFFIX = "_LODGroup"
+LOD_SUFFIX = "_LOD{}"
+# Levels that would end up with fewer triangles than this aren't worth a LOD
+MIN_LOD_TRIANGLES = 32
+# Temp objects the Decimate modifier runs on
+DECIMATE_OBJECT_NAME = "kimjafasu_decimate"
+
+# (geometry fingerprint, apply modifiers, level, ratio) -> DecimatedMesh, oldest first
+_cache = OrderedDict()
+_cached_bytes = 0
+
+class DecimatedMesh:
+    """A decimated mesh as arrays, enough to build it again without decimating"""
+
+    def __init__(self, mesh):
+        self.positions = utils.kimjafasu_foreach_get(mesh.vertices, "co", 3)
+        self.loop_vertices = utils.kimjafasu_foreach_get(mesh.loops, "vertex_index", 1, np.int32)
+        self.loop_starts = utils.kimjafasu_foreach_get(mesh.polygons, "loop_start", 1, np.int32)
+        # (name, domain, data_type, array), uv maps, material indices, smooth flags, colors...
+        self.attributes = []
+        for attribute in mesh.attributes:
+            # Internal ones (.corner_vert...) and positions are the topology above, edges get rebuilt
+            if attribute.name.startswith(".") or attribute.name == "position" or attribute.domain not in {'POINT', 'CORNER', 'FACE'}:
+                continue
+            array = utils.kimjafasu_attribute_array(attribute)
+            if array is not None:
+                self.attributes.append((attribute.name, attribute.domain, attribute.data_type, array))
+        render_uv = next((uv for uv in mesh.uv_layers if uv.active_render), None)
+        self.render_uv = render_uv.name if render_uv else None
+        self.active_color = mesh.color_attributes.active_color_name if mesh.color_attributes else None
+        self.triangles = len(self.loop_vertices) - 2 * len(self.loop_starts)
+        self.nbytes = self.positions.nbytes + self.loop_vertices.nbytes + self.loop_starts.nbytes + sum(
+            array.nbytes for _, _, _, array in self.attributes)
+
+    def to_mesh(self, name, materials):
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(self.positions))
+        mesh.loops.add(len(self.loop_vertices))
+        mesh.polygons.add(len(self.loop_starts))
+        utils.kimjafasu_foreach_set(mesh.vertices, "co", self.positions)
+        utils.kimjafasu_foreach_set(mesh.loops, "vertex_index", self.loop_vertices)
+        utils.kimjafasu_foreach_set(mesh.polygons, "loop_start", self.loop_starts)
+        for attribute_name, domain, data_type, array in self.attributes:
+            attribute = mesh.attributes.get(attribute_name) or mesh.attributes.new(attribute_name, data_type, domain)
+            prop = utils.mesh_arrays.ATTRIBUTE_LAYOUT[data_type][0]
+            utils.kimjafasu_foreach_set(attribute.data, prop, array)
+        if self.render_uv and self.render_uv in mesh.uv_layers:
+            mesh.uv_layers[self.render_uv].active_render = True
+            mesh.uv_layers.active = mesh.uv_layers[self.render_uv]
+        if self.active_color and self.active_color in mesh.color_attributes:
+            mesh.color_attributes.active_color_name = self.active_color
+        for material in materials:
+            mesh.materials.append(material)
+        mesh.update(calc_edges=True)
+        return mesh
+
+def kimjafasu_lod_blocker(obj):
+    """Why obj gets no LODs, None when it does"""
+    if obj.type != 'MESH':
+        return "not a mesh"
+    if (obj.parent and obj.parent.type == 'ARMATURE') or any(modifier.type == 'ARMATURE' for modifier in obj.modifiers):
+        return "skinned"
+    animation = obj.animation_data
+    if animation is not None and (animation.action is not None or len(animation.nla_tracks) > 0):
+        return "animated"
+    if obj.data.shape_keys:
+        return "has shape keys"
+    return None
+
+def _level_ratios(settings, triangles):
+    """Ratio of the original triangles every LOD level keeps, levels too small to matter left out"""
+    ratios = []
+    for level in range(1, settings.lod_count + 1):
+        ratio = settings.lod_ratio ** level
+        if triangles * ratio < MIN_LOD_TRIANGLES:
+            break
+        ratios.append(ratio)
+    return ratios
+
+def _get_cached(key):
+    decimated = _cache.get(key)
+    if decimated is not None:
+        _cache.move_to_end(key)
+    return decimated
+
+def _cache_decimated(key, decimated, limit_bytes):
+    global _cached_bytes
+
+    if key in _cache:
+        _cached_bytes -= _cache.pop(key).nbytes
+    if decimated.nbytes > limit_bytes:
+        return  # wouldn't fit anyway, don't flush everything else for it
+    _cache[key] = decimated
+    _cached_bytes += decimated.nbytes
+    while _cached_bytes > limit_bytes:
+        _, evicted = _cache.popitem(last=False)
+        _cached_bytes -= evicted.nbytes
+
+def _decimate(context, sources, apply_modifiers, scratch):
+    """
+    sources: {key: (obj, ratio)}, returns {key: DecimatedMesh}.
+    Every decimation is a temp object with a Decimate modifier, evaluated all at once.
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    source_meshes = {}
+    temp_objects = {}
+    try:
+        for key, (obj, ratio) in sources.items():
+            if obj not in source_meshes:
+                # 🪶 A temp evaluated copy when modifiers get applied, the plain mesh (never touched) otherwise
+                source_meshes[obj] = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph)) if apply_modifiers and obj.modifiers else None
+            temp = bpy.data.objects.new(DECIMATE_OBJECT_NAME, source_meshes[obj] or obj.data)
+            scratch.objects.link(temp)
+            modifier = temp.modifiers.new("Decimate", 'DECIMATE')
+            modifier.decimate_type = 'COLLAPSE'
+            modifier.ratio = ratio
+            temp_objects[key] = temp
+
+        # Evaluates the temp objects, all of them in one go
+        depsgraph = context.evaluated_depsgraph_get()
+        decimated = {}
+        for key, temp in temp_objects.items():
+            evaluated = temp.evaluated_get(depsgraph)
+            mesh = evaluated.to_mesh()
+            try:
+                decimated[key] = DecimatedMesh(mesh)
+            finally:
+                evaluated.to_mesh_clear()
+        return decimated
+    finally:
+        doomed = list(temp_objects.values()) + [mesh for mesh in source_meshes.values() if mesh is not None]
+        if doomed:
+            bpy.data.batch_remove(doomed)
+
+def _lod_object(obj, name, parent, data=None):
+    lod = obj.copy()
+    if data is not None:
+        lod.data = data
+        # Already decimated with the modifiers applied (or on the plain mesh without them)
+        lod.modifiers.clear()
+    lod.name = name
+    # The group already sits where obj is, constraints would move it a second time
+    lod.constraints.clear()
+    lod.parent = parent
+    lod.matrix_parent_inverse = Matrix.Identity(4)
+    lod.matrix_world = obj.matrix_world.copy()
+    return lod
+
+def kimjafasu_preprocess_lods(context, settings, objects, geometry_fingerprints=None):
+    """
+    Returns (lod_map, new_objects, lod_fingerprints, stats):
+    lod_map maps every object that got LODs to the objects replacing it in the export (group first),
+    lod_fingerprints gives the LOD objects a geometry fingerprint for the direct writer's mesh cache,
+    stats counts objects, decimated and cached LOD meshes.
+    """
+    lod_map = {}
+    new_objects = []
+    lod_fingerprints = {}
+    stats = {"objects": 0, "decimated": 0, "cached": 0}
+    depsgraph = context.evaluated_depsgraph_get()
+    geometry_fingerprints = geometry_fingerprints or {}
+
+    plans = {}
+    for obj in objects:
+        if kimjafasu_lod_blocker(obj):
+            continue
+        triangles = utils.kimjafasu_estimate_size(obj, depsgraph if settings.apply_modifiers else None)[0]
+        if triangles < settings.lod_min_triangles:
+            continue
+        ratios = _level_ratios(settings, triangles)
+        if ratios:
+            fingerprint = geometry_fingerprints.get(obj) or utils.kimjafasu_geometry_fingerprint(obj, depsgraph, settings.apply_modifiers)
+            plans[obj] = (fingerprint, ratios)
+    if not plans:
+        return lod_map, new_objects, lod_fingerprints, stats
+
+    # 🪶 Linked duplicates have the same fingerprint, they share the decimation and the LOD meshes
+    limit_bytes = settings.lod_cache_size * 1024 * 1024
+    if limit_bytes <= 0:
+        kimjafasu_clear_lod_cache()
+    decimated = {}
+    to_decimate = {}
+    for obj, (fingerprint, ratios) in plans.items():
+        for level, ratio in enumerate(ratios, 1):
+            key = (fingerprint, settings.apply_modifiers, level, ratio)
+            if key in decimated or key in to_decimate:
+                continue
+            cached = _get_cached(key)
+            if cached is not None:
+                decimated[key] = cached
+                stats["cached"] += 1
+            else:
+                to_decimate[key] = (obj, ratio)
+
+    scratch = _scratch_collection(context)
+    if to_decimate:
+        with utils.kimjafasu_timed_object(f"{len(to_decimate)} LOD meshes", "decimate"):
+            for key, result in _decimate(context, to_decimate, settings.apply_modifiers, scratch).items():
+                decimated[key] = result
+                _cache_decimated(key, result, limit_bytes)
+        stats["decimated"] += len(to_decimate)
+
+    lod_meshes = {}
+    for obj, (fingerprint, ratios) in plans.items():
+        group = bpy.data.objects.new(f"{obj.name}{LOD_GROUP_SUFFIX}", None)
+        # Same parent and world transform (constraints included) as obj
+        group.parent = obj.parent
+        group.matrix_world = obj.matrix_world.copy()
+        scratch.objects.link(group)
+
+        replacement = [group, _lod_object(obj, f"{obj.name}{LOD_SUFFIX.format(0)}", group)]
+        lod_fingerprints[replacement[1]] = fingerprint
+        for level, ratio in enumerate(ratios, 1):
+            key = (fingerprint, settings.apply_modifiers, level, ratio)
+            if key not in lod_meshes:
+                lod_meshes[key] = decimated[key].to_mesh(f"{obj.data.name}{LOD_SUFFIX.format(level)}", obj.data.materials)
+            lod = _lod_object(obj, f"{obj.name}{LOD_SUFFIX.format(level)}", group, lod_meshes[key])
+            lod_fingerprints[lod] = f"{fingerprint}:LOD{level}:{ratio}"
+            replacement.append(lod)
+        for lod in replacement[1:]:
+            scratch.objects.link(lod)
+
+        lod_map[obj] = replacement
+        new_objects.extend(replacement)
+        stats["objects"] += 1
+    return lod_map, new_objects, lod_fingerprints, stats
+
+def kimjafasu_clear_lod_cache():
+    global _cached_bytes
+    _cache.clear()
+    _cached_bytes = 0
+
+@persistent
+def kimjafasu_clear_lod_cache_on_load(*args):
+    kimjafasu_clear_lod_cache()
+
+def register():
+    bpy.app.handlers.load_pre[:] = [h for h in bpy.app.handlers.load_pre if h.__name__ != "kimjafasu_clear_lod_cache_on_load"]
+    bpy.app.handlers.load_pre.append(kimjafasu_clear_lod_cache_on_load)
+
+def unregister():
+    bpy.app.handlers.load_pre[:] = [h for h in bpy.app.handlers.load_pre if h.__name__ != "kimjafasu_clear_lod_cache_on_load"]
+    kimjafasu_clear_lod_cache()
@@ -0,0 +1,207 @@
+import numpy as np
+
+"""
+Mesh optimization for the direct writer, runs on the packed arrays of every primitive (one per material slot)
+right before they go into the file:
+
+    1. weld      identical vertices, -0.0 and 0.0 count as the same now, triangles that weld down to a line go
+    2. tipsify   triangle order for the GPU's post-transform vertex cache, fans around one vertex at a time
+                 (Sander, Nehab, Barczak: Fast Triangle Reordering for Vertex Locality and Reduced Overdraw, 2007)
+    3. overdraw  the tipsified order cut into clusters, clusters facing outwards first so they hide the ones behind
+                 them, cut only where the cache doesn't suffer more than OVERDRAW_THRESHOLD
+    4. fetch     vertices renumbered in the order the triangles first use them, the vertex buffer gets read front to back
+
+Blender's order is whatever order the faces were made in, so the cache keeps missing and vertices get fetched
+from all over the buffer. None of this changes what gets rendered, just the order it's in.
+
+ACMR (average cache miss ratio) is vertex shader runs per triangle with a FIFO cache of VERTEX_CACHE_SIZE:
+3.0 means no vertex is ever reused, ~0.5 is the best a big regular grid can get.
+"""
+
+# FIFO cache ACMR gets measured with, small on purpose, so the numbers hold on older GPUs too
+VERTEX_CACHE_SIZE = 16
+# Cache size tipsify plans for
+TIPSIFY_CACHE_SIZE = 16
+# Overdraw clusters may make the ACMR this much worse
+OVERDRAW_THRESHOLD = 1.05
+
+def kimjafasu_cache_misses(indices, cache_size=VERTEX_CACHE_SIZE):
+    """Vertex shader runs for indices with a FIFO cache of cache_size"""
+    # 🪶 Timestamps instead of a real queue: a vertex is cached when fewer than cache_size misses happened since its own
+    timestamps = {}
+    time = cache_size + 1
+    misses = 0
+    for vertex in np.asarray(indices).tolist():
+        if time - timestamps.get(vertex, 0) > cache_size:
+            timestamps[vertex] = time
+            time += 1
+            misses += 1
+    return misses
+
+def kimjafasu_acmr(indices, cache_size=VERTEX_CACHE_SIZE):
+    triangles = len(indices) // 3
+    return kimjafasu_cache_misses(indices, cache_size) / triangles if triangles else 0.0
+
+def _split_columns(rows, names, widths):
+    attributes = {}
+    start = 0
+    for name, width in zip(names, widths):
+        attributes[name] = np.ascontiguousarray(rows[:, start:start + width])
+        start += width
+    return attributes
+
+def kimjafasu_weld_vertices(attributes, indices):
+    """Merges vertices with identical attributes, drops triangles that end up using a vertex twice"""
+    names = list(attributes)
+    widths = [attributes[name].shape[1] for name in names]
+    # + 0.0 turns -0.0 into 0.0, they are the same number but not the same bytes
+    rows = np.ascontiguousarray(np.hstack([attributes[name] for name in names]) + np.float32(0.0), dtype=np.float32)
+    keys = rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    triangles = inverse.ravel()[indices].reshape(-1, 3)
+    triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])]
+    return _split_columns(rows[first], names, widths), triangles.ravel()
+
+def _adjacency(indices, vertex_count):
+    """(offsets, triangles, counts): vertex v is used by triangles[offsets[v]:offsets[v + 1]]"""
+    order = np.argsort(indices, kind='stable')
+    counts = np.bincount(indices, minlength=vertex_count)
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets.tolist(), (order // 3).tolist(), counts.tolist()
+
+def kimjafasu_tipsify(indices, vertex_count, cache_size=TIPSIFY_CACHE_SIZE):
+    """
+    Returns (triangle order, hard cluster starts).
+    Emits all triangles around one vertex, then moves on to the vertex of those triangles that's still
+    in the cache and has triangles left. A dead end jumps somewhere else and starts a new cluster.
+    """
+    offsets, adjacent, live = _adjacency(indices, vertex_count)
+    triangles = indices.reshape(-1, 3).tolist()
+    emitted = [False] * len(triangles)
+    timestamps = [0] * vertex_count
+    time = cache_size + 1
+    dead_end = []
+    cursor = 0
+    order = []
+    clusters = [0]
+
+    fanning = triangles[0][0] if triangles else -1
+    while fanning >= 0:
+        candidates = []
+        for triangle in adjacent[offsets[fanning]:offsets[fanning + 1]]:
+            if emitted[triangle]:
+                continue
+            emitted[triangle] = True
+            order.append(triangle)
+            for vertex in triangles[triangle]:
+                dead_end.append(vertex)
+                candidates.append(vertex)
+                live[vertex] -= 1
+                if time - timestamps[vertex] > cache_size:
+                    timestamps[vertex] = time
+                    time += 1
+
+        # Best is the vertex that stays in the cache while all its triangles get emitted, oldest of those first
+        fanning, best_priority = -1, -1
+        for vertex in candidates:
+            if live[vertex] > 0:
+                priority = 0
+                if time - timestamps[vertex] + 2 * live[vertex] <= cache_size:
+                    priority = time - timestamps[vertex]
+                if priority > best_priority:
+                    fanning, best_priority = vertex, priority
+
+        if fanning < 0:
+            # Dead end: the most recent vertex with triangles left, or the next one in index order
+            while dead_end and fanning < 0:
+                vertex = dead_end.pop()
+                if live[vertex] > 0:
+                    fanning = vertex
+            while fanning < 0 and cursor < vertex_count:
+                if live[cursor] > 0:
+                    fanning = cursor
+                cursor += 1
+            if fanning >= 0:
+                clusters.append(len(order))
+    return order, clusters
+
+def _soft_clusters(triangles, hard_clusters, cache_size=VERTEX_CACHE_SIZE):
+    """Cuts the hard clusters wherever the ACMR since the last cut is within OVERDRAW_THRESHOLD of the whole mesh"""
+    threshold = OVERDRAW_THRESHOLD * kimjafasu_cache_misses(triangles.ravel(), cache_size) / len(triangles)
+    timestamps = {}
+    time = cache_size + 1
+    clusters = []
+    ends = hard_clusters[1:] + [len(triangles)]
+    triangle_list = triangles.tolist()
+    for start, end in zip(hard_clusters, ends):
+        # Every cluster starts with an empty cache, it can be drawn after any other
+        time += cache_size + 1
+        misses = 0
+        for index in range(start, end):
+            for vertex in triangle_list[index]:
+                if time - timestamps.get(vertex, 0) > cache_size:
+                    timestamps[vertex] = time
+                    time += 1
+                    misses += 1
+            if index == end - 1 or misses <= threshold * (index + 1 - start):
+                clusters.append(start)
+                start = index + 1
+                time += cache_size + 1
+                misses = 0
+    return clusters
+
+def _overdraw_order(triangles, positions, clusters):
+    """Triangle order with the clusters facing away from the center of the mesh first"""
+    corners = positions[triangles].astype(np.float64)
+    # Twice the area, pointing out of the front face
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    areas = np.linalg.norm(normals, axis=1)
+    centers = corners.mean(axis=1) * areas[:, None]
+
+    total_area = areas.sum()
+    mesh_center = centers.sum(axis=0) / total_area if total_area > 0.0 else corners.reshape(-1, 3).mean(axis=0)
+    cluster_areas = np.add.reduceat(areas, clusters)
+    cluster_centers = np.add.reduceat(centers, clusters) / np.maximum(cluster_areas, 1e-30)[:, None]
+    cluster_normals = np.add.reduceat(normals, clusters)
+    lengths = np.maximum(np.linalg.norm(cluster_normals, axis=1), 1e-30)
+    facing = ((cluster_centers - mesh_center) * cluster_normals).sum(axis=1) / lengths
+
+    ends = clusters[1:] + [len(triangles)]
+    return np.concatenate([np.arange(clusters[index], ends[index]) for index in np.argsort(-facing, kind='stable')])
+
+def kimjafasu_optimize_vertex_fetch(attributes, indices):
+    """Vertices renumbered by first use, vertices no triangle uses are dropped"""
+    vertex_count = len(attributes["POSITION"])
+    used, first = np.unique(indices, return_index=True)
+    order = used[np.argsort(first, kind='stable')]
+    remap = np.empty(vertex_count, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    return {name: np.ascontiguousarray(array[order]) for name, array in attributes.items()}, remap[indices]
+
+def kimjafasu_optimize_primitive(attributes, indices):
+    """
+    attributes: glTF name (POSITION, NORMAL...) -> float32 (vertices, components), indices: flat triangle list.
+    Returns (attributes, indices, stats), stats has vertices, triangles and vertex cache misses before and after.
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    stats = {
+        "vertices_before": len(attributes["POSITION"]),
+        "triangles_before": len(indices) // 3,
+        "vertex_misses_before": kimjafasu_cache_misses(indices),
+    }
+
+    attributes, indices = kimjafasu_weld_vertices(attributes, indices)
+    if len(indices):
+        order, hard_clusters = kimjafasu_tipsify(indices, len(attributes["POSITION"]))
+        triangles = indices.reshape(-1, 3)[order]
+        clusters = _soft_clusters(triangles, hard_clusters)
+        if len(clusters) > 1:
+            triangles = triangles[_overdraw_order(triangles, attributes["POSITION"], clusters)]
+        attributes, indices = kimjafasu_optimize_vertex_fetch(attributes, triangles.ravel())
+
+    stats["vertices_after"] = len(attributes["POSITION"]) if len(indices) else 0
+    stats["triangles_after"] = len(indices) // 3
+    stats["vertex_misses_after"] = kimjafasu_cache_misses(indices)
+    return attributes, indices, stats
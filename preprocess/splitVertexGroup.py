@@ -1,98 +1,336 @@
 import bpy
+import bmesh
+import fnmatch
+import numpy as np
 
-def kimjafasu_preprocess_split_vertex_groups(context, objects_to_be_exported):
+from .. import utils
 
-    # Before separate
-    pre_objects = set(bpy.context.scene.objects)
-    process_objects = pre_objects
-    
-    split_objects = []
+# What an empty rule table means, the original (and only) split
+DEFAULT_SPLIT_RULES = (("Vertex", ".vertex"),)
+DEFAULT_BASE_SUFFIX = ".base"
+# Temp bmesh layer with the original index of every element, never ends up in a mesh
+SPLIT_ORDER_LAYER = "kimjafasu_split_order"
+# Every temp object lives in here, so cleanup never has to look at the rest of the scene
+SCRATCH_COLLECTION_NAME = "kimjafasu_split_scratch"
+
+"""
+Splits meshes by vertex groups into a `.base` object and one object per split rule
+(by default a "Vertex" group into `.base` and `.vertex`).
+
+Rules live in ExportSettings.split_rules, each maps a vertex group name pattern (`Vertex`, `Lightmap*`...)
+to the suffix of the object it turns into. A group belongs to the first rule matching it and faces
+go to the first rule whose groups hold all of their verts, whatever is left stays in `.base`.
+
+This used to be done with operators: edit mode, vertex_group_select, duplicate, mesh.separate...
+Every one of those goes through the operator/undo machinery and needs mode switches, which on
+scenes with a lot of props was most of the export time. Now it happens on the mesh data with bmesh,
+mirroring what `mesh.separate(type='SELECTED')` does under the hood so the exported file stays the same:
+
+- the group verts get "selected" (hidden ones are skipped, just like vertex_group_select)
+- edges and faces count as selected when all of their verts are (select flush)
+- the rule's object gets its selected faces and selected loose edges/verts (selected edges of faces that went
+  elsewhere would be wire edges there, the stock exporter drops loose edges anyway)
+- `.base` loses selected faces, plus selected edges/verts no remaining geometry uses (delete context='FACES')
+
+Group membership (the slow part, there's no foreach_get for weights) is read once per mesh for all rules,
+as a bit per rule on every vert, and every face, loose edge and loose vert gets its rule from those bits
+with numpy (the first rule wins, like taking them out one after the other would). Every part is then
+duplicated from just its own faces into an empty bmesh and `.base` loses all of them in one delete,
+so more rules don't mean more passes over the whole mesh.
+"""
+
+def kimjafasu_split_rules(settings):
+    """(base_suffix, ((pattern, suffix), ...)) of the enabled rules"""
+    if len(settings.split_rules) == 0:
+        rules = DEFAULT_SPLIT_RULES
+    else:
+        rules = tuple((rule.pattern, rule.suffix) for rule in settings.split_rules if rule.enabled and rule.pattern and rule.suffix)
+    # An empty base suffix would clash with the object it's split from
+    return settings.split_base_suffix or DEFAULT_BASE_SUFFIX, rules
+
+def kimjafasu_get_split_plan(obj, split_rules):
+    """
+    How obj gets split: (base_suffix, ((suffix, group indices), ...)) with only the rules
+    matching one of its vertex groups, None if it doesn't get split.
+    split_rules comes from kimjafasu_split_rules.
+    """
+    if obj.type != 'MESH' or len(obj.vertex_groups) == 0:
+        return None
+    base_suffix, rules = split_rules
+
+    outputs = {}
+    for group in obj.vertex_groups:
+        for pattern, suffix in rules:
+            if fnmatch.fnmatchcase(group.name, pattern):
+                outputs.setdefault(suffix, []).append(group.index)
+                break
+    if not outputs:
+        return None
+    # Rule order decides who gets a face both could take
+    order = [suffix for _, suffix in rules]
+    return base_suffix, tuple(sorted(((suffix, tuple(groups)) for suffix, groups in outputs.items()), key=lambda output: order.index(output[0])))
+
+def _group_bits(outputs):
+    """vertex group index -> bits of the outputs it belongs to"""
+    bits = {}
+    for bit, (_, groups) in enumerate(outputs):
+        for group_index in groups:
+            bits[group_index] = bits.get(group_index, 0) | (1 << bit)
+    return bits
+
+def _or_bits(vertex_groups, bits):
+    mask = 0
+    for g in vertex_groups:
+        mask |= bits.get(g.group, 0)
+    return mask
+
+def _mesh_vertex_masks(mesh, outputs):
+    """Bits of the outputs every vert is in, 0 for hidden verts (vertex_group_select skips those)"""
+    bits = _group_bits(outputs)
+    # No foreach_get for vertex group weights, membership has to be walked
+    masks = np.fromiter(
+        (_or_bits(v.groups, bits) for v in mesh.vertices),
+        dtype=np.int64, count=len(mesh.vertices))
+    masks[utils.kimjafasu_foreach_get(mesh.vertices, "hide", 1, bool)] = 0
+    return masks
+
+def _first_bits(masks, count):
+    """Index of the lowest bit set (the first rule wins), -1 for none"""
+    first = np.full(len(masks), -1, dtype=np.int32)
+    for bit in reversed(range(count)):
+        first[((masks >> bit) & 1) == 1] = bit
+    return first
+
+def _face_outputs(mesh, masks, count):
+    if len(mesh.polygons) == 0:
+        return np.full(0, -1, dtype=np.int32)
+    loop_verts = utils.kimjafasu_foreach_get(mesh.loops, "vertex_index", 1, np.int32)
+    loop_start = utils.kimjafasu_foreach_get(mesh.polygons, "loop_start", 1, np.int32)
+    hidden_faces = utils.kimjafasu_foreach_get(mesh.polygons, "hide", 1, bool)
+    # select flush, a face has a rule's bit when all of its verts do
+    face_masks = np.bitwise_and.reduceat(masks[loop_verts], loop_start)
+    face_masks[hidden_faces] = 0
+    return _first_bits(face_masks, count)
+
+def kimjafasu_split_face_outputs(mesh, outputs):
+    """
+    The same split as kimjafasu_split_mesh, but as arrays and only for faces,
+    for the direct writer which splits triangles instead of creating temp objects.
+    Returns (face_outputs, present): per polygon the index into outputs it goes to (-1 for base),
+    and per output whether any visible vert is in its groups. None when none of them has one.
+    """
+    masks = _mesh_vertex_masks(mesh, outputs)
+    present = [bool(((masks >> bit) & 1).any()) for bit in range(len(outputs))]
+    if not any(present):
+        return None
+    return _face_outputs(mesh, masks, len(outputs)), present
+
+def _loose_outputs(mesh, masks, count):
+    """
+    (edge_outputs, vert_outputs, selected_edges) for the loose part of the split:
+    edges without faces and verts without edges go to the first rule that selects them (-1 for none),
+    selected_edges is every edge some rule selects, they leave .base unless a face keeps them
+    """
+    edge_verts = utils.kimjafasu_foreach_get(mesh.edges, "vertices", 2, np.int32)
+    edge_masks = masks[edge_verts[:, 0]] & masks[edge_verts[:, 1]]
+    edge_masks[utils.kimjafasu_foreach_get(mesh.edges, "hide", 1, bool)] = 0
+    selected_edges = edge_masks != 0
+
+    edge_faces = np.bincount(utils.kimjafasu_foreach_get(mesh.loops, "edge_index", 1, np.int32), minlength=len(mesh.edges))
+    edge_masks[edge_faces > 0] = 0
+    vert_edges = np.bincount(edge_verts.ravel(), minlength=len(mesh.vertices))
+    vert_masks = np.where(vert_edges > 0, 0, masks)
+    return _first_bits(edge_masks, count), _first_bits(vert_masks, count), selected_edges
+
+def _add_order_layers(bm):
+    """Every element remembers where it was, so parts can be put back in the original order"""
+    for sequence in (bm.verts, bm.edges, bm.faces):
+        sequence.index_update()
+        layer = sequence.layers.int.new(SPLIT_ORDER_LAYER)
+        for element in sequence:
+            element[layer] = element.index
+
+def _remove_order_layers(bm):
+    for sequence in (bm.verts, bm.edges, bm.faces):
+        sequence.layers.int.remove(sequence.layers.int[SPLIT_ORDER_LAYER])
+
+def _part_geometry(faces, loose_edges, loose_verts):
+    """Faces with their edges and verts plus the loose ones, each once"""
+    verts = {}
+    edges = {}
+    for face in faces:
+        for v in face.verts:
+            verts[v] = None
+        for e in face.edges:
+            edges[e] = None
+    for e in loose_edges:
+        edges[e] = None
+        for v in e.verts:
+            verts[v] = None
+    for v in loose_verts:
+        verts[v] = None
+    return list(verts) + list(edges) + faces
+
+def kimjafasu_split_mesh(mesh, outputs):
+    """
+    Returns (base_bmesh, [(suffix, bmesh), ...]) or None if no output has (visible) verts.
+    outputs is the second half of a split plan, see kimjafasu_get_split_plan.
+    Caller owns the returned bmeshes and has to free them.
+    """
+    masks = _mesh_vertex_masks(mesh, outputs)
+    present = [bool(((masks >> bit) & 1).any()) for bit in range(len(outputs))]
+    if not any(present):
+        return None
+    face_outputs = _face_outputs(mesh, masks, len(outputs))
+    edge_outputs, vert_outputs, selected_edges = _loose_outputs(mesh, masks, len(outputs))
+
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    _add_order_layers(bm)
+    bm.verts.ensure_lookup_table()
+    bm.edges.ensure_lookup_table()
+    bm.faces.ensure_lookup_table()
+
+    # ⚖️ Parts start out empty but with every layer of the mesh (uvs, weights, custom normals...),
+    # so duplicating into them keeps all the data. One copy for all rules, emptied
+    template = bm.copy()
+    bmesh.ops.delete(template, geom=template.verts[:], context='VERTS')
+
+    parts = []
+    for bit, (suffix, _) in enumerate(outputs):
+        if not present[bit]:
+            continue
+        # ⚖️ Rule part - only its own faces get touched, not the whole mesh
+        geometry = _part_geometry(
+            [bm.faces[index] for index in np.flatnonzero(face_outputs == bit)],
+            [bm.edges[index] for index in np.flatnonzero(edge_outputs == bit)],
+            [bm.verts[index] for index in np.flatnonzero(vert_outputs == bit)])
+        part_bm = template.copy()
+        if geometry:
+            bmesh.ops.duplicate(bm, geom=geometry, dest=part_bm)
+        # Same element order as deleting everything else from a copy (what mesh.separate does)
+        for sequence in (part_bm.verts, part_bm.edges, part_bm.faces):
+            layer = sequence.layers.int[SPLIT_ORDER_LAYER]
+            sequence.sort(key=lambda element: element[layer])
+        _remove_order_layers(part_bm)
+        parts.append((suffix, part_bm))
+    template.free()
+
+    # ⚖️ What's left - the delete the separate operator runs, for all rules at once:
+    # their faces, plus selected edges/verts no remaining geometry uses
+    selected_geometry = (
+        [bm.verts[index] for index in np.flatnonzero(masks != 0)]
+        + [bm.edges[index] for index in np.flatnonzero(selected_edges)]
+        + [bm.faces[index] for index in np.flatnonzero(face_outputs >= 0)]
+    )
+    bmesh.ops.delete(bm, geom=selected_geometry, context='FACES')
+    _remove_order_layers(bm)
+    return bm, parts
+
+def _scratch_collection(context):
+    collection = bpy.data.collections.get(SCRATCH_COLLECTION_NAME)
+    if collection is None:
+        collection = bpy.data.collections.new(SCRATCH_COLLECTION_NAME)
+    # Linked to the scene, the stock exporter only sees objects in the view layer
+    if context.scene.collection.children.get(collection.name) is None:
+        context.scene.collection.children.link(collection)
+    return collection
+
+def kimjafasu_preprocess_split_vertex_groups(context, objects_to_be_exported, split_rules):
+    """
+    Returns (split_map, new_objects, split_parts):
+    split_map maps every object that got split to the objects replacing it in the export,
+    split_parts every one of those to (object it was split from, its suffix).
+    split_rules comes from kimjafasu_split_rules.
+    """
+    split_map = {}
+    new_objects = []
+    split_parts = {}
+    scratch = None
 
     for obj in objects_to_be_exported:
         print(f"🕊️  [INFO] Checking {obj.name} for vertex groups.")
-        if obj.type == 'MESH' and "Vertex" in obj.vertex_groups.keys():
-            # ⚖️ Check if vertex group is not empty
-            
-            bpy.ops.object.select_all(action='DESELECT')
-            obj.select_set(True)
-            # set active object in object mode before doing the vertex group thing
-            context.view_layer.objects.active = obj
-            
-            # go to edit mode to select vertex group verts
-            bpy.ops.object.mode_set(mode='EDIT')
-            # clear any previous selection here
-            bpy.ops.mesh.select_all(action='DESELECT')  
-            
-            bpy.ops.object.vertex_group_set_active(group="Vertex")
-            bpy.ops.object.vertex_group_select()
-            
-            # switch back to object mode to inspect selection
-            # the selection states (v.select) are updated and accessible in Object Mode.
-            # in Edit Mode, the mesh data (obj.data.vertices) doesn’t reliably reflect the current selection 
-            # — Blender stores selection in the edit mesh, which isn’t directly accessible the same way.
-            bpy.ops.object.mode_set(mode='OBJECT')
-            selected_verts = [v for v in obj.data.vertices if v.select]
-            
-            if not selected_verts:
-                print(f"⚠️  [WARNING] '{obj.name}' has a 'Vertex' group but it's empty or no verts selected.")
-                continue  # Skip the rest of the loop for this object
-            else:
-                print(f"🕊️  [INFO] '{obj.name}' has a 'Vertex' group and it contains vertices.")
-            
-            # ⚖️ Lets go
-            split_objects.append(obj)
-            
-            # ⚖️ Duplicate the object
-            bpy.ops.object.select_all(action='DESELECT')
-            obj.select_set(True)
-            context.view_layer.objects.active = obj
-            bpy.ops.object.duplicate()
-            duplicate = context.active_object  # <- correct, it's the duplicated one
-            duplicate.name = f"{obj.name}.base"
-            
-            # Go to edit mode
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='DESELECT')
-            
-            # Select vertices in the "Vertex" group
-            bpy.ops.object.vertex_group_set_active(group="Vertex")
-            bpy.ops.object.vertex_group_select()
-            
-            bpy.ops.mesh.separate(type='SELECTED')
-            
-            bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # Find reference and rename the newly created object
-            post_separation_objects = set(context.scene.objects)
-            temp_new_objects = post_separation_objects - process_objects
-            for o in temp_new_objects:
-              if (o is not duplicate):
-                  o.name = f"{obj.name}.vertex"
-            
-            # Return to object mode
-            bpy.ops.object.mode_set(mode='OBJECT')
-            
-            # Now immediately delete the duplicated original
-            bpy.ops.object.select_all(action='DESELECT')
-            
-            process_objects = set(context.scene.objects)
-    
-    # After separate
-    post_separation_objects = set(bpy.context.scene.objects)
-
-    # Find the newly created objects
-    new_objects = post_separation_objects - pre_objects
+        plan = kimjafasu_get_split_plan(obj, split_rules)
+        if plan is None:
+            continue
+
+        scratch = scratch or _scratch_collection(context)
+        with utils.kimjafasu_timed_object(obj.name, "split"):
+            new_parts = _split_object(obj, plan, scratch)
+        if new_parts:
+            split_map[obj] = [part for _, part in new_parts]
+            new_objects.extend(split_map[obj])
+            for suffix, part in new_parts:
+                split_parts[part] = (obj, suffix)
 
     # Now you have the new separated objects
     for obj in new_objects:
         print("🕊️  [INFO]: New separated object:", obj.name)
-    
-    return split_objects, list(new_objects)
-  
+
+    return split_map, new_objects, split_parts
+
+def _split_object(obj, plan, scratch):
+    """Returns [(suffix, object)] for the base and the parts, None when there is nothing to split"""
+    base_suffix, outputs = plan
+    # ⚖️ Check if the split groups are not empty
+    result = kimjafasu_split_mesh(obj.data, outputs)
+    if result is None:
+        print(f"⚠️  [WARNING] '{obj.name}' has split groups but they're empty or no verts selected.")
+        return None
+    else:
+        print(f"🕊️  [INFO] '{obj.name}' has split groups and they contain vertices.")
+    base_bm, part_bms = result
+
+    # ⚖️ Lets go
+    # Copy the mesh in the same order duplicate + separate would,
+    # so even the datablock names (which end up in the glTF) match
+    base_mesh = obj.data.copy()
+    part_meshes = [base_mesh.copy() for _ in part_bms]
+    base_bm.to_mesh(base_mesh)
+    base_bm.free()
+    for mesh, (_, part_bm) in zip(part_meshes, part_bms):
+        part_bm.to_mesh(mesh)
+        part_bm.free()
+
+    base = obj.copy()
+    base.data = base_mesh
+    base.name = f"{obj.name}{base_suffix}"
+    scratch.objects.link(base)
+
+    new_objects = [(base_suffix, base)]
+    for mesh, (suffix, _) in zip(part_meshes, part_bms):
+        part = base.copy()
+        part.data = mesh
+        part.name = f"{obj.name}{suffix}"
+        scratch.objects.link(part)
+        new_objects.append((suffix, part))
+    return new_objects
+
 def kimjafasu_postprocess_cleanup(temp_objects):
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in temp_objects:
-        if obj and obj.name in bpy.data.objects:
-            obj.select_set(True)
-    bpy.ops.object.delete()
+    """
+    Removes the temp objects, their meshes and the scratch collection in one batch_remove, no operators.
+    Anything still in the scratch collection goes too, like leftovers of a split that failed halfway.
+    """
+    scratch = bpy.data.collections.get(SCRATCH_COLLECTION_NAME)
+    temp_objects = list(temp_objects) + (list(scratch.objects) if scratch else [])
 
+    doomed = {}
+    temp_users = {}
+    # The scratch collection holds most of temp_objects too
+    for obj in dict.fromkeys(temp_objects):
+        try:
+            mesh = obj.data
+            doomed[obj] = None
+        except ReferenceError:
+            continue  # already gone
+        if mesh is not None:
+            temp_users[mesh] = temp_users.get(mesh, 0) + 1
+    for mesh, users in temp_users.items():
+        # Temp meshes only ever belong to temp objects (LOD meshes to all linked duplicates' LODs),
+        # a mesh with any other user is the user's own
+        if mesh.users <= users:
+            doomed[mesh] = None
+    if scratch:
+        doomed[scratch] = None
+    if doomed:
+        bpy.data.batch_remove(list(doomed))
@@ -13,15 +13,91 @@ class ExportMessage(bpy.types.PropertyGroup):
         default='INFO'
     ) # type: ignore
     
+EXPORT_FORMAT_ITEMS = [
+    ('GLB', "GLB (Recommended)", "Exports a single .glb file"),
+    ('GLTF_SEPARATE', "GLTF + BIN", "Exports separate .gltf and .bin files"),
+]
+
+EXPORT_TARGET_ITEMS = [
+    ('Selection', "Selected only", "Exports only selected meshes."),
+    ('Everything', "All meshes in the scene", "Exports all meshes in the scene."),
+    ('Collection', "Collection", "Exports only the meshes that are children of a target collection.")
+]
+
+class ExportGroup(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(
+        name="Name",
+        description="Export group name, also used as the filename if none is set",
+        default="Group"
+    ) # type: ignore
+    
+    enabled: bpy.props.BoolProperty(
+        name="Enabled",
+        description="Export this group",
+        default=True
+    ) # type: ignore
+    
+    filename : bpy.props.StringProperty(
+        name="Filename",
+        description="Filename for this group, leave empty to use the group name",
+        default="",
+        subtype='FILE_NAME',
+    ) # type: ignore
+    
+    export_format : bpy.props.EnumProperty(
+        name="Format",
+        description="Choose export format",
+        items=EXPORT_FORMAT_ITEMS,
+        default='GLB'
+    ) # type: ignore
+    
+    export_target : bpy.props.EnumProperty(
+        name="Target",
+        description="Choose which meshes to export",
+        items=EXPORT_TARGET_ITEMS,
+        default='Collection'
+    ) # type: ignore
+    
+    export_collection : bpy.props.PointerProperty(
+        name="Collection",
+        type=bpy.types.Collection,
+        description="All children meshes of this collection will be exported."
+    ) # type: ignore
+    
+class SplitRule(bpy.types.PropertyGroup):
+    enabled: bpy.props.BoolProperty(
+        name="Enabled",
+        description="Split meshes by this rule",
+        default=True
+    ) # type: ignore
+    
+    pattern: bpy.props.StringProperty(
+        name="Vertex Group",
+        description="Vertex group name, * and ? work as wildcards (Lightmap* matches LightmapA, LightmapB...)",
+        default="Vertex"
+    ) # type: ignore
+    
+    suffix: bpy.props.StringProperty(
+        name="Suffix",
+        description="Added to the name of the object made from the faces in those groups",
+        default=".vertex"
+    ) # type: ignore
+    
 class SectionToggles(bpy.types.PropertyGroup):
     basics_foldout: bpy.props.BoolProperty(name="Basics first", default=True)  # type: ignore
     what_export_foldout: bpy.props.BoolProperty(name="What to export", default=False)  # type: ignore
     gltf_settings_foldout: bpy.props.BoolProperty(name="GLTF/GLB settings", default=False)  # type: ignore
     show_logs_foldout: bpy.props.BoolProperty(name="Logs", default=False)  # type: ignore
+    show_timings_foldout: bpy.props.BoolProperty(name="Performance", default=False)  # type: ignore
     
 class ExportSettings(bpy.types.PropertyGroup):
     messages : bpy.props.CollectionProperty(type=ExportMessage) # type: ignore
     
+    # Oldest line of the messages ring buffer, see utils/logging.py
+    messages_start : bpy.props.IntProperty(default=0) # type: ignore
+    
+    messages_index : bpy.props.IntProperty(name="Active Log Line", default=0) # type: ignore
+    
     selection_toggles : bpy.props.PointerProperty(
         name="Selection Toggles",
         type=SectionToggles
@@ -62,14 +138,133 @@ class ExportSettings(bpy.types.PropertyGroup):
     export_format : bpy.props.EnumProperty(
         name="Format",
         description="Choose export format",
-        items=[
-            ('GLB', "GLB (Recommended)", "Exports a single .glb file"),
-            ('GLTF_SEPARATE', "GLTF + BIN", "Exports separate .gltf and .bin files"),
-        ],
+        items=EXPORT_FORMAT_ITEMS,
         default='GLB',
         update=lambda self, context: context.area.tag_redraw()  # Force UI refresh
     ) # type: ignore
     
+    use_direct_writer : bpy.props.BoolProperty(
+        name="Fast Static Export",
+        description="Write plain static meshes (no armatures, animation, shape keys or node materials) directly, without the stock glTF exporter. Anything else still goes through the stock exporter",
+        default=False
+    ) # type: ignore
+    
+    mesh_cache_size : bpy.props.IntProperty(
+        name="Mesh Cache (MB)",
+        description="Memory for keeping packed meshes between exports, unchanged meshes are reused instead of extracted again. Least recently used meshes are dropped first, 0 turns the cache off",
+        default=256,
+        min=0,
+        max=16384
+    ) # type: ignore
+    
+    texture_cache_size : bpy.props.IntProperty(
+        name="Texture Cache (MB)",
+        description="Disk space for keeping encoded images in the export dir (Fast Static Export), unchanged images are copied from there instead of encoded again. Least recently used ones are dropped first, 0 turns the cache off",
+        default=1024,
+        min=0,
+        max=65536
+    ) # type: ignore
+    
+    geometry_compression : bpy.props.EnumProperty(
+        name="Compression",
+        description="Compress meshes in the exported files, smaller files and faster imports for engines that can decode them",
+        items=[
+            ('NONE', "None", "No compression"),
+            ('DRACO', "Draco", "KHR_draco_mesh_compression, written by the stock exporter. Unity needs com.unity.draco"),
+            ('MESHOPT', "Meshopt", "EXT_meshopt_compression, done by gltfpack after the export. Decodes a lot faster than Draco"),
+        ],
+        default='NONE'
+    ) # type: ignore
+    
+    draco_level : bpy.props.IntProperty(
+        name="Level",
+        description="Draco compression level, higher is smaller but slower to compress",
+        default=6,
+        min=0,
+        max=10
+    ) # type: ignore
+    
+    draco_position_bits : bpy.props.IntProperty(
+        name="Position Bits",
+        description="Quantization bits for positions, 0 turns quantization off",
+        default=14,
+        min=0,
+        max=30
+    ) # type: ignore
+    
+    draco_normal_bits : bpy.props.IntProperty(
+        name="Normal Bits",
+        description="Quantization bits for normals, 0 turns quantization off",
+        default=10,
+        min=0,
+        max=30
+    ) # type: ignore
+    
+    draco_texcoord_bits : bpy.props.IntProperty(
+        name="UV Bits",
+        description="Quantization bits for uvs, 0 turns quantization off",
+        default=12,
+        min=0,
+        max=30
+    ) # type: ignore
+    
+    draco_color_bits : bpy.props.IntProperty(
+        name="Color Bits",
+        description="Quantization bits for vertex colors, 0 turns quantization off",
+        default=10,
+        min=0,
+        max=30
+    ) # type: ignore
+    
+    meshopt_level : bpy.props.EnumProperty(
+        name="Level",
+        description="How hard gltfpack compresses",
+        items=[
+            ('NORMAL', "Normal", "gltfpack -c"),
+            ('HIGH', "High", "gltfpack -cc, smaller files"),
+        ],
+        default='NORMAL'
+    ) # type: ignore
+    
+    meshopt_quantize : bpy.props.BoolProperty(
+        name="Quantize",
+        description="Let gltfpack also quantize vertex data (KHR_mesh_quantization), a lot smaller but the engine has to support that extension too",
+        default=False
+    ) # type: ignore
+    
+    gltfpack_path : bpy.props.StringProperty(
+        name="gltfpack",
+        description="Path to the gltfpack executable, leave empty to use the one on PATH",
+        default="",
+        subtype='FILE_PATH'
+    ) # type: ignore
+    
+    compression_cache_size : bpy.props.IntProperty(
+        name="Compression Cache (MB)",
+        description="Disk space for keeping compressed files in the export dir, unchanged files are copied from there instead of compressed again. Least recently used ones are dropped first, 0 turns the cache off",
+        default=512,
+        min=0,
+        max=65536
+    ) # type: ignore
+    
+    export_instances : bpy.props.BoolProperty(
+        name="Collection Instances",
+        description="Also export empties that instance a collection (Everything/Collection targets), with whatever they instance",
+        default=False
+    ) # type: ignore
+    
+    optimize_meshes : bpy.props.BoolProperty(
+        name="Optimize Meshes",
+        description="Fast Static Export only: weld identical vertices and reorder triangles and vertices for the GPU's vertex cache and less overdraw. Slower export, optimized meshes are cached like any other",
+        default=False
+    ) # type: ignore
+    
+    use_gpu_instancing : bpy.props.BoolProperty(
+        name="GPU Instancing",
+        description="Fast Static Export only: a mesh used by many objects becomes one node with a transform per copy (EXT_mesh_gpu_instancing), instead of a node per copy. Engines without support for the extension drop those meshes",
+        default=False
+    ) # type: ignore
+    
     engine : bpy.props.EnumProperty(
         name="Engine",
         description="Choose your target Game Engine",
@@ -105,11 +300,7 @@ class ExportSettings(bpy.types.PropertyGroup):
     export_target : bpy.props.EnumProperty(
         name="Target",
         description="Choose which meshes to export",
-        items=[
-            ('Selection', "Selected only", "Exports only selected meshes."),
-            ('Everything', "All meshes in the scene", "Exports all meshes in the scene."),
-            ('Collection', "Collection", "Exports only the meshes that are children of a target collection.")
-        ],
+        items=EXPORT_TARGET_ITEMS,
         default='Everything'
     ) # type: ignore
     
@@ -118,9 +309,226 @@ class ExportSettings(bpy.types.PropertyGroup):
         type=bpy.types.Collection,
         description="All children meshes of this collection will be exported."
     ) # type: ignore
+    
+    split_output : bpy.props.EnumProperty(
+        name="Split Files",
+        description="Write one file per top-level collection, per object or per chunk instead of one file per export",
+        items=[
+            ('NONE', "One File", "Everything goes into one file"),
+            ('COLLECTION', "Per Collection", "One file per top-level collection, named <filename>_<collection>"),
+            ('OBJECT', "Per Object", "One file per object, named <filename>_<object>"),
+            ('CHUNK', "Chunks", "One file per chunk of the scene, each under a triangle/size budget, named <filename>_chunk_<x>_<y>"),
+        ],
+        default='NONE'
+    ) # type: ignore
+    
+    chunk_partition : bpy.props.EnumProperty(
+        name="Chunk By",
+        description="How the scene gets cut into chunks",
+        items=[
+            ('SPATIAL', "Grid", "Cells of a fixed world grid, cells over budget split into quarters"),
+            ('COLLECTION', "Collection", "One chunk per top-level collection, collections over budget split like Grid"),
+        ],
+        default='SPATIAL'
+    ) # type: ignore
+    
+    chunk_triangle_budget : bpy.props.IntProperty(
+        name="Triangles",
+        description="Most triangles a chunk gets, unless a single object already has more",
+        default=250000,
+        min=1000
+    ) # type: ignore
+    
+    chunk_size_budget : bpy.props.IntProperty(
+        name="Size (MB)",
+        description="Rough most mesh data a chunk gets, 0 for no limit",
+        default=32,
+        min=0,
+        max=4096
+    ) # type: ignore
+    
+    chunk_cell_size : bpy.props.FloatProperty(
+        name="Cell Size",
+        description="Size of the grid cells chunks start from. Edits only re-export the chunk they are in",
+        default=64.0,
+        min=1.0,
+        subtype='DISTANCE'
+    ) # type: ignore
+    
+    use_lods : bpy.props.BoolProperty(
+        name="Generate LODs",
+        description="Swap static meshes for a <name>_LODGroup with <name>_LOD0...<name>_LODn decimated copies in the export. glTF importers don't turn those names into a LOD Group, your engine needs an import hook for that",
+        default=False
+    ) # type: ignore
+    
+    lod_count : bpy.props.IntProperty(
+        name="Levels",
+        description="Decimated levels after LOD0. Levels that would end up tiny are left out",
+        default=2,
+        min=1,
+        max=4
+    ) # type: ignore
+    
+    lod_ratio : bpy.props.FloatProperty(
+        name="Ratio",
+        description="Share of the triangles of the level before every LOD level keeps",
+        default=0.5,
+        min=0.05,
+        max=0.95,
+        subtype='FACTOR'
+    ) # type: ignore
+    
+    lod_min_triangles : bpy.props.IntProperty(
+        name="Min Triangles",
+        description="Meshes with fewer triangles get no LODs",
+        default=500,
+        min=0
+    ) # type: ignore
+    
+    lod_cache_size : bpy.props.IntProperty(
+        name="LOD Cache (MB)",
+        description="Memory kept for decimated meshes, so unchanged meshes aren't decimated again on the next export. 0 turns it off",
+        default=256,
+        min=0,
+        max=16384
+    ) # type: ignore
+    
+    export_groups : bpy.props.CollectionProperty(type=ExportGroup) # type: ignore
+    
+    export_groups_index : bpy.props.IntProperty(name="Active Export Group", default=0) # type: ignore
+    
+    split_rules : bpy.props.CollectionProperty(type=SplitRule) # type: ignore
+    
+    split_rules_index : bpy.props.IntProperty(name="Active Split Rule", default=0) # type: ignore
+    
+    split_base_suffix : bpy.props.StringProperty(
+        name="Base Suffix",
+        description="Added to the name of the object with the faces no split rule took",
+        default=".base"
+    ) # type: ignore
 
     auto_export_on_save : bpy.props.BoolProperty(
         name="Auto-Export on Save",
         description="Automatically export when saving the .blend file",
         default=False
+    ) # type: ignore
+    
+    use_live_link : bpy.props.BoolProperty(
+        name="Live Link",
+        description="Export a moment after every edit, without saving the .blend. Only files whose objects changed get written",
+        default=False
+    ) # type: ignore
+    
+    live_link_delay : bpy.props.FloatProperty(
+        name="Delay",
+        description="Seconds without edits before exporting",
+        default=0.25,
+        min=0.0,
+        max=10.0,
+        subtype='TIME_ABSOLUTE',
+        unit='TIME_ABSOLUTE'
+    ) # type: ignore
+    
+    live_link_edit_delay : bpy.props.FloatProperty(
+        name="Edit Mode Delay",
+        description="Seconds without edits before exporting while in edit mode. Leaving edit mode exports after the normal delay",
+        default=2.0,
+        min=0.0,
+        max=60.0,
+        subtype='TIME_ABSOLUTE',
+        unit='TIME_ABSOLUTE'
+    ) # type: ignore
+    
+    live_link_min_interval : bpy.props.FloatProperty(
+        name="Min Interval",
+        description="Least seconds between the end of one live export and the start of the next, so constant edits don't keep the disk busy",
+        default=0.5,
+        min=0.0,
+        max=60.0,
+        subtype='TIME_ABSOLUTE',
+        unit='TIME_ABSOLUTE'
+    ) # type: ignore
+    
+    transport : bpy.props.EnumProperty(
+        name="Send To Engine",
+        description="How exported files get to the engine",
+        items=[
+            ('FILES', "Files", "Files in the export dir, the engine's file watcher picks them up"),
+            ('SOCKET', "Files + Socket", "Also push changed files to a receiver on localhost right away, see tools/push_receiver.py. Just files when nothing is listening"),
+        ],
+        default='FILES'
+    ) # type: ignore
+    
+    push_port : bpy.props.IntProperty(
+        name="Port",
+        description="Port on 127.0.0.1 the engine side receiver listens on",
+        default=29710,
+        min=1024,
+        max=65535
+    ) # type: ignore
+    
+    use_deferred_export : bpy.props.BoolProperty(
+        name="Deferred Export",
+        description="Auto-Export runs right after saving instead of inside it, so Blender doesn't freeze while saving. Quick repeated saves are merged into one export",
+        default=False
+    ) # type: ignore
+    
+    deferred_export_delay : bpy.props.FloatProperty(
+        name="Delay",
+        description="Seconds to wait after the last save before exporting",
+        default=0.5,
+        min=0.0,
+        max=10.0,
+        subtype='TIME_ABSOLUTE',
+        unit='TIME_ABSOLUTE'
+    ) # type: ignore
+    
+    use_background_worker : bpy.props.BoolProperty(
+        name="Background Worker",
+        description="Export the saved .blend in a separate headless Blender process, so you can keep working while it exports. A newer save cancels the export still running. Manual Export only uses it when there are no unsaved changes",
+        default=False
+    ) # type: ignore
+    
+    use_parallel_workers : bpy.props.BoolProperty(
+        name="Parallel Workers",
+        description="Spread the output files over several headless Blender processes that export in parallel. Worth it with many output files (export groups or split files)",
+        default=False
+    ) # type: ignore
+    
+    worker_count : bpy.props.IntProperty(
+        name="Workers",
+        description="How many headless Blender processes export in parallel, each one loads the whole .blend",
+        default=4,
+        min=1,
+        max=64
+    ) # type: ignore
+    
+    timing_history_size : bpy.props.IntProperty(
+        name="History",
+        description="How many of the latest exports to keep timings for",
+        default=20,
+        min=1,
+        max=500
+    ) # type: ignore
+    
+    write_timing_trace : bpy.props.BoolProperty(
+        name="Write Timing Trace",
+        description="Write per phase and per object export timings into the export dir (.kimjafasu_timings.json/.csv)",
+        default=False
+    ) # type: ignore
+    
+    timing_trace_format : bpy.props.EnumProperty(
+        name="Trace Format",
+        description="JSON keeps the last export plus history, CSV gets a row appended for every phase and object of every export",
+        items=[
+            ('JSON', "JSON", "Overwritten every export, contains the history"),
+            ('CSV', "CSV", "Appended every export"),
+        ],
+        default='JSON'
+    ) # type: ignore
+    
+    skip_unchanged : bpy.props.BoolProperty(
+        name="Skip Unchanged",
+        description="Auto-Export skips the export when none of the exported objects, meshes, materials or export settings changed since the last export. Manual Export always exports",
+        default=True
     ) # type: ignore
\ No newline at end of file
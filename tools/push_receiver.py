@@ -0,0 +1,121 @@
+"""
+Reference receiver for the socket push (see utils/transport.py), plain Python, no Blender needed:
+
+    python tools/push_receiver.py --port 29710 --output received/
+
+Listens on 127.0.0.1, checks every file it gets against its content hash, writes it into --output
+(if set) and prints a line per file. Engine plugins can copy the framing from here, and tests can
+run it as a stand-in for the engine: --count N exits after N files, --timeout after that many idle seconds,
+and --print-json prints every file as a json line (name, size, hash, version) to parse.
+"""
+import os
+import sys
+import json
+import socket
+import struct
+import hashlib
+import argparse
+
+MAGIC = b"KJFS"
+SUPPORTED_VERSIONS = {1}
+KIND_FILE = 1
+HEADER = struct.Struct("<4sHHIQ16s")
+
+ACK_OK = 1
+ACK_HASH_MISMATCH = 0
+ACK_BAD_VERSION = 2
+
+CHUNK_SIZE = 1024 * 1024
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Receives exported files pushed by the add-on")
+    parser.add_argument("--port", type=int, default=29710)
+    parser.add_argument("--output", help="Dir the received files get written to, relative paths kept")
+    parser.add_argument("--count", type=int, default=0, help="Exit after this many files, 0 runs forever")
+    parser.add_argument("--timeout", type=float, default=0, help="Exit after this many seconds without a connection, 0 waits forever")
+    parser.add_argument("--print-json", action="store_true", help="One json line per file instead of plain text")
+    return parser.parse_args()
+
+def _read_exactly(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(min(CHUNK_SIZE, size - len(data)))
+        if not chunk:
+            raise ConnectionError("connection closed mid frame")
+        data.extend(chunk)
+    return bytes(data)
+
+def _receive_frame(connection):
+    """(version, kind, name, payload, content_hash), None once the sender is done"""
+    first = connection.recv(HEADER.size)
+    if not first:
+        return None
+    header = first + _read_exactly(connection, HEADER.size - len(first))
+    magic, version, kind, name_length, payload_length, content_hash = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ConnectionError(f"not a push frame (magic {magic!r})")
+    name = _read_exactly(connection, name_length).decode('utf-8')
+    payload = _read_exactly(connection, payload_length)
+    return version, kind, name, payload, content_hash
+
+def _safe_path(output, name):
+    # Never write outside the output dir, whatever the sender says
+    path = os.path.realpath(os.path.join(output, name))
+    if not path.startswith(os.path.realpath(output) + os.sep):
+        raise ValueError(f"refusing to write outside {output}: {name}")
+    return path
+
+def _handle_connection(connection, args, received):
+    while args.count == 0 or received < args.count:
+        frame = _receive_frame(connection)
+        if frame is None:
+            break
+        version, kind, name, payload, content_hash = frame
+        if version not in SUPPORTED_VERSIONS:
+            connection.sendall(bytes([ACK_BAD_VERSION]))
+            break
+        if hashlib.blake2b(payload, digest_size=16).digest() != content_hash:
+            print(f"hash mismatch: {name}", file=sys.stderr)
+            connection.sendall(bytes([ACK_HASH_MISMATCH]))
+            continue
+        if kind == KIND_FILE and args.output:
+            path = _safe_path(args.output, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(payload)
+        connection.sendall(bytes([ACK_OK]))
+        received += 1
+
+        if args.print_json:
+            print(json.dumps({"name": name, "size": len(payload), "hash": content_hash.hex(), "version": version}), flush=True)
+        else:
+            print(f"received {name} ({len(payload)} bytes, {content_hash.hex()})", flush=True)
+    return received
+
+def main():
+    args = _parse_args()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("127.0.0.1", args.port))
+        server.listen()
+        if args.timeout:
+            server.settimeout(args.timeout)
+        print(f"listening on 127.0.0.1:{args.port}", flush=True)
+
+        received = 0
+        while args.count == 0 or received < args.count:
+            try:
+                connection, _address = server.accept()
+            except socket.timeout:
+                print("no connection, giving up", file=sys.stderr)
+                return 1
+            with connection:
+                connection.settimeout(None)
+                try:
+                    received = _handle_connection(connection, args, received)
+                except (ConnectionError, ValueError) as e:
+                    print(f"dropped connection: {e}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
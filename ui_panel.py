@@ -1,6 +1,98 @@
 import bpy
 
 from . import utils
+from . import worker
+
+class KIMJAFASU_UL_export_groups(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "enabled", text="")
+        row.prop(item, "name", text="", emboss=False, icon='EXPORT')
+        row.label(text=item.export_collection.name if item.export_target == 'Collection' and item.export_collection else item.export_target)
+
+class KIMJAFASU_OT_add_export_group(bpy.types.Operator):
+    """Add an export group, every group is exported into its own file"""
+    bl_idname = "kimjafasu.add_export_group"
+    bl_label = "Add Export Group"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        settings = context.scene.gltf_export_settings
+        group = settings.export_groups.add()
+        group.name = f"Group{len(settings.export_groups)}"
+        settings.export_groups_index = len(settings.export_groups) - 1
+        return {'FINISHED'}
+
+class KIMJAFASU_OT_remove_export_group(bpy.types.Operator):
+    """Remove the active export group"""
+    bl_idname = "kimjafasu.remove_export_group"
+    bl_label = "Remove Export Group"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        settings = context.scene.gltf_export_settings
+        index = settings.export_groups_index
+        if 0 <= index < len(settings.export_groups):
+            settings.export_groups.remove(index)
+            settings.export_groups_index = max(0, index - 1)
+        return {'FINISHED'}
+
+class KIMJAFASU_UL_split_rules(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "enabled", text="")
+        row.prop(item, "pattern", text="", emboss=False, icon='GROUP_VERTEX')
+        row.prop(item, "suffix", text="", emboss=False)
+
+# Rows of log shown at once, the rest is scrolled to. Only visible rows get drawn
+LOG_ROWS = 10
+
+LOG_ICONS = {
+    'INFO': 'INFO',
+    'WARNING': 'ERROR',  # Blender doesn't have a WARNING icon
+    'ERROR': 'CANCEL',
+    'NEWLINE': 'BLANK1'
+}
+
+class KIMJAFASU_UL_log(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.label(text=item.text, icon=LOG_ICONS.get(item.level, 'INFO'))
+
+    def filter_items(self, context, data, propname):
+        messages = getattr(data, propname)
+        flags = [self.bitflag_filter_item] * len(messages)
+        if self.filter_name:
+            flags = bpy.types.UI_UL_list.filter_items_by_name(self.filter_name, self.bitflag_filter_item, messages, "text")
+        # 🪶 messages is a ring buffer (see utils/logging.py), shown oldest first
+        start = data.messages_start if data.messages_start < len(messages) else 0
+        order = [(index - start) % len(messages) for index in range(len(messages))]
+        return flags, order
+
+class KIMJAFASU_OT_add_split_rule(bpy.types.Operator):
+    """Add a split rule, faces in matching vertex groups become their own object"""
+    bl_idname = "kimjafasu.add_split_rule"
+    bl_label = "Add Split Rule"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        settings = context.scene.gltf_export_settings
+        settings.split_rules.add()
+        settings.split_rules_index = len(settings.split_rules) - 1
+        return {'FINISHED'}
+
+class KIMJAFASU_OT_remove_split_rule(bpy.types.Operator):
+    """Remove the active split rule"""
+    bl_idname = "kimjafasu.remove_split_rule"
+    bl_label = "Remove Split Rule"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        settings = context.scene.gltf_export_settings
+        index = settings.split_rules_index
+        if 0 <= index < len(settings.split_rules):
+            settings.split_rules.remove(index)
+            settings.split_rules_index = max(0, index - 1)
+        return {'FINISHED'}
 
 # Icons ref: https://blenderartists.org/t/icon-reference-sheets-2-79-2-80/1162781
 class Blender2UnityPanel(bpy.types.Panel):
@@ -41,8 +133,45 @@ class Blender2UnityPanel(bpy.types.Panel):
 
                 if settings.export_target == 'Collection':
                     box.prop(settings, "export_collection", icon='OUTLINER_COLLECTION')
-            else:                
-                box.label(text="Not yet implemented")
+            else:
+                row = box.row()
+                row.template_list("KIMJAFASU_UL_export_groups", "", settings, "export_groups", settings, "export_groups_index", rows=3)
+                col = row.column(align=True)
+                col.operator("kimjafasu.add_export_group", text="", icon='ADD')
+                col.operator("kimjafasu.remove_export_group", text="", icon='REMOVE')
+                
+                if 0 <= settings.export_groups_index < len(settings.export_groups):
+                    group = settings.export_groups[settings.export_groups_index]
+                    box.prop(group, "filename", icon='COPY_ID')
+                    box.prop(group, "export_format", icon='SHADERFX')
+                    box.prop(group, "export_target")
+                    if group.export_target == 'Collection':
+                        box.prop(group, "export_collection", icon='OUTLINER_COLLECTION')
+            box.prop(settings, "split_output", icon='FILE_BLANK')
+            if settings.split_output == 'CHUNK':
+                row = box.row(align=True)
+                row.prop(settings, "chunk_partition", expand=True)
+                row = box.row(align=True)
+                row.prop(settings, "chunk_triangle_budget")
+                row.prop(settings, "chunk_size_budget")
+                row.prop(settings, "chunk_cell_size")
+            
+            box.label(text="Split meshes by vertex group (empty: Vertex -> .vertex):", icon='GROUP_VERTEX')
+            row = box.row()
+            row.template_list("KIMJAFASU_UL_split_rules", "", settings, "split_rules", settings, "split_rules_index", rows=2)
+            col = row.column(align=True)
+            col.operator("kimjafasu.add_split_rule", text="", icon='ADD')
+            col.operator("kimjafasu.remove_split_rule", text="", icon='REMOVE')
+            box.prop(settings, "split_base_suffix")
+            
+            box.prop(settings, "use_lods", icon='MOD_DECIM') # LOD chains for static meshes
+            if settings.use_lods:
+                row = box.row(align=True)
+                row.prop(settings, "lod_count")
+                row.prop(settings, "lod_ratio")
+                row = box.row(align=True)
+                row.prop(settings, "lod_min_triangles")
+                row.prop(settings, "lod_cache_size")
             
         layout.separator() # GLTF SETTINGS
         
@@ -52,6 +181,32 @@ class Blender2UnityPanel(bpy.types.Panel):
             box.prop(settings, "export_textures", icon="TEXTURE") # Export Textures
             box.prop(settings, "apply_modifiers", icon='MODIFIER') # Apply Modifiers
             box.prop(settings, "export_vertex_color", icon='VPAINT_HLT') # Dropdown for export format
+            row = box.row(align=True)
+            row.prop(settings, "use_direct_writer", icon='FF') # Direct writer for static meshes
+            if settings.use_direct_writer:
+                row.prop(settings, "mesh_cache_size")
+                box.prop(settings, "optimize_meshes", icon='MOD_REMESH')
+                if settings.export_textures:
+                    box.prop(settings, "texture_cache_size")
+            box.prop(settings, "geometry_compression", icon='MOD_DECIM')
+            if settings.geometry_compression == 'DRACO':
+                col = box.column(align=True)
+                col.prop(settings, "draco_level")
+                col.prop(settings, "draco_position_bits")
+                col.prop(settings, "draco_normal_bits")
+                col.prop(settings, "draco_texcoord_bits")
+                col.prop(settings, "draco_color_bits")
+            elif settings.geometry_compression == 'MESHOPT':
+                box.prop(settings, "gltfpack_path")
+                row = box.row(align=True)
+                row.prop(settings, "meshopt_level", expand=True)
+                row.prop(settings, "meshopt_quantize", toggle=True)
+            if settings.geometry_compression != 'NONE':
+                box.prop(settings, "compression_cache_size")
+            row = box.row(align=True)
+            row.prop(settings, "export_instances", icon='OUTLINER_OB_GROUP_INSTANCE') # Collection instances
+            if settings.use_direct_writer:
+                row.prop(settings, "use_gpu_instancing", icon='MOD_ARRAY')
         layout.separator()
         
         layout.prop(toggles, "show_logs_foldout", icon="TRIA_DOWN" if toggles.show_logs_foldout else "TRIA_RIGHT", emboss=False)
@@ -59,21 +214,46 @@ class Blender2UnityPanel(bpy.types.Panel):
             if settings.messages:
                 box = layout.box()
                 box.label(text="Latest export status:")
-                
-                for msg in settings.messages:
-                    icon = {
-                        'INFO': 'INFO',
-                        'WARNING': 'ERROR',  # Blender doesn't have a WARNING icon
-                        'ERROR': 'CANCEL',
-                        'NEWLINE': 'BLANK1'
-                    }.get(msg.level, 'INFO')
-                    box.label(text=msg.text, icon=icon)
+                box.template_list("KIMJAFASU_UL_log", "", settings, "messages", settings, "messages_index", rows=LOG_ROWS)
+        
+        layout.separator()
+        
+        layout.prop(toggles, "show_timings_foldout", icon="TRIA_DOWN" if toggles.show_timings_foldout else "TRIA_RIGHT", emboss=False)
+        if toggles.show_timings_foldout:
+            draw_timings(layout, settings)
         
         layout.separator()
               
         layout.prop(settings, "auto_export_on_save", icon='RNA') # Toggle Auto Export
+        row = layout.row(align=True)
+        row.prop(settings, "transport", icon='URL') # Push to the engine
+        if settings.transport == 'SOCKET':
+            row.prop(settings, "push_port")
+        layout.prop(settings, "use_live_link", icon='LINKED') # Export on edit, no saving
+        if settings.use_live_link:
+            row = layout.row(align=True)
+            row.prop(settings, "live_link_delay")
+            row.prop(settings, "live_link_edit_delay")
+            row.prop(settings, "live_link_min_interval")
+        if settings.auto_export_on_save:
+            layout.prop(settings, "skip_unchanged", icon='FILE_REFRESH')
+            layout.prop(settings, "use_background_worker", icon='CONSOLE')
+            if settings.use_background_worker:
+                row = layout.row(align=True)
+                row.prop(settings, "use_parallel_workers", icon='NODETREE')
+                if settings.use_parallel_workers:
+                    row.prop(settings, "worker_count")
+            else:
+                row = layout.row(align=True)
+                row.prop(settings, "use_deferred_export", icon='TIME')
+                if settings.use_deferred_export:
+                    row.prop(settings, "deferred_export_delay")
+        
+        if worker.kimjafasu_is_background_export_running():
+            layout.label(text="Background export running...", icon='SORTTIME')
         
-        errors = utils.kimjafasu_get_export_errors(settings)
+        # 🪶 Cached, checking the settings on every redraw lagged the viewport, see utils/validation.py
+        errors = utils.kimjafasu_get_cached_export_errors(context.scene)
 
         if errors:
             for msg in errors:
@@ -81,5 +261,37 @@ class Blender2UnityPanel(bpy.types.Panel):
         else:
             if (settings.auto_export_on_save == False):
                 layout.operator("export_scene.gltf_manual", text="Manual Export", icon='GHOST_ENABLED')
-        
-      
\ No newline at end of file
+
+def draw_timings(layout, settings):
+    box = layout.box()
+    row = box.row(align=True)
+    row.prop(settings, "write_timing_trace", icon='TEXT')
+    if settings.write_timing_trace:
+        row.prop(settings, "timing_trace_format", text="")
+    box.prop(settings, "timing_history_size")
+    
+    history = utils.kimjafasu_get_timing_history()
+    if not history:
+        box.label(text="No export timed yet.")
+        return
+    
+    last = history[-1]
+    box.label(text=f"Last export: {last.total:.3f}s, {last.files_written} file(s) written", icon='TIME')
+    
+    col = box.column(align=True)
+    for name, seconds in last.phase_totals().items():
+        share = seconds / last.total * 100 if last.total else 0
+        col.label(text=f"{name}: {seconds:.3f}s ({share:.0f}%)")
+    
+    slowest = last.slowest_objects()
+    if slowest:
+        box.label(text="Slowest objects:", icon='OBJECT_DATA')
+        col = box.column(align=True)
+        for name, seconds in slowest:
+            col.label(text=f"{name}: {seconds:.3f}s")
+    
+    box.label(text="History (newest first):", icon='SORTTIME')
+    col = box.column(align=True)
+    for timer in reversed(history):
+        icon = 'ERROR' if utils.kimjafasu_is_regression(timer) else 'BLANK1'
+        col.label(text=f"{timer.started_at.strftime('%H:%M:%S')}  {timer.total:.3f}s", icon=icon)
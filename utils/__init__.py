@@ -2,19 +2,107 @@
 # This is safe cos u wont have accidental collistions with other packages
 from .ui_common import (
   kimjafasu_refresh_ui,
+  kimjafasu_get_context_override,
   kimjafasu_split_text
 )
 from .logging import (
   kimjafasu_log_message,
+  kimjafasu_append_log_line,
+  kimjafasu_log_lines,
+  kimjafasu_clear_log,
 )
 
 from .export_utils import (
   kimjafasu_get_export_errors,
-  kimjafasu_cleanup_after
+  kimjafasu_collect_export_objects,
+  kimjafasu_get_export_jobs,
+  kimjafasu_estimate_job_cost,
+  kimjafasu_sync_edit_mode,
+  kimjafasu_export_collection
+)
+
+from .mesh_arrays import (
+  kimjafasu_foreach_get,
+  kimjafasu_foreach_set,
+  kimjafasu_attribute_array,
+)
+
+from .fingerprint import (
+  kimjafasu_settings_fingerprint,
+  kimjafasu_image_fingerprint,
+)
+
+from .manifest import (
+  kimjafasu_file_hash,
+  kimjafasu_remove_stale_chunks,
+)
+
+from .file_utils import (
+  kimjafasu_create_staging_dir,
+  kimjafasu_remove_staging_dir,
+  kimjafasu_commit_staged_files,
+  kimjafasu_request_termination,
+  kimjafasu_hidden_dir,
+  kimjafasu_evict_lru,
+)
+
+from .compression import (
+  kimjafasu_draco_export_args,
+  kimjafasu_find_gltfpack,
+  kimjafasu_meshopt_compress,
+  kimjafasu_compression_cache_key,
+  kimjafasu_restore_compressed,
+  kimjafasu_store_compressed,
+)
+
+from .chunking import (
+  kimjafasu_estimate_size,
+)
+
+from .transport import (
+  kimjafasu_push_connection,
+)
+
+from .property_io import (
+  kimjafasu_property_group_to_dict,
+  kimjafasu_property_group_from_dict,
+)
+
+from .timing import (
+  kimjafasu_export_timer,
+  kimjafasu_timed,
+  kimjafasu_timed_object,
+  kimjafasu_count_written_files,
+  kimjafasu_get_timing_history,
+  kimjafasu_is_regression,
+  kimjafasu_write_timing_trace,
+)
+
+from . import deferred
+from .deferred import (
+  kimjafasu_schedule_deferred,
+  kimjafasu_cancel_deferred,
+)
+
+from . import change_tracking
+from .change_tracking import (
+  kimjafasu_collect_fingerprints,
+  kimjafasu_geometry_fingerprint,
+  kimjafasu_describe_changes,
+  kimjafasu_remember_export,
+)
+
+from . import validation
+from .validation import (
+  kimjafasu_get_cached_export_errors,
 )
 
 def register():
-    pass
+    change_tracking.register()
+    deferred.register()
+    validation.register()
 
 def unregister():
-    pass
\ No newline at end of file
+    validation.unregister()
+    deferred.unregister()
+    change_tracking.unregister()
\ No newline at end of file
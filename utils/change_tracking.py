@@ -0,0 +1,204 @@
+import bpy
+import hashlib
+from bpy.app.handlers import persistent
+
+from .manifest import (
+    kimjafasu_get_manifest_entry,
+    kimjafasu_outputs_match,
+    kimjafasu_record_export,
+    kimjafasu_forget_manifests,
+)
+from .timing import kimjafasu_timed_object
+from .fingerprint import (
+    kimjafasu_mesh_fingerprint,
+    kimjafasu_armature_fingerprint,
+    kimjafasu_material_fingerprint,
+    kimjafasu_action_fingerprint,
+)
+
+"""
+Change tracking for incremental auto-export.
+
+The depsgraph handler below records which objects, meshes and materials got touched.
+Content fingerprints of those datablocks are cached and only recomputed once they are dirty,
+so asking "did anything I'd export change since the last export?" on every save is cheap.
+
+Fingerprints from the last successful export are remembered per output path
+in the export manifest (see manifest.py), so they survive restarting Blender.
+"""
+
+# 🪶 (kind, name) of datablocks touched since their fingerprint was cached
+_dirty_ids = set()
+_dirty_everything = False
+# An image or node tree got touched, any material can use those
+_dirty_materials = False
+
+# (kind, name) -> hex digest
+_fingerprint_cache = {}
+
+@persistent
+def kimjafasu_track_depsgraph_updates(scene, depsgraph):
+    global _dirty_materials
+
+    for update in depsgraph.updates:
+        # updates come with evaluated copies, names are the same as the originals though
+        datablock = getattr(update.id, "original", update.id)
+
+        if isinstance(datablock, bpy.types.Object):
+            _dirty_ids.add(('OBJECT', datablock.name))
+            if update.is_updated_geometry:
+                # modifiers / constraints / drivers result changed
+                _dirty_ids.add(('EVALUATED', datablock.name))
+        elif isinstance(datablock, bpy.types.Mesh):
+            _dirty_ids.add(('MESH', datablock.name))
+            _dirty_ids.add(('WEIGHTED_MESH', datablock.name))
+        elif isinstance(datablock, bpy.types.Armature):
+            _dirty_ids.add(('ARMATURE', datablock.name))
+        elif isinstance(datablock, bpy.types.Material):
+            _dirty_ids.add(('MATERIAL', datablock.name))
+        elif isinstance(datablock, bpy.types.Action):
+            _dirty_ids.add(('ACTION', datablock.name))
+        elif isinstance(datablock, (bpy.types.Image, bpy.types.NodeTree)):
+            # Shared by any number of materials, cheaper to just rehash all of them (and only them)
+            _dirty_materials = True
+
+@persistent
+def kimjafasu_reset_change_tracking(*args):
+    """New file, undo or redo - nothing cached can be trusted anymore"""
+    global _dirty_everything
+    _dirty_everything = True
+
+def _consume_dirty_ids():
+    global _dirty_everything, _dirty_materials
+
+    if _dirty_everything:
+        _fingerprint_cache.clear()
+    else:
+        if _dirty_materials:
+            for key in [key for key in _fingerprint_cache if key[0] == 'MATERIAL']:
+                del _fingerprint_cache[key]
+        for key in _dirty_ids:
+            _fingerprint_cache.pop(key, None)
+    _dirty_everything = False
+    _dirty_materials = False
+    _dirty_ids.clear()
+
+def _cached(kind, name, compute):
+    key = (kind, name)
+    digest = _fingerprint_cache.get(key)
+    if digest is None:
+        digest = compute()
+        _fingerprint_cache[key] = digest
+    return digest
+
+def kimjafasu_geometry_fingerprint(obj, depsgraph, apply_modifiers):
+    """Just the mesh that gets written, no transform or materials. Cached like everything else"""
+    if apply_modifiers and obj.modifiers:
+        # The result of the modifier stack is what gets written
+        evaluated = obj.evaluated_get(depsgraph)
+        return _cached('EVALUATED', obj.name, lambda: kimjafasu_mesh_fingerprint(evaluated.data, len(obj.vertex_groups) > 0))
+    data = obj.data
+    # 🪶 Weights only get walked for objects with vertex groups, the mesh is cached both ways
+    if obj.vertex_groups:
+        return _cached('WEIGHTED_MESH', data.name, lambda: kimjafasu_mesh_fingerprint(data))
+    return _cached('MESH', data.name, lambda: kimjafasu_mesh_fingerprint(data, with_weights=False))
+
+def kimjafasu_object_fingerprint(obj, depsgraph, apply_modifiers):
+    h = hashlib.blake2b(digest_size=16)
+
+    def update(*values):
+        for value in values:
+            h.update(str(value).encode('utf-8'))
+            h.update(b'\0')
+
+    # 🪶 Cheap stuff, always recomputed
+    update(obj.name, obj.type, obj.parent.name if obj.parent else "")
+    update(*[round(v, 6) for row in obj.matrix_world for v in row])
+    update(*[vg.name for vg in obj.vertex_groups])
+    for modifier in obj.modifiers:
+        update(modifier.name, modifier.type, modifier.show_viewport, modifier.show_render)
+
+    # 🪶 Expensive stuff, cached until the depsgraph says otherwise
+    for slot in obj.material_slots:
+        material = slot.material
+        if material:
+            update(slot.link, _cached('MATERIAL', material.name, lambda: kimjafasu_material_fingerprint(material)))
+        else:
+            update(slot.link, "")
+
+    data = obj.data
+    if obj.type == 'MESH':
+        update(kimjafasu_geometry_fingerprint(obj, depsgraph, apply_modifiers))
+    elif obj.type == 'ARMATURE':
+        update(_cached('ARMATURE', data.name, lambda: kimjafasu_armature_fingerprint(data)))
+    elif obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection:
+        # Collection instances change with whatever they instance
+        collection = obj.instance_collection
+        update(collection.name, *[round(v, 6) for v in collection.instance_offset])
+        for member in collection.all_objects:
+            if member != obj:
+                update(kimjafasu_object_fingerprint(member, depsgraph, apply_modifiers))
+
+    animation_data = obj.animation_data
+    if animation_data and animation_data.action:
+        action = animation_data.action
+        update(_cached('ACTION', action.name, lambda: kimjafasu_action_fingerprint(action)))
+
+    return h.hexdigest()
+
+def kimjafasu_collect_fingerprints(context, objects, apply_modifiers):
+    _consume_dirty_ids()
+    depsgraph = context.evaluated_depsgraph_get()
+    fingerprints = {}
+    for obj in objects:
+        with kimjafasu_timed_object(obj.name, "fingerprint"):
+            fingerprints[obj.name] = kimjafasu_object_fingerprint(obj, depsgraph, apply_modifiers)
+    return fingerprints
+
+def kimjafasu_describe_changes(export_path, settings_fingerprint, fingerprints):
+    """
+    Compares against the last successful export to the same path, from this or any earlier session.
+    Returns a list of human readable reasons, an empty list means nothing relevant changed.
+    """
+    previous = kimjafasu_get_manifest_entry(export_path)
+    if previous is None:
+        return ["no previous export in the manifest"]
+    if not kimjafasu_outputs_match(export_path, previous):
+        return ["exported file was changed on disk"]
+
+    reasons = []
+    if previous["settings"] != settings_fingerprint:
+        reasons.append("export settings changed")
+
+    previous_objects = previous["objects"]
+    changed = [name for name, digest in fingerprints.items() if previous_objects.get(name, digest) != digest]
+    added = [name for name in fingerprints if name not in previous_objects]
+    removed = [name for name in previous_objects if name not in fingerprints]
+
+    for label, names in (("changed", changed), ("added", added), ("removed", removed)):
+        if names:
+            preview = ", ".join(names[:3]) + (", ..." if len(names) > 3 else "")
+            reasons.append(f"{len(names)} {label} ({preview})")
+    return reasons
+
+def kimjafasu_remember_export(export_path, settings_fingerprint, fingerprints, chunk_of=None):
+    kimjafasu_record_export(export_path, settings_fingerprint, fingerprints, chunk_of)
+
+_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, kimjafasu_track_depsgraph_updates),
+    (bpy.app.handlers.load_post, kimjafasu_reset_change_tracking),
+    (bpy.app.handlers.undo_post, kimjafasu_reset_change_tracking),
+    (bpy.app.handlers.redo_post, kimjafasu_reset_change_tracking),
+)
+
+def register():
+    for handler_list, handler in _handlers:
+        # Remove previous handlers to avoid duplicates (after add-on reloads)
+        handler_list[:] = [h for h in handler_list if h.__name__ != handler.__name__]
+        handler_list.append(handler)
+
+def unregister():
+    for handler_list, handler in _handlers:
+        handler_list[:] = [h for h in handler_list if h.__name__ != handler.__name__]
+    kimjafasu_forget_manifests()
+    _fingerprint_cache.clear()
@@ -0,0 +1,124 @@
+import math
+from mathutils import Vector
+
+"""
+Chunked export: one huge export set partitioned into chunks that each stay under a triangle/size budget,
+every chunk goes to its own file (see _split_job in export_utils.py).
+
+Chunks are cells of a fixed world grid (Chunk Cell Size), a cell over budget gets split into quarters,
+those into quarters again... (a quadtree over X/Y, levels are spread out flat). The grid never moves,
+so editing something only changes the chunk it sits in, everything else keeps its name and content
+and gets skipped as unchanged. Only moving an object into another cell, or pushing a cell over/under
+the budget, touches a neighbour.
+
+Objects are never cut: an object and its children (armatures and their meshes, empties with stuff
+parented...) always land in the same chunk, placed by the root object's bounds. A single object
+over budget gets a chunk of its own.
+"""
+
+# Quarters of quarters of quarters... a cell stops splitting there, whatever is left shares a chunk
+MAX_CHUNK_DEPTH = 8
+
+# Rough size in the file: position + normal, plus 8 bytes per UV map
+BYTES_PER_VERTEX = 24
+BYTES_PER_UV = 8
+BYTES_PER_TRIANGLE = 12
+
+class _Unit:
+    """An object with all its exported descendants, what gets placed into a chunk"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects = []
+        self.triangles = 0
+        self.bytes = 0
+        self.center = None
+
+def _mesh_of(obj, depsgraph):
+    # With modifiers applied the evaluated mesh is what gets written, it's already there after a depsgraph update
+    return obj.evaluated_get(depsgraph).data if depsgraph is not None else obj.data
+
+def kimjafasu_estimate_size(obj, depsgraph=None, depth=0):
+    """(triangles, bytes) obj roughly adds to a file, collection instances count what they instance"""
+    if obj.type == 'MESH':
+        mesh = _mesh_of(obj, depsgraph)
+        # Every n-gon turns into n - 2 triangles
+        triangles = len(mesh.loops) - 2 * len(mesh.polygons)
+        vertex_bytes = BYTES_PER_VERTEX + BYTES_PER_UV * len(mesh.uv_layers)
+        return triangles, len(mesh.vertices) * vertex_bytes + triangles * BYTES_PER_TRIANGLE
+    if obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection and depth < MAX_CHUNK_DEPTH:
+        triangles = size = 0
+        for member in obj.instance_collection.all_objects:
+            member_triangles, member_size = kimjafasu_estimate_size(member, depsgraph, depth + 1)
+            triangles += member_triangles
+            size += member_size
+        return triangles, size
+    return 0, 0
+
+def _world_center(obj):
+    if obj.type == 'MESH':
+        corners = [Vector(corner) for corner in obj.bound_box]
+        return obj.matrix_world @ (sum(corners, Vector((0.0, 0.0, 0.0))) / len(corners))
+    return obj.matrix_world.translation
+
+def _collect_units(objects, depsgraph):
+    """Objects grouped under their topmost ancestor that is exported too, in export order"""
+    exported = set(objects)
+    units = {}
+    for obj in objects:
+        root = obj
+        while root.parent is not None and root.parent in exported:
+            root = root.parent
+        unit = units.get(root)
+        if unit is None:
+            unit = units[root] = _Unit(root)
+            unit.center = _world_center(root)
+        unit.objects.append(obj)
+        triangles, size = kimjafasu_estimate_size(obj, depsgraph)
+        unit.triangles += triangles
+        unit.bytes += size
+    return list(units.values())
+
+def _coordinate(index):
+    # Names have to survive bpy.path.clean_name, a minus wouldn't
+    return f"n{-index}" if index < 0 else str(index)
+
+def _fits(units, triangle_budget, byte_budget):
+    if sum(unit.triangles for unit in units) > triangle_budget:
+        return False
+    return byte_budget <= 0 or sum(unit.bytes for unit in units) <= byte_budget
+
+def _subdivide(chunks, name, origin, size, units, triangle_budget, byte_budget, depth):
+    if len(units) == 1 or depth >= MAX_CHUNK_DEPTH or _fits(units, triangle_budget, byte_budget):
+        chunks[name] = [obj for unit in units for obj in unit.objects]
+        return
+
+    half = size / 2
+    quarters = {}
+    for unit in units:
+        quarter = int(unit.center.x >= origin[0] + half) + 2 * int(unit.center.y >= origin[1] + half)
+        quarters.setdefault(quarter, []).append(unit)
+    for quarter, quarter_units in sorted(quarters.items()):
+        quarter_origin = (origin[0] + half * (quarter % 2), origin[1] + half * (quarter // 2))
+        # First split gets an underscore, the rest are just digits: chunk_3_n1_02
+        quarter_name = f"{name}{'' if depth else '_'}{quarter}"
+        _subdivide(chunks, quarter_name, quarter_origin, half, quarter_units, triangle_budget, byte_budget, depth + 1)
+
+def kimjafasu_partition_chunks(objects, triangle_budget, byte_budget, cell_size, depsgraph=None, prefix="chunk"):
+    """
+    {chunk name: objects} for objects, every chunk under triangle_budget and byte_budget (0 for no limit)
+    unless a single object is already over it. Pass depsgraph to size meshes with modifiers applied.
+    """
+    cells = {}
+    for unit in _collect_units(objects, depsgraph):
+        cell = (math.floor(unit.center.x / cell_size), math.floor(unit.center.y / cell_size))
+        cells.setdefault(cell, []).append(unit)
+
+    chunks = {}
+    for (x, y), units in sorted(cells.items()):
+        name = f"{prefix}_{_coordinate(x)}_{_coordinate(y)}"
+        _subdivide(chunks, name, (x * cell_size, y * cell_size), cell_size, units, triangle_budget, byte_budget, 0)
+    return chunks
+
+def kimjafasu_fits_chunk_budget(objects, triangle_budget, byte_budget, depsgraph=None):
+    return _fits(_collect_units(objects, depsgraph), triangle_budget, byte_budget)
@@ -0,0 +1,103 @@
+import bpy
+import os
+import shutil
+import hashlib
+import subprocess
+
+from .file_utils import kimjafasu_hidden_dir, kimjafasu_evict_lru
+
+"""
+Geometry compression of exported files, and a disk cache of the compressed results.
+
+- Draco (KHR_draco_mesh_compression) is done by the stock glTF exporter, see kimjafasu_draco_export_args
+- meshopt (EXT_meshopt_compression) is done by gltfpack (https://github.com/zeux/meshoptimizer),
+  run over the staged file once it's written. Blender can't write meshopt on its own
+
+Compressing is by far the slowest part of such an export, so compressed outputs are kept in a hidden
+dir in the export dir, keyed by what went into them: the object fingerprints and settings fingerprint
+of the job, the very same ones Skip Unchanged goes by. Forced exports, undo, flipping a setting
+back and forth, background workers (other processes, so memory caches don't help) and one file
+per object with Split Output all get unchanged files copied from the cache instead of compressed again.
+"""
+
+COMPRESSION_CACHE_DIRNAME = ".kimjafasu_compressed"
+# Bump when the output of the same inputs changes, old entries just stop matching
+COMPRESSION_CACHE_VERSION = 1
+
+GLTFPACK_TIMEOUT = 10 * 60
+
+def kimjafasu_draco_export_args(settings):
+    """Keyword args for bpy.ops.export_scene.gltf"""
+    return {
+        "export_draco_mesh_compression_enable": True,
+        "export_draco_mesh_compression_level": settings.draco_level,
+        "export_draco_position_quantization": settings.draco_position_bits,
+        "export_draco_normal_quantization": settings.draco_normal_bits,
+        "export_draco_texcoord_quantization": settings.draco_texcoord_bits,
+        "export_draco_color_quantization": settings.draco_color_bits,
+    }
+
+def kimjafasu_find_gltfpack(settings):
+    """Path of the gltfpack executable, the one set in the settings or the one on PATH, None if there's none"""
+    if settings.gltfpack_path:
+        path = bpy.path.abspath(settings.gltfpack_path)
+        return path if os.path.isfile(path) else None
+    return shutil.which("gltfpack")
+
+def kimjafasu_meshopt_compress(gltfpack, path, settings):
+    """Compresses the .glb/.gltf at path in place"""
+    args = [
+        gltfpack, "-i", path, "-o", path,
+        "-cc" if settings.meshopt_level == 'HIGH' else "-c",
+        # keep names, materials and extras, the engine side relies on them
+        "-kn", "-km", "-ke",
+    ]
+    if not settings.meshopt_quantize:
+        args.append("-noq")
+    result = subprocess.run(args, capture_output=True, text=True, timeout=GLTFPACK_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"gltfpack failed: {(result.stderr or result.stdout).strip()}")
+
+def kimjafasu_compression_cache_key(job):
+    h = hashlib.blake2b(digest_size=16)
+    for value in (COMPRESSION_CACHE_VERSION, os.path.basename(job.path), job.settings_fingerprint):
+        h.update(str(value).encode('utf-8'))
+        h.update(b'\0')
+    # Object order matters, it's the node order in the file
+    for obj in job.objects:
+        h.update(obj.name.encode('utf-8'))
+        h.update(b'\0')
+        h.update(job.fingerprints[obj.name].encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def kimjafasu_restore_compressed(export_dir, key, staging_dir):
+    """Copies the cached compressed files for key into staging_dir, False when there are none"""
+    entry = os.path.join(kimjafasu_hidden_dir(export_dir, COMPRESSION_CACHE_DIRNAME), key)
+    if not os.path.isdir(entry):
+        return False
+    try:
+        shutil.copytree(entry, staging_dir, dirs_exist_ok=True)
+    except OSError:
+        return False  # evicted by another worker right now, just compress again
+    # mtime is the LRU order
+    os.utime(entry)
+    return True
+
+def kimjafasu_store_compressed(export_dir, key, staging_dir, limit_bytes):
+    """Keeps the staged files for key, then drops least recently used entries over limit_bytes"""
+    if limit_bytes <= 0:
+        return
+    cache_root = kimjafasu_hidden_dir(export_dir, COMPRESSION_CACHE_DIRNAME)
+    entry = os.path.join(cache_root, key)
+    # Copied under a temp name and renamed, parallel workers never see half an entry
+    temp_entry = f"{entry}.{os.getpid()}.tmp"
+    shutil.rmtree(temp_entry, ignore_errors=True)
+    shutil.copytree(staging_dir, temp_entry)
+    try:
+        os.replace(temp_entry, entry)
+    except OSError:
+        # Someone else stored the same key first, theirs is just as good
+        shutil.rmtree(temp_entry, ignore_errors=True)
+
+    kimjafasu_evict_lru(cache_root, limit_bytes)
@@ -0,0 +1,73 @@
+import bpy
+import time
+from bpy.app.handlers import persistent
+
+"""
+Deferred, coalesced callbacks on top of bpy.app.timers.
+
+Handlers like save_post block the UI until they return, so heavy work gets queued here instead
+and runs a moment later from a timer. Scheduling the same key again before it ran just pushes it
+back a bit and counts it, so five quick Ctrl+S in a row end up as one export.
+"""
+
+# key -> {"callback": fn(count), "due": monotonic time, "first": monotonic time, "count": int}
+_pending = {}
+
+def _tick():
+    now = time.monotonic()
+    due_keys = [key for key, entry in _pending.items() if entry["due"] <= now]
+
+    for key in due_keys:
+        entry = _pending.pop(key)
+        try:
+            entry["callback"](entry["count"])
+        except Exception as e:
+            print(f"🔥 [ERROR] Deferred '{key}' failed: {e}")
+
+    if not _pending:
+        return None  # returning None unregisters the timer
+    return max(0.01, min(entry["due"] for entry in _pending.values()) - time.monotonic())
+
+def kimjafasu_schedule_deferred(key, callback, delay, max_wait=None):
+    """
+    Runs callback(count) after delay seconds, count is how many times key was scheduled meanwhile.
+    Rescheduling postpones it again, but never later than max_wait after the first request.
+    """
+    now = time.monotonic()
+    max_wait = max(delay, max_wait if max_wait is not None else delay * 4)
+
+    entry = _pending.get(key)
+    if entry is None:
+        _pending[key] = {"callback": callback, "due": now + delay, "first": now, "count": 1}
+    else:
+        entry["callback"] = callback
+        entry["count"] += 1
+        entry["due"] = min(now + delay, entry["first"] + max_wait)
+
+    if bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.unregister(_tick)
+    bpy.app.timers.register(_tick, first_interval=max(0.0, min(e["due"] for e in _pending.values()) - now))
+
+def kimjafasu_is_deferred_pending(key):
+    return key in _pending
+
+def kimjafasu_cancel_deferred(key=None):
+    if key is None:
+        _pending.clear()
+    else:
+        _pending.pop(key, None)
+    if not _pending and bpy.app.timers.is_registered(_tick):
+        bpy.app.timers.unregister(_tick)
+
+@persistent
+def kimjafasu_cancel_deferred_on_load(*args):
+    # Whatever was queued belongs to the file we are leaving
+    kimjafasu_cancel_deferred()
+
+def register():
+    bpy.app.handlers.load_pre[:] = [h for h in bpy.app.handlers.load_pre if h.__name__ != "kimjafasu_cancel_deferred_on_load"]
+    bpy.app.handlers.load_pre.append(kimjafasu_cancel_deferred_on_load)
+
+def unregister():
+    bpy.app.handlers.load_pre[:] = [h for h in bpy.app.handlers.load_pre if h.__name__ != "kimjafasu_cancel_deferred_on_load"]
+    kimjafasu_cancel_deferred()
@@ -1,5 +1,39 @@
 import bpy
-         
+import os
+from contextlib import contextmanager
+
+from .fingerprint import kimjafasu_settings_fingerprint, kimjafasu_property_group_fingerprint
+from .compression import kimjafasu_find_gltfpack
+from .chunking import kimjafasu_partition_chunks, kimjafasu_fits_chunk_budget
+
+# Temp collection the stock exporters read their objects from
+EXPORT_COLLECTION_NAME = "kimjafasu_export_set"
+
+class ExportJob:
+    """One output file: where it goes, in which format and which objects end up in it"""
+
+    def __init__(self, name, path, export_format, export_target, objects, settings_fingerprint, chunk_of=None):
+        self.name = name
+        self.path = path
+        self.export_format = export_format
+        self.export_target = export_target
+        self.objects = objects
+        self.settings_fingerprint = settings_fingerprint
+        # Path the job would have written unchunked, set for chunks only
+        self.chunk_of = chunk_of
+        # object name -> fingerprint, filled in right before exporting
+        self.fingerprints = {}
+
+def _get_target_errors(source, label=""):
+    errors = []
+    if source.export_target == 'Selection':
+        has_any_mesh_selected = any(obj.type =='MESH' for obj in bpy.context.selected_objects)
+        if not has_any_mesh_selected:
+            errors.append(f"{label}Export target is 'Selection', but not a single mesh is selected.")
+    if source.export_target == 'Collection' and not source.export_collection:
+        errors.append(f"{label}Export target is 'Collection', but no collection is selected.")
+    return errors
+
 def kimjafasu_get_export_errors(settings):
     errors = []
     blend_filepath = bpy.data.filepath
@@ -7,23 +41,226 @@ def kimjafasu_get_export_errors(settings):
         errors.append("Save your .blend file first!")
     if not settings.export_dir:
         errors.append("Can't export, need valid Export Dir.")
-    if not settings.use_project_name and not settings.simple_export_filename:
-        errors.append("Please set an export filename.")
-    if settings.export_target == 'Selection':
-        has_any_mesh_selected = any(obj.type =='MESH' for obj in bpy.context.selected_objects)
-        if not has_any_mesh_selected:
-            errors.append("Export target is 'Selection', but not a single mesh is selected.")
-    if settings.export_target == 'Collection' and not settings.export_collection:
-        errors.append("Export target is 'Collection', but no collection is selected.")
+
+    if settings.use_simple_mode:
+        if not settings.use_project_name and not settings.simple_export_filename:
+            errors.append("Please set an export filename.")
+        errors.extend(_get_target_errors(settings))
+    else:
+        enabled_groups = [group for group in settings.export_groups if group.enabled]
+        if not enabled_groups:
+            errors.append("Add and enable at least one export group.")
+        for group in enabled_groups:
+            errors.extend(_get_target_errors(group, f"'{group.name}': "))
+        errors.extend(_get_duplicate_path_errors(settings, enabled_groups))
+
+    if settings.geometry_compression == 'MESHOPT' and settings.engine != 'Procreate' and not kimjafasu_find_gltfpack(settings):
+        errors.append("Meshopt compression needs gltfpack, set its path or put it on PATH.")
+    return errors
+
+def _group_export_path(settings, group, export_dir):
+    # 🪶 Group name doubles as the filename unless one is set
+    filename = group.filename or bpy.path.clean_name(group.name)
+    return os.path.join(export_dir, filename + kimjafasu_get_file_extension(settings, group.export_format))
+
+def _get_duplicate_path_errors(settings, groups):
+    """Groups writing the same file would overwrite each other's file and manifest entry"""
+    export_dir = bpy.path.abspath(settings.export_dir)
+    errors = []
+    owners = {}
+    for group in groups:
+        path = _group_export_path(settings, group, export_dir)
+        # Windows and macOS don't tell Props.glb and props.glb apart
+        key = os.path.normcase(os.path.normpath(path)).lower()
+        if key in owners:
+            errors.append(f"'{owners[key]}' and '{group.name}' both export to {os.path.basename(path)}, give one of them another Filename.")
+        else:
+            owners[key] = group.name
     return errors
-  
-def kimjafasu_cleanup_after(export_target, original_selected_objects, original_mode):
-  # 🪶 Restore previous object selection
-      if export_target != 'Selection':
-          bpy.ops.object.select_all(action='DESELECT')
-          for obj in original_selected_objects:
-              obj.select_set(True)
-          
-      # Restore original mode
-      if original_mode != 'OBJECT':
-          bpy.ops.object.mode_set(mode=original_mode)
\ No newline at end of file
+
+def _is_collection_instance(obj):
+    return obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection is not None
+
+def kimjafasu_collect_export_objects(context, settings, include_instances=False):
+    """
+    The objects export_target would select, without touching the actual selection.
+    Works with anything that has export_target and export_collection, so ExportSettings and ExportGroup.
+    include_instances also picks up empties instancing a collection.
+    """
+    export_target = settings.export_target
+
+    def wanted(obj):
+        return obj.type in {'MESH', 'ARMATURE'} or (include_instances and _is_collection_instance(obj))
+
+    if export_target == 'Selection':
+        return [obj for obj in context.selected_objects]
+    elif export_target == 'Everything':
+        return [obj for obj in bpy.data.objects if wanted(obj)]
+    elif export_target == 'Collection' and settings.export_collection:
+        return [obj for obj in settings.export_collection.all_objects if wanted(obj)]
+    return []
+
+def kimjafasu_get_file_extension(settings, export_format):
+    # A little override for procreate, everything else exported with gltf
+    if settings.engine == 'Procreate':
+        return ".obj"
+    return {
+        'GLB': ".glb",
+        'GLTF_SEPARATE': ".gltf",
+    }[export_format]
+
+def _split_by_collection(context, objects):
+    """{top-level collection name: objects}, objects living only in the scene collection go under """""
+    top_level = {}
+    for collection in context.scene.collection.children:
+        for obj in collection.all_objects:
+            top_level.setdefault(obj, []).append(collection.name)
+    parts = {}
+    for obj in objects:
+        for name in top_level.get(obj, [""]):
+            parts.setdefault(name, []).append(obj)
+    return parts
+
+def _split_into_chunks(context, settings, objects):
+    """{chunk name: objects}, see utils/chunking.py"""
+    depsgraph = context.evaluated_depsgraph_get() if settings.apply_modifiers else None
+    byte_budget = settings.chunk_size_budget * 1024 * 1024
+    if settings.chunk_partition == 'SPATIAL':
+        return kimjafasu_partition_chunks(objects, settings.chunk_triangle_budget, byte_budget, settings.chunk_cell_size, depsgraph)
+
+    # 🪶 Collections that fit stay a chunk of their own, only the big ones get cut up spatially
+    chunks = {}
+    for name, collection_objects in _split_by_collection(context, objects).items():
+        if kimjafasu_fits_chunk_budget(collection_objects, settings.chunk_triangle_budget, byte_budget, depsgraph):
+            chunks[name] = collection_objects
+        else:
+            prefix = f"{name}_chunk" if name else "chunk"
+            chunks.update(kimjafasu_partition_chunks(
+                collection_objects, settings.chunk_triangle_budget, byte_budget, settings.chunk_cell_size, depsgraph, prefix))
+    return chunks
+
+def _split_job(context, settings, job):
+    """One job per top-level collection, per object or per chunk, all next to the original path"""
+    root, extension = os.path.splitext(job.path)
+    parts = {}
+
+    if settings.split_output == 'OBJECT':
+        for obj in job.objects:
+            parts[obj.name] = [obj]
+    elif settings.split_output == 'COLLECTION':
+        # Objects living only in the scene collection stay in the main file
+        parts = _split_by_collection(context, job.objects)
+    elif settings.split_output == 'CHUNK':
+        parts = _split_into_chunks(context, settings, job.objects)
+
+    jobs = []
+    for name, objects in parts.items():
+        suffix = f"_{bpy.path.clean_name(name)}" if name else ""
+        jobs.append(ExportJob(
+            f"{job.name}{suffix}",
+            root + suffix + extension,
+            job.export_format,
+            job.export_target,
+            objects,
+            job.settings_fingerprint,
+            job.path if settings.split_output == 'CHUNK' else None))
+    return jobs
+
+def kimjafasu_estimate_job_cost(job):
+    """Rough relative export cost, used to spread jobs evenly over workers"""
+    cost = 0
+    for obj in job.objects:
+        cost += 1
+        if obj.type == 'MESH':
+            cost += len(obj.data.vertices) / 1000
+    return cost
+
+def kimjafasu_get_export_jobs(context, settings):
+    """
+    Simple mode is a single job built from ExportSettings,
+    otherwise every enabled export group is a job of its own.
+    With split_output every job is split further, per top-level collection, per object or into chunks.
+    """
+    export_dir = bpy.path.abspath(settings.export_dir)
+    settings_fingerprint = kimjafasu_settings_fingerprint(settings)
+    jobs = []
+
+    if settings.use_simple_mode:
+        if settings.use_project_name:
+            blend_filepath = bpy.data.filepath
+            filename = os.path.splitext(os.path.basename(blend_filepath))[0]
+        else:
+            filename = settings.simple_export_filename
+
+        path = os.path.join(export_dir, filename + kimjafasu_get_file_extension(settings, settings.export_format))
+        jobs.append(ExportJob(
+            filename,
+            path,
+            settings.export_format,
+            settings.export_target,
+            kimjafasu_collect_export_objects(context, settings, settings.export_instances),
+            settings_fingerprint))
+    else:
+        for group in settings.export_groups:
+            if not group.enabled:
+                continue
+            path = _group_export_path(settings, group, export_dir)
+            jobs.append(ExportJob(
+                group.name,
+                path,
+                group.export_format,
+                group.export_target,
+                kimjafasu_collect_export_objects(context, group, settings.export_instances),
+                # Editing one group should not re-export the others
+                kimjafasu_property_group_fingerprint(group) + settings_fingerprint))
+
+    if settings.split_output != 'NONE':
+        jobs = [part for job in jobs for part in _split_job(context, settings, job)]
+    return jobs
+
+def kimjafasu_sync_edit_mode(context):
+    """Edit mode changes live in the edit mesh until synced back, this does it without leaving edit mode"""
+    view_layer = context.view_layer
+    active_object = view_layer.objects.active
+    if active_object is None or active_object.mode != 'EDIT':
+        return
+    # Multi-object editing puts every selected object of that type into edit mode too
+    for obj in {active_object, *view_layer.objects.selected}:
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode()
+
+@contextmanager
+def kimjafasu_export_collection(context, objects):
+    """
+    Hands the stock exporters their objects without touching the user's selection:
+    yields the name of a temp collection holding objects, for the exporters' collection param (4.2+).
+    Older exporters only know use_selection, there it yields None and the selection is swapped
+    for objects and put back afterwards.
+    """
+    if bpy.app.version >= (4, 2, 0):
+        # Not linked to the scene, it's only a list of objects the exporter reads
+        collection = bpy.data.collections.new(EXPORT_COLLECTION_NAME)
+        try:
+            for obj in objects:
+                collection.objects.link(obj)
+            yield collection.name
+        finally:
+            bpy.data.collections.remove(collection)
+        return
+
+    view_layer = context.view_layer
+    original_selected = list(view_layer.objects.selected)
+    original_active = view_layer.objects.active
+    for obj in original_selected:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    view_layer.objects.active = objects[0]
+    try:
+        yield None
+    finally:
+        for obj in objects:
+            obj.select_set(False)
+        for obj in original_selected:
+            obj.select_set(True)
+        view_layer.objects.active = original_active
@@ -0,0 +1,150 @@
+import os
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from .manifest import kimjafasu_file_hash
+
+"""
+Write-then-rename for exported files.
+
+Exporters write into a staging dir inside the export dir (same drive, so renaming is atomic)
+using the final filenames, that way relative uris in a .gltf (to its .bin and textures) stay valid.
+Afterwards every staged file is hashed and only moved over its target when the content differs.
+
+- the engine's asset watcher never sees a half written file
+- an identical re-export leaves the old file and its timestamp alone, so no pointless reimport
+"""
+
+STAGING_DIRNAME = ".kimjafasu_staging"
+
+# Leftovers of killed background workers get cleaned up after this long
+STALE_STAGING_SECONDS = 60 * 60
+
+# Windows (and Unity holding files open) can make a rename fail for a moment
+REPLACE_ATTEMPTS = 5
+REPLACE_RETRY_DELAY = 0.1
+
+# Written last, so a .gltf never points at a .bin/texture that isn't there yet
+_COMMIT_LAST_EXTENSIONS = {".gltf", ".glb", ".obj"}
+
+# Background workers get cancelled with SIGTERM, which must not land between the files of one export
+_termination_deferred = 0
+_termination_requested = False
+
+def kimjafasu_request_termination():
+    """SIGTERM handler of background workers: exits right away, or once the files being committed are all in place"""
+    global _termination_requested
+    if _termination_deferred:
+        _termination_requested = True
+    else:
+        # SystemExit unwinds normally, locks get released and the staging dir removed
+        raise SystemExit(1)
+
+@contextmanager
+def _defer_termination():
+    global _termination_deferred
+    _termination_deferred += 1
+    try:
+        yield
+    finally:
+        _termination_deferred -= 1
+    if _termination_requested and not _termination_deferred:
+        raise SystemExit(1)
+
+def kimjafasu_hidden_dir(export_dir, dirname):
+    """A dir inside the export dir engines don't import, made if it isn't there yet"""
+    # Hidden dir: Unity skips dot folders, Godot skips folders with a .gdignore
+    path = os.path.join(export_dir, dirname)
+    os.makedirs(path, exist_ok=True)
+    gdignore = os.path.join(path, ".gdignore")
+    if not os.path.exists(gdignore):
+        open(gdignore, 'w').close()
+    return path
+
+def _entry_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _dirs, files in os.walk(path) for name in files)
+
+def kimjafasu_evict_lru(cache_root, limit_bytes):
+    """Drops the least recently used (oldest mtime) files/dirs of a cache dir until it fits limit_bytes"""
+    entries = []
+    for entry in os.scandir(cache_root):
+        # .gdignore and entries still being written by someone
+        if entry.name.startswith(".") or entry.name.endswith(".tmp"):
+            continue
+        entries.append((entry.stat().st_mtime, entry.path, _entry_size(entry.path)))
+    total = sum(size for _, _, size in entries)
+    for _, path, size in sorted(entries):
+        if total <= limit_bytes:
+            break
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+        total -= size
+
+def kimjafasu_create_staging_dir(export_dir):
+    staging_root = kimjafasu_hidden_dir(export_dir, STAGING_DIRNAME)
+    _remove_stale_staging_dirs(staging_root)
+    return tempfile.mkdtemp(prefix="export-", dir=staging_root)
+
+def _remove_stale_staging_dirs(staging_root):
+    now = time.time()
+    for entry in os.scandir(staging_root):
+        if entry.is_dir() and now - entry.stat().st_mtime > STALE_STAGING_SECONDS:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def kimjafasu_remove_staging_dir(staging_dir):
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+def _files_equal(source, target):
+    try:
+        if os.path.getsize(source) != os.path.getsize(target):
+            return False
+    except OSError:
+        return False
+    return kimjafasu_file_hash(source) == kimjafasu_file_hash(target)
+
+def _replace(source, target):
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+def kimjafasu_commit_staged_files(staging_dir, export_dir):
+    """
+    Moves staged files over their targets when their content changed.
+    Returns (written, unchanged) lists of target paths.
+    """
+    staged = []
+    for root, _dirs, files in os.walk(staging_dir):
+        for name in files:
+            source = os.path.join(root, name)
+            relative_path = os.path.relpath(source, staging_dir)
+            staged.append((relative_path, source))
+
+    staged.sort(key=lambda item: (os.path.splitext(item[0])[1].lower() in _COMMIT_LAST_EXTENSIONS, item[0]))
+
+    written = []
+    unchanged = []
+    # 🪶 All files of an export or none, a .bin never gets replaced without its .gltf
+    with _defer_termination():
+        for relative_path, source in staged:
+            target = os.path.join(export_dir, relative_path)
+            if _files_equal(source, target):
+                unchanged.append(target)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _replace(source, target)
+            written.append(target)
+    return written, unchanged
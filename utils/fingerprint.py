@@ -0,0 +1,192 @@
+import bpy
+import os
+import hashlib
+import numpy as np
+
+from .mesh_arrays import kimjafasu_foreach_get, kimjafasu_attribute_array
+
+"""
+Content fingerprints of the things that end up in an exported file.
+
+A fingerprint is a short hex digest (blake2b) of everything that can change the output:
+transforms, mesh arrays, vertex groups, materials, images, animation and export settings.
+Hex strings are used so they can be compared, cached and dumped to json as they are.
+"""
+
+# Never part of the output, changing them must not trigger a re-export
+IGNORED_SETTINGS = {
+    'rna_type',
+    'messages',
+    'messages_start',
+    'messages_index',
+    'selection_toggles',
+    'auto_export_on_save',
+    'use_live_link',
+    'transport',
+    'push_port',
+    'live_link_delay',
+    'live_link_edit_delay',
+    'live_link_min_interval',
+    'skip_unchanged',
+    'use_deferred_export',
+    'deferred_export_delay',
+    'use_background_worker',
+    'use_parallel_workers',
+    'worker_count',
+    'timing_history_size',
+    'write_timing_trace',
+    'timing_trace_format',
+    'mesh_cache_size',
+    'compression_cache_size',
+    'texture_cache_size',
+    'lod_cache_size',
+    # machine specific, the flags passed to it are what counts
+    'gltfpack_path',
+    # every export group gets fingerprinted on its own
+    'export_groups',
+    'export_groups_index',
+    'split_rules_index',
+}
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=16)
+
+def _update_text(h, *values):
+    for value in values:
+        h.update(str(value).encode('utf-8'))
+        h.update(b'\0')
+
+def _update_array(h, array):
+    h.update(np.ascontiguousarray(array).tobytes())
+    h.update(b'\0')
+
+def kimjafasu_mesh_fingerprint(mesh, with_weights=True):
+    """with_weights=False skips vertex group weights, for objects without vertex groups they mean nothing"""
+    h = _new_hash()
+    _update_text(h, len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons))
+
+    # 🪶 Topology and positions
+    _update_array(h, kimjafasu_foreach_get(mesh.vertices, "co", 3))
+    _update_array(h, kimjafasu_foreach_get(mesh.edges, "vertices", 2, np.int32))
+    _update_array(h, kimjafasu_foreach_get(mesh.loops, "vertex_index", 1, np.int32))
+    _update_array(h, kimjafasu_foreach_get(mesh.polygons, "loop_total", 1, np.int32))
+
+    # 🪶 Every generic attribute: uvs, colors, sharp_face, material_index...
+    for attribute in sorted(mesh.attributes, key=lambda a: a.name):
+        _update_text(h, attribute.name, attribute.domain, attribute.data_type)
+        try:
+            array = kimjafasu_attribute_array(attribute)
+        except (TypeError, RuntimeError):
+            array = None
+        if array is not None:
+            _update_array(h, array)
+
+    # 🪶 Vertex group weights, they decide how meshes get split
+    # There is no foreach_get for those, the verts get walked once and hashed as one array
+    if with_weights:
+        weights = np.array(
+            [(v.index, g.group, g.weight) for v in mesh.vertices for g in v.groups],
+            dtype=[('vertex', np.int32), ('group', np.int32), ('weight', np.float32)])
+        _update_array(h, weights)
+
+    # 🪶 Shape keys
+    if mesh.shape_keys:
+        for key_block in mesh.shape_keys.key_blocks:
+            _update_text(h, key_block.name, key_block.value, key_block.relative_key.name)
+            _update_array(h, kimjafasu_foreach_get(key_block.data, "co", 3))
+
+    _update_text(h, *[m.name if m else "" for m in mesh.materials])
+    return h.hexdigest()
+
+def kimjafasu_armature_fingerprint(armature):
+    h = _new_hash()
+    for bone in armature.bones:
+        _update_text(h, bone.name, bone.parent.name if bone.parent else "", bone.use_deform)
+        _update_array(h, np.array(bone.matrix_local, dtype=np.float32))
+        _update_array(h, np.array((*bone.head_local, *bone.tail_local), dtype=np.float32))
+    return h.hexdigest()
+
+def kimjafasu_image_fingerprint(image):
+    h = _new_hash()
+    _update_text(h, image.name, image.source, image.filepath_raw, tuple(image.size))
+
+    if image.packed_file:
+        _update_text(h, "packed", image.packed_file.size)
+
+    path = bpy.path.abspath(image.filepath_raw) if image.filepath_raw else ""
+    if path and os.path.isfile(path):
+        stat = os.stat(path)
+        _update_text(h, stat.st_size, stat.st_mtime_ns)
+
+    # Painted in blender or generated, the only truth is the pixels themselves
+    if image.is_dirty or image.source == 'GENERATED':
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        _update_array(h, pixels)
+    return h.hexdigest()
+
+def _update_node_tree(h, node_tree, visited):
+    if node_tree is None or node_tree.name in visited:
+        return
+    visited.add(node_tree.name)
+
+    for node in node_tree.nodes:
+        _update_text(h, node.bl_idname, node.name)
+        for socket in node.inputs:
+            value = getattr(socket, "default_value", None)
+            if value is not None and not isinstance(value, (int, float, str, bool)):
+                try:
+                    value = tuple(value)
+                except TypeError:
+                    value = str(value)
+            _update_text(h, socket.identifier, value)
+        image = getattr(node, "image", None)
+        if image:
+            _update_text(h, kimjafasu_image_fingerprint(image))
+        # Node groups are node trees too
+        _update_node_tree(h, getattr(node, "node_tree", None), visited)
+
+    for link in node_tree.links:
+        _update_text(h, link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+
+def kimjafasu_material_fingerprint(material):
+    h = _new_hash()
+    _update_text(h, material.name, tuple(material.diffuse_color), material.metallic, material.roughness)
+    _update_text(h, getattr(material, "blend_method", ""), material.use_backface_culling)
+    if material.use_nodes:
+        _update_node_tree(h, material.node_tree, set())
+    return h.hexdigest()
+
+def kimjafasu_action_fingerprint(action):
+    h = _new_hash()
+    # Blender 4.4+ layered actions still expose a flat fcurves list for legacy actions
+    for fcurve in getattr(action, "fcurves", []):
+        _update_text(h, fcurve.data_path, fcurve.array_index)
+        _update_array(h, kimjafasu_foreach_get(fcurve.keyframe_points, "co", 2))
+    return h.hexdigest()
+
+def kimjafasu_property_group_fingerprint(group, h=None):
+    """Hashes all properties of a PropertyGroup (recursively), like ExportSettings"""
+    h = h or _new_hash()
+    for prop in group.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in IGNORED_SETTINGS:
+            continue
+        value = getattr(group, identifier)
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.PropertyGroup):
+                kimjafasu_property_group_fingerprint(value, h)
+            else:
+                _update_text(h, identifier, value.name if value else "")
+        elif prop.type == 'COLLECTION':
+            _update_text(h, identifier, len(value))
+            for item in value:
+                kimjafasu_property_group_fingerprint(item, h)
+        else:
+            if getattr(prop, "is_array", False):
+                value = tuple(value)
+            _update_text(h, identifier, value)
+    return h.hexdigest()
+
+def kimjafasu_settings_fingerprint(settings):
+    return kimjafasu_property_group_fingerprint(settings)
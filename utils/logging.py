@@ -1,6 +1,10 @@
 from datetime import datetime
 from . import kimjafasu_split_text
 
+# Log lines kept per scene. Once full, new lines overwrite the oldest ones (a ring buffer,
+# messages_start is the oldest line), so per-object logs of huge exports can't grow it forever
+LOG_CAPACITY = 500
+
 # gosh multilines, why so hard, try this onetime: https://b3d.interplanety.org/en/multiline-text-in-blender-interface-panels/
 def kimjafasu_log_message(self, text, level='INFO'):
     now = datetime.now().strftime("%H:%M:%S")
@@ -16,12 +20,33 @@ def kimjafasu_log_message(self, text, level='INFO'):
         lines.append(text)
     
     for index, line in enumerate(lines):
-        msg = self.messages.add()
-        msg.text = line
         if index != 0:
             level = 'NEWLINE'
-        msg.level = level
-        
+        kimjafasu_append_log_line(self, line, level)
+
+def kimjafasu_append_log_line(settings, text, level):
+    """Adds a line as it is, no timestamp or splitting"""
+    messages = settings.messages
+    if len(messages) < LOG_CAPACITY:
+        msg = messages.add()
+    else:
+        # 🪶 Overwrite the oldest line in place instead of shifting all the others down
+        msg = messages[settings.messages_start]
+        settings.messages_start = (settings.messages_start + 1) % len(messages)
+    msg.text = text
+    msg.level = level
+
+def kimjafasu_log_lines(settings):
+    """Log lines, oldest first"""
+    messages = settings.messages
+    start = settings.messages_start if settings.messages_start < len(messages) else 0
+    return [messages[(start + index) % len(messages)] for index in range(len(messages))]
+
+def kimjafasu_clear_log(settings):
+    settings.messages.clear()
+    settings.messages_start = 0
+    settings.messages_index = 0
+
 def kimjafasu_format_log(text, level):
     if level == 'INFO':
       prefix = f"🕊️  [INFO]"
@@ -31,4 +56,4 @@ def kimjafasu_format_log(text, level):
       prefix = f"🔥 [ERROR]"
     else:
       prefix = ""
-    return f"{prefix} {text}"
\ No newline at end of file
+    return f"{prefix} {text}"
@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from datetime import datetime
+
+"""
+Export manifest, a json sidecar living in the export dir.
+
+For every output file it remembers what went into it (object fingerprints + export settings fingerprint)
+and what came out (hash, size and mtime of the written files). Because fingerprints are content based,
+the manifest stays valid between Blender sessions, so the first save after reopening a project
+doesn't have to re-export (and make the engine reimport) everything.
+
+Loading is a single json.load, cached in memory until the file changes on disk,
+checking outputs only rehashes a file when its size or mtime doesn't match anymore.
+"""
+
+MANIFEST_FILENAME = ".kimjafasu_manifest.json"
+MANIFEST_LOCK_FILENAME = ".kimjafasu_manifest.lock"
+MANIFEST_VERSION = 1
+
+# Parallel workers update the same manifest, a lock file keeps them from overwriting each other
+LOCK_TIMEOUT = 10.0
+LOCK_STALE_SECONDS = 60.0
+
+# export dir -> (manifest file mtime_ns, manifest dict)
+_loaded_manifests = {}
+
+def _empty_manifest():
+    return {"version": MANIFEST_VERSION, "outputs": {}}
+
+def _manifest_path(export_dir):
+    return os.path.join(export_dir, MANIFEST_FILENAME)
+
+def _output_key(export_dir, output_path):
+    # Relative + forward slashes, so moving the whole project around doesn't invalidate it
+    return os.path.relpath(output_path, export_dir).replace("\\", "/")
+
+def _process_alive(pid):
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            # Access denied means it's there, just not ours
+            return ctypes.get_last_error() == 5
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class ManifestLock:
+    """
+    Cross-process lock, creating a file with O_EXCL is atomic on every OS.
+    The file holds the pid of its owner, a lock whose owner is gone (a killed worker) is taken over right away.
+    """
+
+    def __init__(self, export_dir):
+        self.path = os.path.join(export_dir, MANIFEST_LOCK_FILENAME)
+
+    def __enter__(self):
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                try:
+                    os.write(fd, str(os.getpid()).encode('ascii'))
+                finally:
+                    os.close(fd)
+                return self
+            except FileExistsError:
+                self._remove_if_stale()
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Export manifest is locked: {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _remove_if_stale(self):
+        # Left behind by a killed worker
+        try:
+            with open(self.path, 'r', encoding='ascii') as file:
+                owner = file.read().strip()
+            # Empty while its owner is still writing the pid, the age check covers owners that died right there
+            owner_gone = owner.isdigit() and not _process_alive(int(owner))
+            if owner_gone or time.time() - os.path.getmtime(self.path) > LOCK_STALE_SECONDS:
+                os.remove(self.path)
+        except OSError:
+            pass
+
+def kimjafasu_file_hash(path, chunk_size=1024 * 1024):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def kimjafasu_load_manifest(export_dir):
+    path = _manifest_path(export_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return _loaded_manifests.setdefault(export_dir, (None, _empty_manifest()))[1]
+
+    cached = _loaded_manifests.get(export_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        if manifest.get("version") != MANIFEST_VERSION:
+            print(f"⚠️  [WARNING] Ignoring export manifest with unknown version in {export_dir}")
+            manifest = _empty_manifest()
+    except (OSError, ValueError) as e:
+        print(f"⚠️  [WARNING] Couldn't read export manifest {path}: {e}")
+        manifest = _empty_manifest()
+
+    _loaded_manifests[export_dir] = (mtime, manifest)
+    return manifest
+
+def kimjafasu_save_manifest(export_dir, manifest):
+    path = _manifest_path(export_dir)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        # Compact, thousands of objects should still be a quick read
+        json.dump(manifest, file, separators=(',', ':'), sort_keys=True)
+    os.replace(temp_path, path)
+    _loaded_manifests[export_dir] = (os.stat(path).st_mtime_ns, manifest)
+
+def kimjafasu_get_output_files(output_path):
+    """The main file plus its .bin sidecar for GLTF_SEPARATE"""
+    files = [output_path]
+    root, extension = os.path.splitext(output_path)
+    if extension == ".gltf" and os.path.exists(root + ".bin"):
+        files.append(root + ".bin")
+    return files
+
+def _describe_file(path):
+    stat = os.stat(path)
+    return {
+        "hash": kimjafasu_file_hash(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+def _file_matches(path, record):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size == record["size"] and stat.st_mtime_ns == record["mtime_ns"]:
+        return True
+    # Touched but maybe still the same content
+    return stat.st_size == record["size"] and kimjafasu_file_hash(path) == record["hash"]
+
+def kimjafasu_get_manifest_entry(output_path):
+    export_dir = os.path.dirname(output_path)
+    manifest = kimjafasu_load_manifest(export_dir)
+    return manifest["outputs"].get(_output_key(export_dir, output_path))
+
+def kimjafasu_outputs_match(output_path, entry):
+    """Are the files on disk still the ones we wrote?"""
+    export_dir = os.path.dirname(output_path)
+    for relative_path, record in entry.get("files", {}).items():
+        if not _file_matches(os.path.join(export_dir, relative_path), record):
+            return False
+    return True
+
+def kimjafasu_record_export(output_path, settings_fingerprint, fingerprints, chunk_of=None):
+    """chunk_of is the path the output would have had unchunked, see kimjafasu_remove_stale_chunks"""
+    export_dir = os.path.dirname(output_path)
+
+    files = {}
+    for path in kimjafasu_get_output_files(output_path):
+        if os.path.exists(path):
+            files[_output_key(export_dir, path)] = _describe_file(path)
+
+    entry = {
+        "settings": settings_fingerprint,
+        "objects": dict(fingerprints),
+        "files": files,
+        "exported_at": datetime.now().isoformat(timespec='seconds'),
+    }
+    if chunk_of:
+        entry["chunk_of"] = _output_key(export_dir, chunk_of)
+    with ManifestLock(export_dir):
+        # Reloaded under the lock, another worker may have just written its entries
+        manifest = kimjafasu_load_manifest(export_dir)
+        manifest["outputs"][_output_key(export_dir, output_path)] = entry
+        kimjafasu_save_manifest(export_dir, manifest)
+    return entry
+
+def kimjafasu_remove_stale_chunks(chunk_of, current_paths):
+    """
+    Deletes chunk files of chunk_of that aren't among current_paths anymore (their cell got split, merged or emptied),
+    the engine would import their objects twice otherwise. Returns the deleted paths.
+    """
+    export_dir = os.path.dirname(chunk_of)
+    chunk_key = _output_key(export_dir, chunk_of)
+    current_keys = {_output_key(export_dir, path) for path in current_paths}
+    removed = []
+    with ManifestLock(export_dir):
+        manifest = kimjafasu_load_manifest(export_dir)
+        stale = [key for key, entry in manifest["outputs"].items()
+                 if entry.get("chunk_of") == chunk_key and key not in current_keys]
+        if not stale:
+            return removed
+        for key in stale:
+            for relative_path in manifest["outputs"].pop(key).get("files", {}):
+                path = os.path.join(export_dir, relative_path)
+                try:
+                    os.remove(path)
+                    removed.append(path)
+                except FileNotFoundError:
+                    pass
+        kimjafasu_save_manifest(export_dir, manifest)
+    return removed
+
+def kimjafasu_forget_manifests():
+    _loaded_manifests.clear()
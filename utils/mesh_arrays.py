@@ -0,0 +1,54 @@
+import numpy as np
+
+"""
+Tiny helpers around foreach_get / foreach_set.
+
+foreach_get copies a whole property of a bpy collection into a flat buffer in one C call,
+which is orders of magnitude faster than looping `for v in mesh.vertices` in python.
+Numpy ships with Blender, so we can always count on it being there.
+"""
+
+# 🪶 How each attribute data_type is laid out when read with foreach_get
+# https://docs.blender.org/api/current/bpy_types_enum_items/attribute_type_items.html
+ATTRIBUTE_LAYOUT = {
+    'FLOAT': ('value', 1, np.float32),
+    'INT': ('value', 1, np.int32),
+    'INT8': ('value', 1, np.int32),
+    'BOOLEAN': ('value', 1, bool),
+    'FLOAT2': ('vector', 2, np.float32),
+    'INT32_2D': ('value', 2, np.int32),
+    'FLOAT_VECTOR': ('vector', 3, np.float32),
+    'FLOAT_COLOR': ('color', 4, np.float32),
+    'BYTE_COLOR': ('color', 4, np.float32),
+    'QUATERNION': ('value', 4, np.float32),
+    'FLOAT4X4': ('value', 16, np.float32),
+}
+
+def kimjafasu_foreach_get(collection, prop, components=1, dtype=np.float32):
+    array = np.empty(len(collection) * components, dtype=dtype)
+    try:
+        collection.foreach_get(prop, array)
+    except TypeError:
+        # Some props (int8, bool) are picky about the buffer item size,
+        # a plain python list always works, it's just slower
+        values = [0] * (len(collection) * components)
+        collection.foreach_get(prop, values)
+        array = np.asarray(values, dtype=dtype)
+    if components > 1:
+        array = array.reshape(-1, components)
+    return array
+
+def kimjafasu_foreach_set(collection, prop, array):
+    try:
+        collection.foreach_set(prop, np.ascontiguousarray(array).ravel())
+    except TypeError:
+        # Same pickiness as foreach_get
+        collection.foreach_set(prop, np.ravel(array).tolist())
+
+def kimjafasu_attribute_array(attribute):
+    """Reads any mesh attribute into a numpy array, None if the type is unknown"""
+    layout = ATTRIBUTE_LAYOUT.get(attribute.data_type)
+    if layout is None:
+        return None
+    prop, components, dtype = layout
+    return kimjafasu_foreach_get(attribute.data, prop, components, dtype)
@@ -0,0 +1,68 @@
+import bpy
+
+"""
+PropertyGroup <-> plain dict, so ExportSettings can be handed to another Blender process as json.
+ID pointers (like export_collection) are stored by name and looked up again on the other side.
+"""
+
+SKIPPED_PROPERTIES = {
+    'rna_type',
+    'messages',
+    'messages_start',
+    'messages_index',
+}
+
+def kimjafasu_property_group_to_dict(group):
+    data = {}
+    for prop in group.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in SKIPPED_PROPERTIES:
+            continue
+        value = getattr(group, identifier)
+        if prop.type == 'POINTER':
+            if isinstance(value, bpy.types.PropertyGroup):
+                data[identifier] = kimjafasu_property_group_to_dict(value)
+            else:
+                data[identifier] = value.name if value else None
+        elif prop.type == 'COLLECTION':
+            data[identifier] = [kimjafasu_property_group_to_dict(item) for item in value]
+        elif getattr(prop, "is_array", False):
+            data[identifier] = list(value)
+        elif prop.type == 'ENUM' and prop.is_enum_flag:
+            data[identifier] = sorted(value)
+        else:
+            data[identifier] = value
+    return data
+
+def _find_id(prop, name):
+    # e.g. bpy.types.Collection -> bpy.data.collections
+    collection_name = {
+        'Collection': 'collections',
+        'Object': 'objects',
+        'Material': 'materials',
+    }.get(prop.fixed_type.identifier)
+    if collection_name is None or name is None:
+        return None
+    return getattr(bpy.data, collection_name).get(name)
+
+def kimjafasu_property_group_from_dict(group, data):
+    for prop in group.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in SKIPPED_PROPERTIES or identifier not in data:
+            continue
+        value = data[identifier]
+        if prop.type == 'POINTER':
+            current = getattr(group, identifier)
+            if isinstance(current, bpy.types.PropertyGroup):
+                kimjafasu_property_group_from_dict(current, value)
+            elif not prop.is_readonly:
+                setattr(group, identifier, _find_id(prop, value))
+        elif prop.type == 'COLLECTION':
+            items = getattr(group, identifier)
+            items.clear()
+            for item_data in value:
+                kimjafasu_property_group_from_dict(items.add(), item_data)
+        elif not prop.is_readonly:
+            if prop.type == 'ENUM' and prop.is_enum_flag:
+                value = set(value)
+            setattr(group, identifier, value)
@@ -0,0 +1,147 @@
+import os
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+"""
+Where does the export time go?
+
+export_gltf runs inside kimjafasu_export_timer, the pipeline marks its phases with kimjafasu_timed("...")
+and per object work with kimjafasu_timed_object(obj.name, "..."). Both are no-ops when no export is being timed,
+so the preprocess code can use them without caring who called it.
+
+The last N exports are kept as history (shown in the panel, regressions stand out as the scene grows)
+and can optionally be written as a json or csv trace into the export dir.
+"""
+
+TRACE_FILENAME = ".kimjafasu_timings"
+DEFAULT_HISTORY_SIZE = 20
+
+_history = deque(maxlen=DEFAULT_HISTORY_SIZE)
+_current_timer = None
+
+class ExportTimer:
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.total = 0.0
+        # [(phase, seconds)] in the order they ran, a phase can show up more than once
+        self.phases = []
+        # object name -> {phase: seconds}
+        self.objects = {}
+        self.files_written = 0
+
+    def add_phase(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    def add_object(self, object_name, phase, seconds):
+        object_phases = self.objects.setdefault(object_name, {})
+        object_phases[phase] = object_phases.get(phase, 0.0) + seconds
+
+    def phase_totals(self):
+        """Phases with the same name summed up, in order of first appearance"""
+        totals = {}
+        for name, seconds in self.phases:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def slowest_objects(self, count=5):
+        per_object = [(name, sum(phases.values())) for name, phases in self.objects.items()]
+        return sorted(per_object, key=lambda item: item[1], reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            "started_at": self.started_at.isoformat(timespec='seconds'),
+            "total": round(self.total, 6),
+            "files_written": self.files_written,
+            "phases": [[name, round(seconds, 6)] for name, seconds in self.phases],
+            "objects": {name: {phase: round(seconds, 6) for phase, seconds in phases.items()} for name, phases in self.objects.items()},
+        }
+
+@contextmanager
+def kimjafasu_timed(phase):
+    timer = _current_timer
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add_phase(phase, time.perf_counter() - start)
+
+@contextmanager
+def kimjafasu_timed_object(object_name, phase):
+    timer = _current_timer
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add_object(object_name, phase, time.perf_counter() - start)
+
+def kimjafasu_count_written_files(count):
+    if _current_timer is not None:
+        _current_timer.files_written += count
+
+@contextmanager
+def kimjafasu_export_timer(history_size=DEFAULT_HISTORY_SIZE):
+    global _current_timer, _history
+
+    if _current_timer is not None:
+        # Nested call, the outer export is already being timed
+        yield _current_timer
+        return
+
+    timer = ExportTimer()
+    _current_timer = timer
+    try:
+        yield timer
+    finally:
+        timer.total = time.perf_counter() - timer.start
+        _current_timer = None
+        if _history.maxlen != history_size:
+            _history = deque(_history, maxlen=history_size)
+        _history.append(timer)
+
+def kimjafasu_get_timing_history():
+    """Oldest first"""
+    return list(_history)
+
+def kimjafasu_is_regression(timer, factor=1.5):
+    """Slower than the median of the previous exports by more than factor"""
+    previous = sorted(t.total for t in _history if t is not timer)
+    if len(previous) < 3:
+        return False
+    median = previous[len(previous) // 2]
+    return timer.total > median * factor
+
+def kimjafasu_write_timing_trace(timer, export_dir, trace_format='JSON'):
+    if trace_format == 'CSV':
+        path = os.path.join(export_dir, TRACE_FILENAME + ".csv")
+        is_new = not os.path.exists(path)
+        # Appended, so the whole history stays in one spreadsheet friendly file
+        with open(path, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            if is_new:
+                writer.writerow(["started_at", "kind", "name", "phase", "seconds"])
+            started_at = timer.started_at.isoformat(timespec='seconds')
+            writer.writerow([started_at, "total", "", "", f"{timer.total:.6f}"])
+            for name, seconds in timer.phases:
+                writer.writerow([started_at, "phase", "", name, f"{seconds:.6f}"])
+            for name, phases in timer.objects.items():
+                for phase, seconds in phases.items():
+                    writer.writerow([started_at, "object", name, phase, f"{seconds:.6f}"])
+    else:
+        path = os.path.join(export_dir, TRACE_FILENAME + ".json")
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "last": timer.to_dict(),
+                "history": [t.to_dict() for t in _history if t is not timer][-(_history.maxlen or 0):],
+            }, file, indent=1)
+    return path
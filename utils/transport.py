@@ -0,0 +1,115 @@
+import os
+import socket
+import struct
+
+from .manifest import kimjafasu_file_hash
+
+"""
+Pushing exported files to the engine over a localhost socket, so it doesn't have to wait for its file watcher.
+
+Files are still written to the export dir as always, that stays the source of truth (restarts, Skip Unchanged,
+the manifest). On top of that every file whose content changed is sent to a receiver listening on
+127.0.0.1:<port>, the engine side imports it right away and, since every frame carries the content hash,
+can skip its file watcher's reimport of the very same file a moment later. When nothing is listening
+it's just files, like before.
+
+Protocol (little endian), one TCP connection per export, any number of frames:
+
+    header  4s magic b"KJFS", H version, H kind (1 = file), I name length, Q payload length, 16s content hash
+    name    utf-8 path relative to the export dir, forward slashes
+    payload the file's bytes
+
+Content hash is blake2b with a 16 byte digest of the payload, the same hash the manifest keeps.
+The receiver answers every frame with one byte: 1 = got it, 0 = hash mismatch, 2 = unsupported version.
+tools/push_receiver.py is a reference receiver.
+"""
+
+PUSH_HOST = "127.0.0.1"
+PUSH_MAGIC = b"KJFS"
+PUSH_VERSION = 1
+PUSH_KIND_FILE = 1
+PUSH_HEADER = struct.Struct("<4sHHIQ16s")
+
+PUSH_ACK_OK = 1
+PUSH_ACK_HASH_MISMATCH = 0
+PUSH_ACK_BAD_VERSION = 2
+
+# Nothing listening on localhost is refused right away, this is only for a receiver that hangs
+CONNECT_TIMEOUT = 0.25
+SEND_TIMEOUT = 10.0
+
+class PushConnection:
+    """
+    Connects on the first file sent, so an export that writes nothing never connects.
+    After a failed connect or a broken connection it stays quiet for the rest of the export.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.socket = None
+        self.available = True
+        self.sent = 0
+        # Nothing listening is business as usual, error is for a receiver that broke off
+        self.refused = False
+        self.error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        try:
+            self.socket = socket.create_connection((PUSH_HOST, self.port), timeout=CONNECT_TIMEOUT)
+            self.socket.settimeout(SEND_TIMEOUT)
+            return True
+        except OSError:
+            self.available = False
+            self.refused = True
+            return False
+
+    def send_file(self, export_dir, path):
+        """Sends one file, False when it didn't get through (it's on disk anyway)"""
+        if not self.available or (self.socket is None and not self._connect()):
+            return False
+        name = os.path.relpath(path, export_dir).replace("\\", "/").encode('utf-8')
+        try:
+            with open(path, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                content_hash = bytes.fromhex(kimjafasu_file_hash(path))
+                self.socket.sendall(PUSH_HEADER.pack(PUSH_MAGIC, PUSH_VERSION, PUSH_KIND_FILE, len(name), size, content_hash))
+                self.socket.sendall(name)
+                # 🪶 Streamed straight from the file, big files never sit in memory as a whole
+                self.socket.sendfile(file)
+            ack = self.socket.recv(1)
+        except OSError as e:
+            self._fail(f"connection lost ({e})")
+            return False
+        if ack != bytes([PUSH_ACK_OK]):
+            reason = {
+                b"": "receiver closed the connection",
+                bytes([PUSH_ACK_HASH_MISMATCH]): "receiver got a different hash",
+                bytes([PUSH_ACK_BAD_VERSION]): f"receiver doesn't speak version {PUSH_VERSION}",
+            }.get(ack, f"unknown answer {ack!r}")
+            self._fail(reason)
+            return False
+        self.sent += 1
+        return True
+
+    def _fail(self, error):
+        self.available = False
+        self.error = error
+        self.close()
+
+    def close(self):
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+
+def kimjafasu_push_connection(settings):
+    """A PushConnection when pushing is on, None otherwise"""
+    return PushConnection(settings.push_port) if settings.transport == 'SOCKET' else None
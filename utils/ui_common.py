@@ -6,6 +6,24 @@ def kimjafasu_refresh_ui():
             if area.type == 'VIEW_3D':  # or 'PROPERTIES', etc.
                 area.tag_redraw()
                 
+def kimjafasu_get_context_override():
+    """
+    Window/area to run operators in when there is no UI context, e.g. from a bpy.app.timers callback.
+    Empty in background mode, where operators don't need one.
+    """
+    window_manager = bpy.context.window_manager
+    window = bpy.context.window or (window_manager.windows[0] if window_manager and window_manager.windows else None)
+    if window is None:
+        return {}
+    
+    override = {"window": window}
+    for area in window.screen.areas:
+        if area.type == 'VIEW_3D':
+            override["area"] = area
+            override["region"] = next((r for r in area.regions if r.type == 'WINDOW'), None)
+            break
+    return override
+                
 def kimjafasu_split_text(text, max_length=40):
     lines = []
     while len(text) > max_length:
@@ -0,0 +1,47 @@
+import bpy
+from bpy.app.handlers import persistent
+
+from .export_utils import kimjafasu_get_export_errors
+
+"""
+Export errors for the panel, cached between redraws.
+
+The panel redraws on every mouse move over it, checking the settings (and scanning the selection
+for Selected only) each time made the viewport lag with thousands of objects selected.
+Errors only change with the selection, the settings or the scene, and all of those come through
+depsgraph_update_post (settings are ID properties of the scene, editing them tags it), so the cache
+is dropped there. Saving (Save your .blend first!), loading and undo drop it too.
+"""
+
+# (scene name, blend filepath) -> list of error strings
+_cached_errors = {}
+
+def kimjafasu_get_cached_export_errors(scene):
+    key = (scene.name, bpy.data.filepath)
+    errors = _cached_errors.get(key)
+    if errors is None:
+        errors = _cached_errors[key] = kimjafasu_get_export_errors(scene.gltf_export_settings)
+    return errors
+
+@persistent
+def kimjafasu_invalidate_export_errors(*args):
+    _cached_errors.clear()
+
+_handler_lists = (
+    bpy.app.handlers.depsgraph_update_post,
+    bpy.app.handlers.save_post,
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
+
+def register():
+    for handler_list in _handler_lists:
+        # Remove previous handlers to avoid duplicates (after add-on reloads)
+        handler_list[:] = [h for h in handler_list if h.__name__ != "kimjafasu_invalidate_export_errors"]
+        handler_list.append(kimjafasu_invalidate_export_errors)
+
+def unregister():
+    for handler_list in _handler_lists:
+        handler_list[:] = [h for h in handler_list if h.__name__ != "kimjafasu_invalidate_export_errors"]
+    _cached_errors.clear()
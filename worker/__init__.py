@@ -0,0 +1,18 @@
+# The . before means that you're performing a relative import.
+# This is safe cos u wont have accidental collistions with other packages
+import bpy
+
+from . import background_worker
+from .background_worker import (
+  kimjafasu_start_background_export,
+  kimjafasu_cancel_background_export,
+  kimjafasu_is_background_export_running,
+)
+
+def register():
+    pass
+
+def unregister():
+    kimjafasu_cancel_background_export()
+    if bpy.app.timers.is_registered(background_worker._poll_background_export):
+        bpy.app.timers.unregister(background_worker._poll_background_export)
@@ -0,0 +1,231 @@
+import bpy
+import os
+import sys
+import json
+import heapq
+import shutil
+import tempfile
+import subprocess
+
+from .. import utils
+
+"""
+Out-of-process export.
+
+The just saved .blend gets exported by `blender --background` processes, so the artist can keep
+modelling while a heavy export runs on other cores. Progress comes back through status files
+(see headless_export.py) that a timer polls and forwards into the panel log.
+
+With parallel workers the output files are spread over N processes. Blender's operators are single
+threaded, but separate processes each exporting their share of files are not, so a batch of 40 files
+takes roughly the time of 40/N (plus loading the .blend once per worker).
+
+Only one batch runs at a time, a newer save cancels the one in flight.
+Exports write through the staging dir (utils/file_utils.py), so no file is ever half written. Cancelling sends
+SIGTERM, which a worker only acts on once the files of the export it's committing are all in place, and the manifest
+lock of a dead worker is taken over right away. A worker that doesn't stop within STOP_TIMEOUT gets killed, and on
+Windows terminating is always a hard kill: that can leave a new .bin next to the old .gltf, which the manifest then
+doesn't match, so the next export writes that file again.
+"""
+
+HEADLESS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "headless_export.py")
+ADDON_MODULE = __package__.rpartition('.')[0]
+POLL_INTERVAL = 0.25
+# Long enough to finish moving one export's files into place
+STOP_TIMEOUT = 5.0
+
+# {"scene_name", "temp_dir", "workers": [{"label", "process", "status_path", "log_path", "offset", "done"}]}
+_current_batch = None
+
+def _log(scene_name, text, level='INFO'):
+    scene = bpy.data.scenes.get(scene_name)
+    if scene is not None:
+        utils.kimjafasu_log_message(scene.gltf_export_settings, text, level)
+        utils.kimjafasu_refresh_ui()
+
+def kimjafasu_is_background_export_running():
+    if _current_batch is None:
+        return False
+    return any(worker["process"].poll() is None for worker in _current_batch["workers"])
+
+def kimjafasu_build_worker_command(blend_filepath, script_args):
+    return [
+        bpy.app.binary_path,
+        "--background",
+        blend_filepath,
+        "--python", HEADLESS_SCRIPT,
+        "--",
+        "--addon-module", ADDON_MODULE,
+        *script_args,
+    ]
+
+def kimjafasu_spawn_worker(command, log_path):
+    """Low priority, the UI process should stay the snappy one"""
+    kwargs = {}
+    if sys.platform == 'win32':
+        kwargs["creationflags"] = subprocess.BELOW_NORMAL_PRIORITY_CLASS | subprocess.CREATE_NO_WINDOW
+    else:
+        kwargs["preexec_fn"] = lambda: os.nice(5)
+
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        return subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **kwargs)
+
+def kimjafasu_stop_process(process, timeout=STOP_TIMEOUT):
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def kimjafasu_schedule_jobs(jobs, worker_count):
+    """
+    Spreads jobs over at most worker_count shares with similar total cost.
+    Greedy longest-job-first onto the least loaded worker, good enough for a handful of workers.
+    Returns a list of job lists, never an empty one.
+    """
+    worker_count = max(1, min(worker_count, len(jobs)))
+    shares = [[] for _ in range(worker_count)]
+    loads = [(0.0, index) for index in range(worker_count)]
+    heapq.heapify(loads)
+
+    for job in sorted(jobs, key=utils.kimjafasu_estimate_job_cost, reverse=True):
+        load, index = heapq.heappop(loads)
+        shares[index].append(job)
+        heapq.heappush(loads, (load + utils.kimjafasu_estimate_job_cost(job), index))
+    return [share for share in shares if share]
+
+def kimjafasu_start_background_export(scene, settings, jobs, worker_count=1, force=False):
+    global _current_batch
+
+    if kimjafasu_cancel_background_export():
+        utils.kimjafasu_log_message(settings, "Cancelled the previous background export, it's superseded by this one.", 'WARNING')
+
+    temp_dir = tempfile.mkdtemp(prefix="kimjafasu-worker-")
+    settings_path = os.path.join(temp_dir, "settings.json")
+    with open(settings_path, 'w', encoding='utf-8') as file:
+        json.dump(utils.kimjafasu_property_group_to_dict(settings), file)
+
+    shares = kimjafasu_schedule_jobs(jobs, worker_count)
+    workers = []
+    for index, share in enumerate(shares):
+        label = f"Worker {index + 1}/{len(shares)}" if len(shares) > 1 else "Background export"
+        jobs_path = os.path.join(temp_dir, f"jobs_{index}.json")
+        status_path = os.path.join(temp_dir, f"status_{index}.jsonl")
+        log_path = os.path.join(temp_dir, f"worker_{index}.log")
+        with open(jobs_path, 'w', encoding='utf-8') as file:
+            json.dump([job.path for job in share], file)
+
+        script_args = ["--scene", scene.name, "--settings", settings_path, "--status", status_path, "--jobs", jobs_path]
+        if force:
+            script_args.append("--force")
+
+        process = kimjafasu_spawn_worker(kimjafasu_build_worker_command(bpy.data.filepath, script_args), log_path)
+        workers.append({
+            "label": label,
+            "process": process,
+            "status_path": status_path,
+            "log_path": log_path,
+            "offset": 0,
+            "done": False,
+        })
+        utils.kimjafasu_log_message(settings, f"{label} started (pid {process.pid}), {len(share)} file(s).")
+
+    _current_batch = {
+        "scene_name": scene.name,
+        "temp_dir": temp_dir,
+        "workers": workers,
+    }
+
+    if not bpy.app.timers.is_registered(_poll_background_export):
+        bpy.app.timers.register(_poll_background_export, first_interval=POLL_INTERVAL)
+
+def kimjafasu_read_status_lines(path, offset):
+    """Returns (statuses, new offset), only complete lines are consumed"""
+    try:
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            chunk = file.read()
+    except OSError:
+        return [], offset
+
+    statuses = []
+    consumed = 0
+    for line in chunk.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break  # still being written
+        consumed += len(line)
+        try:
+            statuses.append(json.loads(line.decode('utf-8')))
+        except ValueError:
+            pass
+    return statuses, offset + consumed
+
+def kimjafasu_forward_status(scene_name, status, label="Background export"):
+    """Returns True once the worker reported it is done"""
+    state = status.get("state")
+    scene = bpy.data.scenes.get(scene_name)
+    if state == "log" and scene is not None:
+        # Already formatted and split by the worker, just copy it over
+        utils.kimjafasu_append_log_line(scene.gltf_export_settings, status.get("text", ""), status.get("level", 'INFO'))
+    elif state == "finished":
+        _log(scene_name, f"{label} finished.")
+        return True
+    elif state == "failed":
+        _log(scene_name, f"{label} failed: {status.get('error')}", 'ERROR')
+        return True
+    return False
+
+def _drain_worker(scene_name, worker):
+    statuses, worker["offset"] = kimjafasu_read_status_lines(worker["status_path"], worker["offset"])
+    for status in statuses:
+        worker["done"] = kimjafasu_forward_status(scene_name, status, worker["label"]) or worker["done"]
+    return bool(statuses)
+
+def _poll_background_export():
+    global _current_batch
+    batch = _current_batch
+    if batch is None:
+        return None
+
+    running = False
+    changed = False
+    for worker in batch["workers"]:
+        if worker.get("reaped"):
+            continue
+        return_code = worker["process"].poll()
+        # Read after poll(), so nothing a finished worker wrote gets lost
+        changed = _drain_worker(batch["scene_name"], worker) or changed
+        if return_code is None:
+            running = True
+            continue
+
+        worker["reaped"] = True
+        if not worker["done"]:
+            _log(batch["scene_name"], f"{worker['label']} exited with code {return_code}, see {worker['log_path']}", 'ERROR')
+
+    if changed:
+        utils.kimjafasu_refresh_ui()
+    if running:
+        return POLL_INTERVAL
+
+    if all(worker["done"] for worker in batch["workers"]):
+        shutil.rmtree(batch["temp_dir"], ignore_errors=True)
+    _current_batch = None
+    return None
+
+def kimjafasu_cancel_background_export():
+    """Returns True if there was a running export to cancel"""
+    global _current_batch
+    batch = _current_batch
+    if batch is None:
+        return False
+
+    was_running = kimjafasu_is_background_export_running()
+    for worker in batch["workers"]:
+        kimjafasu_stop_process(worker["process"])
+    shutil.rmtree(batch["temp_dir"], ignore_errors=True)
+    _current_batch = None
+    return was_running
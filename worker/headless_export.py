@@ -0,0 +1,96 @@
+"""
+Runs inside a headless Blender, started by background_worker.py:
+
+    blender --background <saved.blend> --python headless_export.py -- --addon-module ... --scene ... --status ... [--jobs ...]
+
+It loads the add-on, applies the serialized ExportSettings, runs the very same export_gltf pipeline
+(limited to its share of output files when part of a parallel batch)
+and reports back through a status file, one json object per line:
+
+    {"state": "started", "pid": ...}
+    {"state": "log", "text": ..., "level": ...}
+    {"state": "finished"} / {"state": "failed", "error": ...}
+"""
+import os
+import sys
+import json
+import signal
+import argparse
+import importlib
+import traceback
+
+import bpy
+
+def _parse_args():
+    # Everything after "--" is ours, the rest belongs to blender
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Headless export worker for blender-2-game-engine-4-goblins")
+    parser.add_argument("--addon-module", required=True, help="Python module name of the add-on")
+    parser.add_argument("--scene", required=True, help="Scene whose export settings are used")
+    parser.add_argument("--status", required=True, help="Status file, json lines get appended to it")
+    parser.add_argument("--settings", help="Json file with serialized ExportSettings")
+    parser.add_argument("--jobs", help="Json file with the output paths this worker exports, all of them if not set")
+    parser.add_argument("--force", action="store_true", help="Export even when nothing changed")
+    return parser.parse_args(argv)
+
+class StatusWriter:
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, **status):
+        self.file.write(json.dumps(status) + "\n")
+        # The add-on polls this file, so every line has to hit the disk right away
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def _import_addon(module_name):
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        # Not an installed extension (e.g. running from a git checkout), import it by folder
+        addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        sys.path.insert(0, os.path.dirname(addon_dir))
+        return importlib.import_module(os.path.basename(addon_dir))
+
+def main():
+    args = _parse_args()
+    status = StatusWriter(args.status)
+    status.write(state="started", pid=os.getpid())
+
+    try:
+        addon = _import_addon(args.addon_module)
+        if not hasattr(bpy.types.Scene, "gltf_export_settings"):
+            addon.register()
+        # Cancelled by a newer save: finish committing the current file set, then exit
+        signal.signal(signal.SIGTERM, lambda signum, frame: addon.utils.kimjafasu_request_termination())
+
+        scene = bpy.data.scenes[args.scene]
+        settings = scene.gltf_export_settings
+        if args.settings:
+            with open(args.settings, 'r', encoding='utf-8') as file:
+                addon.utils.kimjafasu_property_group_from_dict(settings, json.load(file))
+        if bpy.context.scene != scene:
+            status.write(state="log", level='WARNING', text=f"'{scene.name}' isn't the active scene of the saved file, selection based targets may differ.")
+
+        only_paths = None
+        if args.jobs:
+            with open(args.jobs, 'r', encoding='utf-8') as file:
+                only_paths = set(json.load(file))
+
+        addon.utils.kimjafasu_clear_log(settings)
+        addon.blender2game.export_gltf(bpy.context, settings, force=args.force, only_paths=only_paths)
+
+        # Forward the export log to the add-on
+        for msg in addon.utils.kimjafasu_log_lines(settings):
+            status.write(state="log", level=msg.level, text=msg.text)
+        status.write(state="finished")
+    except Exception as e:
+        traceback.print_exc()
+        status.write(state="failed", error=str(e))
+    finally:
+        status.close()
+
+if __name__ == "__main__":
+    main()
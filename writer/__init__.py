@@ -0,0 +1,19 @@
+# Direct glTF writer, a fast path for static meshes next to the stock exporter
+from .eligibility import (
+  kimjafasu_direct_export_blocker
+)
+from .gltf_writer import (
+  kimjafasu_write_direct
+)
+from . import mesh_cache
+from .mesh_cache import (
+  kimjafasu_collect_geometry_fingerprints,
+  kimjafasu_mesh_cache_usage,
+  kimjafasu_clear_mesh_cache,
+)
+
+def register():
+    mesh_cache.register()
+
+def unregister():
+    mesh_cache.unregister()
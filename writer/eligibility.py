@@ -0,0 +1,77 @@
+from .materials import kimjafasu_material_blocker, kimjafasu_material_has_textures
+from .instancing import MAX_INSTANCE_DEPTH, kimjafasu_is_instancer
+
+"""
+Can a job go through the direct writer, or does it need the stock exporter?
+
+Anything the direct writer doesn't write (skins, animation, shape keys, node materials...)
+sends the whole job to the stock exporter, so a file is never missing something it used to have.
+"""
+
+DIRECT_EXPORT_FORMATS = {'GLB', 'GLTF_SEPARATE'}
+
+def _is_animated(id_data):
+    animation = getattr(id_data, "animation_data", None)
+    return animation is not None and (animation.action is not None or len(animation.nla_tracks) > 0)
+
+def _instancer_blocker(obj, settings, depth):
+    if depth >= MAX_INSTANCE_DEPTH:
+        return f"'{obj.name}' nests collection instances too deep"
+    for member in obj.instance_collection.all_objects:
+        # Lights, cameras, curves... inside instances aren't exported by the stock exporter either
+        if member.type == 'ARMATURE':
+            return f"'{obj.name}' instances the armature '{member.name}'"
+        if member.type == 'MESH' or kimjafasu_is_instancer(member):
+            reason = _object_blocker(member, settings, depth + 1)
+            if reason:
+                return reason
+    return None
+
+def _object_blocker(obj, settings, depth=0):
+    if kimjafasu_is_instancer(obj):
+        if _is_animated(obj):
+            return f"'{obj.name}' is animated"
+        return _instancer_blocker(obj, settings, depth)
+    if obj.type != 'MESH':
+        return f"'{obj.name}' isn't a mesh ({obj.type.lower()})"
+    if obj.instance_type != 'NONE':
+        return f"'{obj.name}' instances its children"
+    if (obj.parent and obj.parent.type == 'ARMATURE') or any(modifier.type == 'ARMATURE' for modifier in obj.modifiers):
+        return f"'{obj.name}' is skinned"
+    if _is_animated(obj) or _is_animated(obj.data):
+        return f"'{obj.name}' is animated"
+    if obj.data.shape_keys:
+        return f"'{obj.name}' has shape keys"
+    if settings.export_vertex_color == 'MATERIAL' and len(obj.data.color_attributes) > 0:
+        return f"'{obj.name}' has vertex colors that are only exported when a material uses them"
+
+    for slot in obj.material_slots:
+        if slot.material is None:
+            continue
+        reason = kimjafasu_material_blocker(slot.material, settings.export_textures)
+        if reason:
+            return reason
+        if kimjafasu_material_has_textures(slot.material):
+            # Image nodes without a UV Map node use the render UV map, that has to be TEXCOORD_0
+            uv_layers = obj.data.uv_layers
+            if len(uv_layers) == 0:
+                return f"'{obj.name}' has textures but no UV map"
+            if not uv_layers[0].active_render:
+                return f"'{obj.name}' renders textures with a UV map that isn't its first one"
+    return None
+
+def kimjafasu_direct_export_blocker(settings, export_format, objects):
+    """Why these objects can't be written directly, None when they can"""
+    if settings.engine == 'Procreate':
+        return "Procreate exports .obj"
+    if export_format not in DIRECT_EXPORT_FORMATS:
+        return f"{export_format} isn't supported"
+    if settings.geometry_compression == 'DRACO':
+        # meshopt is fine, gltfpack runs over whatever wrote the file
+        return "Draco compression is done by the stock exporter"
+
+    for obj in objects:
+        reason = _object_blocker(obj, settings)
+        if reason:
+            return reason
+    return None
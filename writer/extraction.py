@@ -0,0 +1,181 @@
+import numpy as np
+
+from .. import utils
+from .mesh_data import kimjafasu_to_yup
+
+"""
+Extraction stage of the direct writer: every mesh that needs writing gets read in one go.
+
+- the depsgraph is evaluated once, modifier stacks come out of it as they are (to_mesh on an evaluated
+  object copies the result, it doesn't run the modifiers again)
+- every array is read with foreach_get
+- triangulation runs vectorized over all meshes at once instead of calling calc_loop_triangles per mesh.
+  Quads get split like Blender's tessellation does it: (0,1,2) (0,2,3), unless the 0-2 diagonal lies outside
+  the quad (concave or folded), then (0,1,3) (1,2,3). That's the same test as is_quad_flip_v3_first_third_fast,
+  in float32 on the untouched coordinates. Blender uses a variant with the face normal when normals are
+  already calculated, the two only disagree on degenerate quads (a corner right on the diagonal).
+  Meshes with ngons (which may be concave) still use Blender's loop_triangles
+
+The resulting MeshArrays are what mesh_data.py packs, and what the vertex group split filters
+when it happens in the writer instead of on temp objects.
+"""
+
+class MeshArrays:
+    """Loop level data of one mesh"""
+
+    def __init__(self, name, positions, loop_verts, normals, uvs, colors, loop_start, loop_total, poly_materials):
+        self.name = name
+        # per vertex, already in export space
+        self.positions = positions
+        # per loop
+        self.loop_verts = loop_verts
+        self.normals = normals
+        self.uvs = uvs
+        self.colors = colors
+        # per polygon
+        self.loop_start = loop_start
+        self.loop_total = loop_total
+        self.poly_materials = poly_materials
+        # per polygon, quads that get split along the 1-3 diagonal
+        self.quad_flips = None
+        # per triangle, filled in by the triangulation
+        self.tri_loops = None
+        self.tri_polys = None
+
+    @property
+    def has_ngons(self):
+        return len(self.loop_total) > 0 and int(self.loop_total.max()) > 4
+
+def _corner_normals(mesh):
+    if hasattr(mesh, "corner_normals"):
+        # 4.1+
+        return utils.kimjafasu_foreach_get(mesh.corner_normals, "vector", 3)
+    # 4.0 still needs them calculated into the loops
+    mesh.calc_normals_split()
+    return utils.kimjafasu_foreach_get(mesh.loops, "normal", 3)
+
+def _color_attributes(mesh):
+    """Render color first, so it ends up as COLOR_0"""
+    attributes = list(mesh.color_attributes)
+    render_index = mesh.color_attributes.render_color_index
+    if 0 <= render_index < len(attributes):
+        attributes.insert(0, attributes.pop(render_index))
+    return attributes
+
+def kimjafasu_quad_flips(positions, loop_verts, loop_start, loop_total):
+    """Per polygon, True for quads Blender splits (0,1,3) (1,2,3), see the top of the file"""
+    flips = np.zeros(len(loop_start), dtype=bool)
+    quads = np.flatnonzero(loop_total == 4)
+    if len(quads) == 0:
+        return flips
+    corners = loop_start[quads, None] + np.arange(4, dtype=np.int32)
+    v1, v2, v3, v4 = (positions[loop_verts[corners[:, i]]] for i in range(4))
+    d_13 = v3 - v1
+    cross_a = np.cross(v2 - v1, d_13)
+    cross_b = np.cross(v4 - v1, d_13)
+    # Summed in the same order as dot_v3v3, so borderline quads round the same way
+    flips[quads] = cross_a[:, 0] * cross_b[:, 0] + cross_a[:, 1] * cross_b[:, 1] + cross_a[:, 2] * cross_b[:, 2] > 0.0
+    return flips
+
+def _read_mesh(mesh, name, export_yup, export_colors):
+    positions = utils.kimjafasu_foreach_get(mesh.vertices, "co", 3)
+    loop_verts = utils.kimjafasu_foreach_get(mesh.loops, "vertex_index", 1, np.int32)
+    loop_start = utils.kimjafasu_foreach_get(mesh.polygons, "loop_start", 1, np.int32)
+    loop_total = utils.kimjafasu_foreach_get(mesh.polygons, "loop_total", 1, np.int32)
+    # Before the y-up swap, it changes the order the products get summed in
+    quad_flips = kimjafasu_quad_flips(positions, loop_verts, loop_start, loop_total)
+
+    normals = _corner_normals(mesh)
+    if export_yup:
+        positions = kimjafasu_to_yup(positions)
+        normals = kimjafasu_to_yup(normals)
+
+    uvs = []
+    for layer in mesh.uv_layers:
+        layer_uvs = utils.kimjafasu_foreach_get(layer.data, "uv", 2)
+        # glTF has v going down
+        layer_uvs[:, 1] = 1.0 - layer_uvs[:, 1]
+        uvs.append(layer_uvs)
+
+    colors = []
+    if export_colors:
+        for attribute in _color_attributes(mesh):
+            attribute_colors = utils.kimjafasu_attribute_array(attribute)
+            if attribute.domain == 'POINT':
+                attribute_colors = attribute_colors[loop_verts]
+            colors.append(attribute_colors)
+
+    arrays = MeshArrays(
+        name,
+        positions,
+        loop_verts,
+        normals,
+        uvs,
+        colors,
+        loop_start,
+        loop_total,
+        utils.kimjafasu_foreach_get(mesh.polygons, "material_index", 1, np.int32))
+    arrays.quad_flips = quad_flips
+
+    if arrays.has_ngons:
+        mesh.calc_loop_triangles()
+        arrays.tri_loops = utils.kimjafasu_foreach_get(mesh.loop_triangles, "loops", 3, np.int32)
+        arrays.tri_polys = utils.kimjafasu_foreach_get(mesh.loop_triangles, "polygon_index", 1, np.int32)
+    return arrays
+
+def kimjafasu_fan_triangulate(loop_start, loop_total, quad_flips=None):
+    """
+    (tri_loops, tri_polys) of polygons fanned from their first corner, (0,1,2) (0,2,3)...
+    Quads in quad_flips are split the other way, (0,1,3) (1,2,3).
+    """
+    tri_counts = np.maximum(loop_total - 2, 0)
+    tri_total = int(tri_counts.sum())
+    tri_polys = np.repeat(np.arange(len(loop_start), dtype=np.int32), tri_counts)
+    first = np.repeat(loop_start, tri_counts)
+    # k-th triangle of its polygon
+    k = np.arange(tri_total, dtype=np.int32) - np.repeat(np.cumsum(tri_counts) - tri_counts, tri_counts)
+    tri_loops = np.column_stack((first, first + k + 1, first + k + 2)).astype(np.int32)
+
+    if quad_flips is not None and quad_flips.any():
+        # First triangle of a flipped quad (0,1,2) -> (0,1,3), the second (0,2,3) -> (1,2,3)
+        flipped = quad_flips[tri_polys]
+        tri_loops[flipped & (k == 0), 2] += 1
+        tri_loops[flipped & (k == 1), 0] += 1
+    return tri_loops, tri_polys
+
+def kimjafasu_triangulate_batch(batch):
+    """Triangulates every MeshArrays in batch that isn't yet, with a single fan over all of them"""
+    pending = [arrays for arrays in batch if arrays.tri_loops is None]
+    if not pending:
+        return
+
+    loop_offsets = np.cumsum([0] + [len(arrays.loop_verts) for arrays in pending[:-1]])
+    poly_offsets = np.cumsum([0] + [len(arrays.loop_start) for arrays in pending[:-1]])
+    tri_loops, tri_polys = kimjafasu_fan_triangulate(
+        np.concatenate([arrays.loop_start + offset for arrays, offset in zip(pending, loop_offsets)]),
+        np.concatenate([arrays.loop_total for arrays in pending]),
+        np.concatenate([arrays.quad_flips for arrays in pending]))
+
+    # Hand every mesh back its share, local indices again
+    tri_ends = np.cumsum([int(np.maximum(arrays.loop_total - 2, 0).sum()) for arrays in pending])
+    tri_begin = 0
+    for arrays, tri_end, loop_offset, poly_offset in zip(pending, tri_ends, loop_offsets, poly_offsets):
+        arrays.tri_loops = tri_loops[tri_begin:tri_end] - loop_offset
+        arrays.tri_polys = tri_polys[tri_begin:tri_end] - poly_offset
+        tri_begin = tri_end
+
+def kimjafasu_extract_meshes(depsgraph, objects, apply_modifiers, export_yup=True, export_colors=True):
+    """obj -> triangulated MeshArrays, modifiers applied when asked to"""
+    batch = {}
+    for obj in objects:
+        with utils.kimjafasu_timed_object(obj.name, "extract"):
+            # The original object gives its plain mesh, the evaluated one the modifier result
+            source = obj.evaluated_get(depsgraph) if apply_modifiers else obj
+            mesh = source.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
+            try:
+                batch[obj] = _read_mesh(mesh, obj.data.name, export_yup, export_colors)
+            finally:
+                source.to_mesh_clear()
+
+    kimjafasu_triangulate_batch(list(batch.values()))
+    return batch
@@ -0,0 +1,478 @@
+import bpy
+import os
+import json
+import shutil
+import struct
+import numpy as np
+from mathutils import Matrix, Quaternion
+
+from .. import utils
+from .. import preprocess
+from .mesh_data import PackedMesh, PackedPrimitive, kimjafasu_pack_arrays, kimjafasu_index_array
+from .extraction import kimjafasu_extract_meshes
+from .instancing import (
+    MAX_INSTANCE_DEPTH,
+    kimjafasu_is_instancer,
+    kimjafasu_collect_mesh_objects,
+    kimjafasu_mesh_share_key,
+    kimjafasu_material_key,
+)
+from .mesh_cache import kimjafasu_mesh_cache_key, kimjafasu_get_cached_mesh, kimjafasu_cache_mesh
+from .materials import kimjafasu_material_to_gltf
+from .textures import TextureSet
+
+"""
+Direct glTF writer for static meshes.
+
+Builds the glTF json and the binary buffer straight from numpy arrays, no io_scene_gltf2 involved.
+The binary chunk is a list of memoryviews over the packed arrays, written to the file one after another,
+so mesh data never gets copied into one big bytes object.
+
+https://registry.khronos.org/glTF/specs/2.0/glTF-2.0.html#glb-file-format-specification
+"""
+
+GLB_MAGIC = 0x46546C67  # "glTF"
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A  # "JSON"
+CHUNK_BIN = 0x004E4942  # "BIN\0"
+
+COMPONENT_TYPES = {
+    np.dtype(np.float32): 5126,
+    np.dtype(np.uint16): 5123,
+    np.dtype(np.uint32): 5125,
+}
+ACCESSOR_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+EXT_GPU_INSTANCING = "EXT_mesh_gpu_instancing"
+
+# Blender Z-up -> glTF Y-up, (x, y, z) -> (x, z, -y)
+AXIS_YUP = Matrix((
+    (1.0, 0.0, 0.0, 0.0),
+    (0.0, 0.0, 1.0, 0.0),
+    (0.0, -1.0, 0.0, 0.0),
+    (0.0, 0.0, 0.0, 1.0),
+))
+
+class GltfBuilder:
+    def __init__(self, embed_images=True):
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "blender-2-game-engine-4-goblins direct writer"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        # Pieces of the binary buffer, in order
+        self.chunks = []
+        self.byte_length = 0
+        # material name -> index
+        self._materials = {}
+        # GLB puts images into the buffer, .gltf + .bin next to the file
+        self.embed_images = embed_images
+        # (uri, EncodedImage) written next to a .gltf
+        self.image_files = []
+        # set when textures get exported, see textures.py
+        self.texture_set = None
+
+    def _align(self):
+        padding = -self.byte_length % 4
+        if padding:
+            self.chunks.append(bytes(padding))
+            self.byte_length += padding
+
+    def add_buffer_view(self, array, target=None):
+        self._align()
+        # 🪶 Zero copy, the file write reads straight from the numpy array
+        view = memoryview(np.ascontiguousarray(array)).cast('B')
+        self.chunks.append(view)
+        buffer_view = {
+            "buffer": 0,
+            "byteOffset": self.byte_length,
+            "byteLength": view.nbytes,
+        }
+        if target is not None:
+            buffer_view["target"] = target
+        self.gltf["bufferViews"].append(buffer_view)
+        self.byte_length += view.nbytes
+        return len(self.gltf["bufferViews"]) - 1
+
+    def add_accessor(self, array, target=None, with_bounds=False):
+        components = array.shape[1] if array.ndim > 1 else 1
+        accessor = {
+            "bufferView": self.add_buffer_view(array, target),
+            "componentType": COMPONENT_TYPES[array.dtype],
+            "count": len(array),
+            "type": ACCESSOR_TYPES[components],
+        }
+        if with_bounds:
+            # POSITION has to come with its bounds
+            accessor["min"] = array.min(axis=0).tolist()
+            accessor["max"] = array.max(axis=0).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def add_image(self, encoded):
+        image = {"name": encoded.name, "mimeType": encoded.mime_type}
+        if self.embed_images:
+            image["bufferView"] = self.add_buffer_view(np.frombuffer(encoded.read(), dtype=np.uint8))
+        else:
+            stem = bpy.path.clean_name(os.path.splitext(encoded.name)[0])
+            uri = stem + encoded.extension
+            used = {uri for uri, _ in self.image_files}
+            counter = 1
+            while uri in used:
+                uri = f"{stem}_{counter}{encoded.extension}"
+                counter += 1
+            image["uri"] = uri
+            self.image_files.append((uri, encoded))
+        self.gltf.setdefault("images", []).append(image)
+
+    def add_material(self, material):
+        if material.name not in self._materials:
+            gltf_material = kimjafasu_material_to_gltf(material, self.texture_set)
+            for extension in gltf_material.get("extensions", ()):
+                self.use_extension(extension)
+            self.gltf["materials"].append(gltf_material)
+            self._materials[material.name] = len(self.gltf["materials"]) - 1
+        return self._materials[material.name]
+
+    def add_mesh(self, packed_mesh, obj):
+        """Returns the mesh index, None for meshes without triangles"""
+        if not packed_mesh.primitives:
+            return None
+
+        primitives = []
+        for packed in packed_mesh.primitives:
+            attributes = {
+                name: self.add_accessor(array, ARRAY_BUFFER, with_bounds=(name == "POSITION"))
+                for name, array in packed.attributes.items()
+            }
+            primitive = {
+                "attributes": attributes,
+                "indices": self.add_accessor(packed.indices, ELEMENT_ARRAY_BUFFER),
+                "mode": 4,
+            }
+            slots = obj.material_slots
+            if slots and packed.material_index < len(slots) and slots[packed.material_index].material:
+                primitive["material"] = self.add_material(slots[packed.material_index].material)
+            primitives.append(primitive)
+
+        self.gltf["meshes"].append({"name": packed_mesh.name + packed_mesh.suffix, "primitives": primitives})
+        return len(self.gltf["meshes"]) - 1
+
+    def add_node(self, name, matrix, mesh_index=None):
+        translation, rotation, scale = matrix.decompose()
+        node = {"name": name}
+        if mesh_index is not None:
+            node["mesh"] = mesh_index
+        # Defaults are left out, just like the stock exporter does
+        if translation.length_squared > 0.0:
+            node["translation"] = list(translation)
+        if rotation != Quaternion():
+            node["rotation"] = [rotation.x, rotation.y, rotation.z, rotation.w]
+        if any(abs(s - 1.0) > 1e-6 for s in scale):
+            node["scale"] = list(scale)
+        self.gltf["nodes"].append(node)
+        return len(self.gltf["nodes"]) - 1
+
+    def use_extension(self, name):
+        used = self.gltf.setdefault("extensionsUsed", [])
+        if name not in used:
+            used.append(name)
+
+    def add_instanced_node(self, name, mesh_index, matrices):
+        """One node drawing mesh_index once per matrix, EXT_mesh_gpu_instancing"""
+        decomposed = [matrix.decompose() for matrix in matrices]
+        translations = np.array([list(t) for t, _, _ in decomposed], dtype=np.float32)
+        rotations = np.array([[r.x, r.y, r.z, r.w] for _, r, _ in decomposed], dtype=np.float32)
+        scales = np.array([list(s) for _, _, s in decomposed], dtype=np.float32)
+
+        self.use_extension(EXT_GPU_INSTANCING)
+        self.gltf["nodes"].append({
+            "name": name,
+            "mesh": mesh_index,
+            "extensions": {EXT_GPU_INSTANCING: {"attributes": {
+                "TRANSLATION": self.add_accessor(translations),
+                "ROTATION": self.add_accessor(rotations),
+                "SCALE": self.add_accessor(scales),
+            }}},
+        })
+        return len(self.gltf["nodes"]) - 1
+
+    def to_json_bytes(self, buffer_uri=None):
+        gltf = {key: value for key, value in self.gltf.items() if value != []}
+        buffer = {"byteLength": self.byte_length}
+        if buffer_uri:
+            buffer["uri"] = buffer_uri
+        if self.byte_length:
+            gltf["buffers"] = [buffer]
+        return json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+
+def _write_chunks(file, chunks):
+    for chunk in chunks:
+        file.write(chunk)
+
+def kimjafasu_write_glb(builder, path):
+    json_bytes = builder.to_json_bytes()
+    json_bytes += b' ' * (-len(json_bytes) % 4)
+    bin_padding = -builder.byte_length % 4
+    bin_length = builder.byte_length + bin_padding
+
+    total = 12 + 8 + len(json_bytes)
+    if bin_length:
+        total += 8 + bin_length
+
+    with open(path, 'wb') as file:
+        file.write(struct.pack('<III', GLB_MAGIC, GLB_VERSION, total))
+        file.write(struct.pack('<II', len(json_bytes), CHUNK_JSON))
+        file.write(json_bytes)
+        if bin_length:
+            file.write(struct.pack('<II', bin_length, CHUNK_BIN))
+            _write_chunks(file, builder.chunks)
+            file.write(bytes(bin_padding))
+
+def kimjafasu_write_gltf_separate(builder, path):
+    bin_name = os.path.splitext(os.path.basename(path))[0] + ".bin"
+    with open(path, 'wb') as file:
+        file.write(builder.to_json_bytes(buffer_uri=bin_name if builder.byte_length else None))
+    if builder.byte_length:
+        with open(os.path.join(os.path.dirname(path), bin_name), 'wb') as file:
+            _write_chunks(file, builder.chunks)
+
+    for uri, encoded in builder.image_files:
+        target = os.path.join(os.path.dirname(path), uri)
+        if encoded.data is not None:
+            with open(target, 'wb') as file:
+                file.write(encoded.data)
+            continue
+        try:
+            # 🪶 Same drive as the cache most of the time, a hard link costs nothing
+            os.link(encoded.path, target)
+        except OSError:
+            shutil.copyfile(encoded.path, target)
+
+class _NodeSpec:
+    """A node before it's written, so instances can still be merged"""
+
+    def __init__(self, name, matrix, parent=None, obj=None, packed=None, mesh_key=None):
+        self.name = name
+        # local, already in export space
+        self.matrix = matrix
+        # index into the spec list
+        self.parent = parent
+        self.obj = obj
+        self.packed = packed
+        self.mesh_key = mesh_key
+        self.has_children = False
+
+def _convert(matrix, axis):
+    return axis @ matrix @ axis.inverted()
+
+def _node_matrix(obj, exported, axis):
+    if obj.parent in exported:
+        matrix = obj.parent.matrix_world.inverted_safe() @ obj.matrix_world
+    else:
+        matrix = obj.matrix_world
+    return _convert(matrix, axis)
+
+def _pack_object(obj, arrays, split_plan=None):
+    """Tuple of PackedMesh, one per node: the whole mesh, or its .base part and one part per split rule"""
+    if split_plan is not None:
+        base_suffix, outputs = split_plan
+        split = preprocess.kimjafasu_split_face_outputs(obj.data, outputs)
+        if split is not None:
+            face_outputs, present = split
+            triangle_outputs = face_outputs[arrays.tri_polys]
+            parts = [kimjafasu_pack_arrays(arrays, triangle_outputs == -1, base_suffix)]
+            for index, (suffix, _) in enumerate(outputs):
+                if present[index]:
+                    parts.append(kimjafasu_pack_arrays(arrays, triangle_outputs == index, suffix))
+            return tuple(parts)
+    return (kimjafasu_pack_arrays(arrays),)
+
+def _optimized(part, stats):
+    """part with every primitive welded and reordered (see preprocess/optimizeMesh.py), stats summed up"""
+    primitives = []
+    for primitive in part.primitives:
+        attributes, indices, primitive_stats = preprocess.kimjafasu_optimize_primitive(primitive.attributes, primitive.indices)
+        for key, value in primitive_stats.items():
+            stats[key] += value
+        if len(indices):
+            primitives.append(PackedPrimitive(primitive.material_index, attributes, kimjafasu_index_array(indices, len(attributes["POSITION"]))))
+    stats["optimized"] += 1
+    return PackedMesh(part.name, primitives, part.suffix)
+
+def _renamed(parts, mesh_name):
+    if parts[0].name == mesh_name:
+        return parts
+    return tuple(PackedMesh(mesh_name, part.primitives, part.suffix) for part in parts)
+
+def _pack_all(depsgraph, settings, mesh_objects, share_keys, geometry_fingerprints, split_plans, export_yup, export_colors, stats):
+    """share key -> packed parts, every shared mesh packed once, from the cache when possible"""
+    cache_limit = settings.mesh_cache_size * 1024 * 1024
+    representatives = {}
+    for obj in mesh_objects:
+        representatives.setdefault(share_keys[obj], obj)
+
+    # 🪶 Cache first, only what's missing gets extracted
+    packed = {}
+    cache_keys = {}
+    for share_key, obj in representatives.items():
+        fingerprint = geometry_fingerprints.get(obj)
+        if fingerprint is None or cache_limit <= 0:
+            continue
+        cache_keys[share_key] = kimjafasu_mesh_cache_key(
+            share_key, fingerprint, settings.apply_modifiers, export_yup, export_colors, settings.optimize_meshes)
+        cached = kimjafasu_get_cached_mesh(cache_keys[share_key])
+        if cached is not None:
+            packed[share_key] = _renamed(cached, obj.data.name)
+            stats["hits"] += 1
+
+    missing = {share_key: obj for share_key, obj in representatives.items() if share_key not in packed}
+    extracted = kimjafasu_extract_meshes(depsgraph, list(missing.values()), settings.apply_modifiers, export_yup, export_colors)
+    for share_key, obj in missing.items():
+        with utils.kimjafasu_timed_object(obj.name, "pack"):
+            packed[share_key] = _pack_object(obj, extracted.pop(obj), split_plans.get(obj))
+        if settings.optimize_meshes:
+            # 🪶 Before caching, a cache hit is an optimized mesh already
+            with utils.kimjafasu_timed_object(obj.name, "optimize"):
+                packed[share_key] = tuple(_optimized(part, stats) for part in packed[share_key])
+        if share_key in cache_keys:
+            stats["misses"] += 1
+            kimjafasu_cache_mesh(cache_keys[share_key], packed[share_key], cache_limit)
+    return packed
+
+def _add_object_specs(specs, obj, matrix, parent, packed, share_keys, axis, depth=0):
+    """Specs for obj and, for collection instances, everything it instances. Returns the spec index of obj"""
+    if obj.type == 'MESH':
+        parts = packed[share_keys[obj]]
+        first = None
+        for part in parts:
+            specs.append(_NodeSpec(obj.name + part.suffix, matrix, parent, obj, part, (share_keys[obj], part.suffix, kimjafasu_material_key(obj))))
+            first = len(specs) - 1 if first is None else first
+        return first
+
+    specs.append(_NodeSpec(obj.name, matrix, parent))
+    index = len(specs) - 1
+    if kimjafasu_is_instancer(obj) and depth < MAX_INSTANCE_DEPTH:
+        collection = obj.instance_collection
+        # Members keep where they are in the collection, relative to its instance offset
+        offset = Matrix.Translation(-collection.instance_offset)
+        for member in collection.all_objects:
+            if member.type == 'MESH' or kimjafasu_is_instancer(member):
+                _add_object_specs(specs, member, _convert(offset @ member.matrix_world, axis), index, packed, share_keys, axis, depth + 1)
+    return index
+
+def _world_matrix(specs, index):
+    spec = specs[index]
+    if spec.parent is None:
+        return spec.matrix
+    return _world_matrix(specs, spec.parent) @ spec.matrix
+
+def kimjafasu_write_direct(context, settings, export_path, export_format, objects, geometry_fingerprints=None, split_plans=None, split_parts=None):
+    """
+    Writes objects to export_path, check kimjafasu_direct_export_blocker first.
+    Shared meshes are packed and written once, objects with a geometry fingerprint go through the mesh cache
+    and the rest is extracted in one batch.
+    split_plans maps objects to how they get split (see preprocess.kimjafasu_get_split_plan) right here,
+    into .base and per rule nodes, instead of on temp objects.
+    split_parts maps temp objects split by preprocess to (object they were split from, suffix), see kimjafasu_mesh_share_key.
+    Returns stats: mesh and texture cache hits/misses, mesh nodes and unique meshes written,
+    and with Optimize Meshes the vertices/triangles/vertex cache misses before and after of the meshes optimized.
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    export_yup = settings.engine != 'Unreal'
+    export_colors = settings.export_vertex_color != 'NONE'
+    axis = AXIS_YUP if export_yup else Matrix.Identity(4)
+    geometry_fingerprints = geometry_fingerprints or {}
+    split_plans = dict(split_plans or {})
+    stats = {"hits": 0, "misses": 0, "mesh_nodes": 0, "unique_meshes": 0, "texture_hits": 0, "texture_misses": 0, "optimized": 0,
+             "vertices_before": 0, "vertices_after": 0, "triangles_before": 0, "triangles_after": 0,
+             "vertex_misses_before": 0, "vertex_misses_after": 0}
+
+    # 🪶 Instanced objects only exist in the file, they always get split on the fly
+    mesh_objects = kimjafasu_collect_mesh_objects(objects)
+    split_rules = preprocess.kimjafasu_split_rules(settings)
+    for obj in mesh_objects:
+        plan = preprocess.kimjafasu_get_split_plan(obj, split_rules)
+        if obj not in split_plans and obj not in objects and plan and not (settings.apply_modifiers and obj.modifiers):
+            split_plans[obj] = plan
+    split_parts = split_parts or {}
+    share_keys = {
+        obj: kimjafasu_mesh_share_key(obj, settings.apply_modifiers, split_plans.get(obj), split_parts.get(obj))
+        for obj in mesh_objects}
+    packed = _pack_all(depsgraph, settings, mesh_objects, share_keys, geometry_fingerprints, split_plans, export_yup, export_colors, stats)
+
+    # 🪶 Node specs first, written once it's known which meshes get gpu instanced
+    specs = []
+    # Split objects are replaced by their parts, children of them end up at the root like with the stock exporter
+    exported = {obj for obj in objects if obj.type != 'MESH' or not packed[share_keys[obj]][0].suffix}
+    object_specs = {}
+    for obj in objects:
+        index = _add_object_specs(specs, obj, _node_matrix(obj, exported, axis), None, packed, share_keys, axis)
+        if obj in exported:
+            object_specs[obj] = index
+    # Keep the hierarchy between exported objects, everything else hangs off the scene
+    for obj, index in object_specs.items():
+        if obj.parent in object_specs:
+            specs[index].parent = object_specs[obj.parent]
+    for spec in specs:
+        if spec.parent is not None:
+            specs[spec.parent].has_children = True
+
+    mesh_specs = [spec for spec in specs if spec.mesh_key is not None]
+    stats["mesh_nodes"] = len(mesh_specs)
+    stats["unique_meshes"] = len({spec.mesh_key for spec in mesh_specs})
+
+    instanced = {}
+    if settings.use_gpu_instancing:
+        for index, spec in enumerate(specs):
+            if spec.mesh_key is not None and not spec.has_children:
+                instanced.setdefault(spec.mesh_key, []).append(index)
+        instanced = {key: indices for key, indices in instanced.items() if len(indices) > 1}
+    skipped = {index for indices in instanced.values() for index in indices}
+
+    builder = GltfBuilder(embed_images=export_format == 'GLB')
+    if settings.export_textures:
+        export_dir = bpy.path.abspath(settings.export_dir)
+        builder.texture_set = TextureSet(builder, export_dir, settings.texture_cache_size * 1024 * 1024)
+    mesh_indices = {}
+    def mesh_index(spec):
+        if spec.mesh_key not in mesh_indices:
+            mesh_indices[spec.mesh_key] = builder.add_mesh(spec.packed, spec.obj)
+        return mesh_indices[spec.mesh_key]
+
+    node_indices = {}
+    roots = builder.gltf["scenes"][0]["nodes"]
+    for index, spec in enumerate(specs):
+        if index in skipped:
+            continue
+        node_indices[index] = builder.add_node(spec.name, spec.matrix, mesh_index(spec) if spec.mesh_key else None)
+    # Children can come before their parent (objects are sorted by name), so every node has to exist first
+    for index, node in node_indices.items():
+        parent = specs[index].parent
+        if parent is None:
+            roots.append(node)
+        else:
+            builder.gltf["nodes"][node_indices[parent]].setdefault("children", []).append(node)
+
+    for key, indices in instanced.items():
+        first = specs[indices[0]]
+        index = mesh_index(first)
+        if index is not None:
+            matrices = [_world_matrix(specs, i) for i in indices]
+            roots.append(builder.add_instanced_node(f"{first.packed.name}{first.packed.suffix}.instances", index, matrices))
+
+    if export_format == 'GLB':
+        kimjafasu_write_glb(builder, export_path)
+    else:
+        kimjafasu_write_gltf_separate(builder, export_path)
+    if builder.texture_set:
+        stats["texture_hits"] = builder.texture_set.hits
+        stats["texture_misses"] = builder.texture_set.misses
+    return stats
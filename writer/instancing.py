@@ -0,0 +1,49 @@
+"""
+Instancing for the direct writer.
+
+- linked duplicates (Alt+D) share their mesh, so it gets packed and written once and every object
+  just points at it. Unless modifiers are applied, then every object has its own result
+- collection instances (an empty instancing a collection) become a node with the collection's objects
+  as children, again pointing at the meshes written once
+- optionally, meshes used by lots of leaf nodes become a single node with EXT_mesh_gpu_instancing,
+  one transform per instance instead of one node per instance
+"""
+
+# Collections instancing collections instancing collections...
+MAX_INSTANCE_DEPTH = 8
+
+def kimjafasu_is_instancer(obj):
+    return obj.type == 'EMPTY' and obj.instance_type == 'COLLECTION' and obj.instance_collection is not None
+
+def kimjafasu_collect_mesh_objects(objects):
+    """Every mesh object that ends up in the file, instanced ones included, each once and in order"""
+    found = {}
+
+    def visit(obj, depth):
+        if obj.type == 'MESH':
+            found[obj] = None
+        elif kimjafasu_is_instancer(obj) and depth < MAX_INSTANCE_DEPTH:
+            for member in obj.instance_collection.all_objects:
+                visit(member, depth + 1)
+
+    for obj in objects:
+        visit(obj, 0)
+    return list(found)
+
+def kimjafasu_mesh_share_key(obj, apply_modifiers, split_plan, split_part=None):
+    """
+    Objects with the same key end up with the very same packed mesh, split_plan is None for unsplit ones.
+    split_part is (source object, suffix) for temp objects split by preprocess: their meshes are throwaway
+    copies whose names (Cube.001...) can belong to anything on the next export, so they are keyed by what
+    they were split from instead.
+    """
+    if split_part is not None:
+        source, suffix = split_part
+        return ('PART', kimjafasu_mesh_share_key(source, apply_modifiers, None), suffix)
+    if apply_modifiers and obj.modifiers:
+        return ('OBJECT', obj.name, split_plan)
+    return ('MESH', obj.data.name, split_plan)
+
+def kimjafasu_material_key(obj):
+    # Materials can be linked to the object instead of the mesh, those duplicates can't share a glTF mesh
+    return tuple(slot.material.name if slot.material else "" for slot in obj.material_slots)
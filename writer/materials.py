@@ -0,0 +1,197 @@
+"""
+Materials for the direct writer.
+
+Only plain ones are supported: no nodes at all, or a single Principled BSDF plugged straight into
+the Material Output. Nothing may be linked into it except images, the way glTF has them:
+
+- Base Color (and Alpha from the same image), Emission Color: an Image Texture
+- Normal: a Normal Map node (tangent space) with an Image Texture
+- Roughness, Metallic: an Image Texture, or one channel of it through a Separate Color node
+
+Every Image Texture uses the default UV map and no mapping. Anything else is left to the stock exporter.
+"""
+
+# Principled inputs an image may be plugged into, everything else has to stay unlinked
+TEXTURED_INPUTS = {"Base Color", "Alpha", "Normal", "Emission Color", "Roughness", "Metallic"}
+
+CHANNELS = {"Red": 0, "Green": 1, "Blue": 2}
+
+# emissiveFactor stops at 1, anything brighter goes in here
+KHR_EMISSIVE_STRENGTH = "KHR_materials_emissive_strength"
+
+class TextureSource:
+    """An Image Texture node feeding a Principled input, channel is only set for single channel inputs"""
+
+    def __init__(self, node, channel=None):
+        self.node = node
+        self.image = node.image
+        self.channel = channel
+
+def kimjafasu_principled_node(material):
+    """The Principled BSDF feeding the material output, None if it's something else"""
+    tree = material.node_tree
+    output = tree.get_output_node('ALL') if tree else None
+    if output is None:
+        return None
+    surface = output.inputs.get("Surface")
+    if surface is None or not surface.is_linked:
+        return None
+    node = surface.links[0].from_node
+    return node if node.type == 'BSDF_PRINCIPLED' else None
+
+def _linked_node(socket):
+    """(node, output socket name) linked into socket"""
+    link = socket.links[0]
+    return link.from_node, link.from_socket.name
+
+def _image_node(node):
+    if node.type != 'TEX_IMAGE' or node.image is None:
+        return None
+    if node.projection != 'FLAT' or node.inputs["Vector"].is_linked:
+        return None
+    return node
+
+def _color_source(socket):
+    node, output = _linked_node(socket)
+    node = _image_node(node)
+    return TextureSource(node) if node and output == "Color" else None
+
+def _channel_source(socket):
+    node, output = _linked_node(socket)
+    if node.type == 'SEPARATE_COLOR' and node.mode == 'RGB' and output in CHANNELS and node.inputs[0].is_linked:
+        image, image_output = _linked_node(node.inputs[0])
+        image = _image_node(image)
+        return TextureSource(image, CHANNELS[output]) if image and image_output == "Color" else None
+    # A color straight into a float input, that's its red channel like the stock exporter reads it
+    node = _image_node(node)
+    return TextureSource(node, 0) if node and output == "Color" else None
+
+def _normal_source(socket):
+    node, _ = _linked_node(socket)
+    if node.type != 'NORMAL_MAP' or node.space != 'TANGENT' or node.uv_map or node.inputs["Strength"].is_linked:
+        return None
+    color = node.inputs["Color"]
+    return _color_source(color) if color.is_linked else None
+
+def kimjafasu_material_textures(node):
+    """
+    Images feeding the Principled BSDF node: {"Base Color": TextureSource, ...}.
+    Returns a str saying why instead, when an image is plugged in some way the direct writer doesn't get.
+    """
+    textures = {}
+    for name in TEXTURED_INPUTS:
+        socket = node.inputs.get(name)
+        if socket is None or not socket.is_linked:
+            continue
+        if name in ("Base Color", "Emission Color"):
+            source = _color_source(socket)
+        elif name == "Normal":
+            source = _normal_source(socket)
+        elif name == "Alpha":
+            image, output = _linked_node(socket)
+            base = node.inputs["Base Color"]
+            # Alpha only comes as the alpha of the base color image
+            source = TextureSource(image) if output == "Alpha" and base.is_linked and base.links[0].from_node == image else None
+        else:
+            source = _channel_source(socket)
+        if source is None:
+            return f"has a node setup plugged into {name}"
+        textures[name] = source
+
+    metallic, roughness = textures.get("Metallic"), textures.get("Roughness")
+    if metallic and roughness and tuple(metallic.image.size) != tuple(roughness.image.size):
+        return "has metallic and roughness images of different sizes"
+    return textures
+
+def kimjafasu_material_blocker(material, export_textures):
+    """Why this material can't go through the direct writer, None when it can"""
+    if not material.use_nodes:
+        return None
+    node = kimjafasu_principled_node(material)
+    if node is None:
+        return f"material '{material.name}' isn't a plain Principled BSDF"
+    linked = [socket.name for socket in node.inputs if socket.is_linked and socket.name not in TEXTURED_INPUTS]
+    if linked:
+        return f"material '{material.name}' has nodes plugged into {', '.join(linked)}"
+    textures = kimjafasu_material_textures(node)
+    if isinstance(textures, str):
+        return f"material '{material.name}' {textures}"
+    if textures and not export_textures:
+        # The stock exporter knows what to leave out then
+        return f"material '{material.name}' has textures"
+    return None
+
+def kimjafasu_material_has_textures(material):
+    node = kimjafasu_principled_node(material) if material.use_nodes else None
+    return node is not None and any(node.inputs[name].is_linked for name in TEXTURED_INPUTS if name in node.inputs)
+
+def _input(node, name, default):
+    socket = node.inputs.get(name)
+    return socket.default_value if socket is not None else default
+
+def kimjafasu_material_to_gltf(material, texture_set=None):
+    """texture_set (see textures.py) adds the images, needed for materials with textures"""
+    textures = {}
+    if material.use_nodes:
+        node = kimjafasu_principled_node(material)
+        textures = kimjafasu_material_textures(node)
+        base_color = list(_input(node, "Base Color", (0.8, 0.8, 0.8, 1.0)))[:3]
+        alpha = _input(node, "Alpha", 1.0)
+        metallic = _input(node, "Metallic", 0.0)
+        roughness = _input(node, "Roughness", 0.5)
+        emission = list(_input(node, "Emission Color", (0.0, 0.0, 0.0, 1.0)))[:3]
+        emission_strength = _input(node, "Emission Strength", 0.0)
+    else:
+        base_color = list(material.diffuse_color)[:3]
+        alpha = material.diffuse_color[3]
+        metallic = material.metallic
+        roughness = material.roughness
+        emission = [0.0, 0.0, 0.0]
+        emission_strength = 0.0
+
+    # 🪶 A linked socket ignores its own value, the image is all there is
+    if "Base Color" in textures:
+        base_color = [1.0, 1.0, 1.0]
+    if "Alpha" in textures:
+        alpha = 1.0
+    if "Metallic" in textures:
+        metallic = 1.0
+    if "Roughness" in textures:
+        roughness = 1.0
+    if "Emission Color" in textures:
+        emission = [1.0, 1.0, 1.0]
+
+    pbr = {
+        "baseColorFactor": [float(c) for c in base_color] + [float(alpha)],
+        "metallicFactor": float(metallic),
+        "roughnessFactor": float(roughness),
+    }
+    gltf_material = {"name": material.name, "pbrMetallicRoughness": pbr}
+    if not material.use_backface_culling:
+        gltf_material["doubleSided"] = True
+    if alpha < 1.0 or "Alpha" in textures:
+        gltf_material["alphaMode"] = 'BLEND'
+
+    emissive = [float(c) * emission_strength for c in emission]
+    if any(emissive):
+        # 🪶 Same as the stock exporter: factor scaled down to fit, the scale becomes the strength
+        brightest = max(emissive)
+        if brightest > 1.0:
+            emissive = [c / brightest for c in emissive]
+            gltf_material["extensions"] = {KHR_EMISSIVE_STRENGTH: {"emissiveStrength": brightest}}
+        gltf_material["emissiveFactor"] = emissive
+
+    if textures:
+        if "Base Color" in textures:
+            pbr["baseColorTexture"] = texture_set.add_image(textures["Base Color"])
+        if "Metallic" in textures or "Roughness" in textures:
+            pbr["metallicRoughnessTexture"] = texture_set.add_metallic_roughness(textures.get("Metallic"), textures.get("Roughness"))
+        if "Normal" in textures:
+            normal = texture_set.add_image(textures["Normal"])
+            strength = _input(kimjafasu_principled_node(material).inputs["Normal"].links[0].from_node, "Strength", 1.0)
+            if strength != 1.0:
+                normal["scale"] = float(strength)
+            gltf_material["normalTexture"] = normal
+        if "Emission Color" in textures and "emissiveFactor" in gltf_material:
+            gltf_material["emissiveTexture"] = texture_set.add_image(textures["Emission Color"])
+    return gltf_material
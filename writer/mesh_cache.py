@@ -0,0 +1,89 @@
+import bpy
+from collections import OrderedDict
+from bpy.app.handlers import persistent
+
+from .. import utils
+from .instancing import kimjafasu_collect_mesh_objects
+
+"""
+Packed meshes from earlier exports, so an unchanged mesh is never extracted and welded twice.
+
+Keyed by mesh (or object, with modifiers applied), geometry fingerprint (see utils/change_tracking.py) and the options
+that change the packing (axis, modifiers, colors). A hit hands back the very same numpy arrays,
+which the writer puts into the new file as they are.
+
+Memory is bounded: least recently used meshes get dropped once the cache grows over its limit.
+"""
+
+# key -> tuple of PackedMesh (one per node the object turns into), oldest first
+_cache = OrderedDict()
+_cached_bytes = 0
+
+def kimjafasu_mesh_cache_key(share_key, geometry_fingerprint, apply_modifiers, export_yup, export_colors, optimize=False):
+    # share_key (see instancing.py) already tells whether and how the mesh gets split
+    return (share_key, geometry_fingerprint, apply_modifiers, export_yup, export_colors, optimize)
+
+def kimjafasu_collect_geometry_fingerprints(context, objects, split_map, apply_modifiers):
+    """
+    Geometry fingerprint of every object that gets written, split parts and instanced objects included.
+    Split parts are temp objects with fresh meshes every export, they get the fingerprint of
+    the mesh they were split from (its plain mesh decides the split, modifiers run on top).
+    """
+    depsgraph = context.evaluated_depsgraph_get()
+    fingerprints = {}
+    for obj in kimjafasu_collect_mesh_objects(objects):
+        parts = split_map.get(obj)
+        if parts:
+            source = utils.kimjafasu_geometry_fingerprint(obj, depsgraph, False)
+            if apply_modifiers:
+                source += utils.kimjafasu_geometry_fingerprint(obj, depsgraph, True)
+            for part in parts:
+                fingerprints[part] = source
+        else:
+            fingerprints[obj] = utils.kimjafasu_geometry_fingerprint(obj, depsgraph, apply_modifiers)
+    return fingerprints
+
+def kimjafasu_get_cached_mesh(key):
+    packed = _cache.get(key)
+    if packed is not None:
+        _cache.move_to_end(key)
+    return packed
+
+def _nbytes(parts):
+    return sum(part.nbytes for part in parts)
+
+def kimjafasu_cache_mesh(key, parts, limit_bytes):
+    global _cached_bytes
+
+    if key in _cache:
+        _cached_bytes -= _nbytes(_cache.pop(key))
+    size = _nbytes(parts)
+    if size > limit_bytes:
+        return  # wouldn't fit anyway, don't flush everything else for it
+
+    _cache[key] = parts
+    _cached_bytes += size
+    while _cached_bytes > limit_bytes:
+        _, evicted = _cache.popitem(last=False)
+        _cached_bytes -= _nbytes(evicted)
+
+def kimjafasu_mesh_cache_usage():
+    """(meshes, bytes) currently cached"""
+    return len(_cache), _cached_bytes
+
+def kimjafasu_clear_mesh_cache():
+    global _cached_bytes
+    _cache.clear()
+    _cached_bytes = 0
+
+@persistent
+def kimjafasu_clear_mesh_cache_on_load(*args):
+    kimjafasu_clear_mesh_cache()
+
+def register():
+    bpy.app.handlers.load_pre[:] = [h for h in bpy.app.handlers.load_pre if h.__name__ != "kimjafasu_clear_mesh_cache_on_load"]
+    bpy.app.handlers.load_pre.append(kimjafasu_clear_mesh_cache_on_load)
+
+def unregister():
+    bpy.app.handlers.load_pre[:] = [h for h in bpy.app.handlers.load_pre if h.__name__ != "kimjafasu_clear_mesh_cache_on_load"]
+    kimjafasu_clear_mesh_cache()
@@ -0,0 +1,108 @@
+import numpy as np
+
+"""
+Packing for the direct writer, from MeshArrays (see extraction.py) to what goes into the file.
+
+glTF wants one index buffer per material and one set of attributes per vertex, while Blender stores
+normals/uvs/colors per face corner (loop). So every triangle corner becomes a row of all its attributes,
+identical rows get welded into one vertex and the triangles index into those.
+That is what the stock exporter does too, just without python loops.
+"""
+
+# (x, y, z) -> (x, z, -y), Blender Z-up to glTF Y-up
+def kimjafasu_to_yup(vectors):
+    converted = vectors[:, [0, 2, 1]]
+    converted[:, 2] *= -1.0
+    return converted
+
+class PackedPrimitive:
+    """Triangles of one material slot, attributes welded and ready to be written as they are"""
+
+    def __init__(self, material_index, attributes, indices):
+        self.material_index = material_index
+        # glTF attribute name (POSITION, NORMAL, TEXCOORD_0, COLOR_0...) -> float32 (n, components)
+        self.attributes = attributes
+        # uint16 when it fits, uint32 otherwise
+        self.indices = indices
+
+    @property
+    def vertex_count(self):
+        return len(self.attributes["POSITION"])
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + sum(array.nbytes for array in self.attributes.values())
+
+class PackedMesh:
+    def __init__(self, name, primitives, suffix=""):
+        self.name = name
+        self.primitives = primitives
+        # ".base"/".vertex" for parts of a split mesh, added to the node and mesh names
+        self.suffix = suffix
+
+    @property
+    def vertex_count(self):
+        return sum(primitive.vertex_count for primitive in self.primitives)
+
+    @property
+    def triangle_count(self):
+        return sum(len(primitive.indices) // 3 for primitive in self.primitives)
+
+    @property
+    def nbytes(self):
+        return sum(primitive.nbytes for primitive in self.primitives)
+
+def kimjafasu_weld_rows(rows):
+    """
+    Returns (unique_rows, indices) with rows[i] == unique_rows[indices[i]].
+    Unique rows keep the order they first show up in, so the vertex order follows the triangles.
+    """
+    rows = np.ascontiguousarray(rows)
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rows[first[order]], rank[inverse.ravel()]
+
+def kimjafasu_index_array(indices, vertex_count):
+    dtype = np.uint16 if vertex_count < 65536 else np.uint32
+    return np.ascontiguousarray(indices, dtype=dtype)
+
+def _loop_columns(arrays):
+    """[(attribute name, float32 (loops, components))] for every loop of the mesh"""
+    columns = [("POSITION", arrays.positions[arrays.loop_verts]), ("NORMAL", arrays.normals)]
+    columns.extend((f"TEXCOORD_{index}", uvs) for index, uvs in enumerate(arrays.uvs))
+    columns.extend((f"COLOR_{index}", colors) for index, colors in enumerate(arrays.colors))
+    return columns
+
+def kimjafasu_pack_arrays(arrays, triangle_mask=None, suffix=""):
+    """
+    Packs triangulated MeshArrays into one PackedPrimitive per used material slot.
+    triangle_mask picks the triangles to pack, that's how split parts are made.
+    """
+    tri_loops = arrays.tri_loops
+    tri_materials = arrays.poly_materials[arrays.tri_polys]
+    if triangle_mask is not None:
+        tri_loops = tri_loops[triangle_mask]
+        tri_materials = tri_materials[triangle_mask]
+    if len(tri_loops) == 0:
+        return PackedMesh(arrays.name, [], suffix)
+
+    columns = _loop_columns(arrays)
+    loop_rows = np.hstack([array.astype(np.float32, copy=False) for _, array in columns])
+
+    primitives = []
+    for material_index in np.unique(tri_materials):
+        corners = tri_loops[tri_materials == material_index].ravel()
+        vertices, indices = kimjafasu_weld_rows(loop_rows[corners])
+
+        attributes = {}
+        start = 0
+        for attribute_name, array in columns:
+            end = start + array.shape[1]
+            attributes[attribute_name] = np.ascontiguousarray(vertices[:, start:end])
+            start = end
+        primitives.append(PackedPrimitive(int(material_index), attributes, kimjafasu_index_array(indices, len(vertices))))
+    return PackedMesh(arrays.name, primitives, suffix)
@@ -0,0 +1,239 @@
+import bpy
+import os
+import hashlib
+import tempfile
+import numpy as np
+
+from .. import utils
+
+"""
+Images for the direct writer, and the texture cache.
+
+- PNG/JPEG files (or packed ones) Blender hasn't touched go into the file as they are, no encoding at all
+- everything else gets encoded to PNG: other formats, painted/generated images, and metallic/roughness
+  images that have to be packed into the G/B channels of one image first
+
+Encoding is what makes textured exports slow, so encoded PNGs are kept in a hidden `.kimjafasu_textures`
+dir in the export dir, named after a hash of what went into them (image fingerprint, file/pixel content,
+channels, format). An image that didn't change is read from there instead of encoded again.
+With .gltf + .bin the images are separate files, unchanged ones are left alone on disk by the
+staging commit (see utils/file_utils.py).
+"""
+
+TEXTURE_CACHE_DIRNAME = ".kimjafasu_textures"
+# Bump when the encoding of the same inputs changes, old entries just stop matching
+TEXTURE_CACHE_VERSION = 1
+# Temp datablock Blender's PNG encoder writes from
+ENCODE_IMAGE_NAME = "kimjafasu_encode"
+
+RAW_FORMATS = {'PNG': ("image/png", ".png"), 'JPEG': ("image/jpeg", ".jpg")}
+
+# glTF sampler constants
+NEAREST = 9728
+LINEAR = 9729
+NEAREST_MIPMAP_NEAREST = 9984
+LINEAR_MIPMAP_LINEAR = 9987
+CLAMP_TO_EDGE = 33071
+MIRRORED_REPEAT = 33648
+WRAP_MODES = {'EXTEND': CLAMP_TO_EDGE, 'CLIP': CLAMP_TO_EDGE, 'MIRROR': MIRRORED_REPEAT}
+
+# (path, size, mtime_ns) -> content hash, so an unchanged file is only ever read once per session
+_file_hashes = {}
+
+class EncodedImage:
+    """What goes into the file: either the path of a file to copy, or the bytes themselves"""
+
+    def __init__(self, name, mime_type, extension, path=None, data=None):
+        self.name = name
+        self.mime_type = mime_type
+        self.extension = extension
+        self.path = path
+        self.data = data
+
+    def read(self):
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as file:
+            return file.read()
+
+def _image_path(image):
+    path = bpy.path.abspath(image.filepath_raw) if image.filepath_raw else ""
+    return path if path and os.path.isfile(path) else None
+
+def _file_hash(path):
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        _file_hashes[key] = utils.kimjafasu_file_hash(path)
+    return _file_hashes[key]
+
+def _content_key(image):
+    """Changes whenever the pixels of image could have"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(utils.kimjafasu_image_fingerprint(image).encode('utf-8'))
+    if image.packed_file:
+        h.update(image.packed_file.data)
+    else:
+        path = _image_path(image)
+        if path:
+            h.update(_file_hash(path).encode('utf-8'))
+    return h.hexdigest()
+
+def _raw_image(image):
+    """The image as it is on disk/in the .blend, None when it needs encoding"""
+    if image.source != 'FILE' or image.is_dirty or image.file_format not in RAW_FORMATS:
+        return None
+    mime_type, extension = RAW_FORMATS[image.file_format]
+    if image.packed_file:
+        return EncodedImage(image.name, mime_type, extension, data=image.packed_file.data)
+    path = _image_path(image)
+    return EncodedImage(image.name, mime_type, extension, path=path) if path else None
+
+def _linear_to_srgb(values):
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.power(np.clip(values, 0.0031308, None), 1.0 / 2.4) - 0.055)
+
+def _rgba_pixels(image):
+    """(height * width, 4) float32, the values the image stores (sRGB for color images)"""
+    width, height = image.size
+    pixels = np.empty(width * height * image.channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(-1, image.channels)
+    if image.channels < 3:
+        pixels = np.repeat(pixels[:, :1], 3, axis=1) if image.channels == 1 else np.column_stack((pixels[:, 0], pixels[:, 0], pixels[:, 0], pixels[:, 1]))
+    if pixels.shape[1] == 3:
+        pixels = np.column_stack((pixels, np.ones(len(pixels), dtype=np.float32)))
+    # Float images hold linear values, PNG wants them the way they'd be displayed
+    if image.is_float and image.colorspace_settings.name not in ('Non-Color', 'Raw'):
+        pixels[:, :3] = _linear_to_srgb(pixels[:, :3])
+    return pixels
+
+def _encode_png(pixels, width, height, path):
+    # Blender's own PNG writer, through a temp image nobody gets to see
+    image = bpy.data.images.new(ENCODE_IMAGE_NAME, width, height, alpha=True)
+    try:
+        image.colorspace_settings.name = 'Non-Color'
+        image.pixels.foreach_set(np.clip(pixels, 0.0, 1.0).ravel())
+        image.filepath_raw = path
+        image.file_format = 'PNG'
+        image.save()
+    finally:
+        bpy.data.images.remove(image)
+
+class TextureSet:
+    """Images, textures and samplers of one GltfBuilder, each written once however many materials use them"""
+
+    def __init__(self, builder, export_dir, cache_limit_bytes):
+        self.builder = builder
+        self.cache_dir = utils.kimjafasu_hidden_dir(export_dir, TEXTURE_CACHE_DIRNAME) if cache_limit_bytes > 0 else None
+        self.cache_limit_bytes = cache_limit_bytes
+        self.hits = 0
+        self.misses = 0
+        # cache/dedupe key -> index
+        self._images = {}
+        self._textures = {}
+        self._samplers = {}
+
+    def _cached_png(self, name, key, encode):
+        """EncodedImage of the PNG for key, encode(pixels path) only runs on a cache miss"""
+        if self.cache_dir is None:
+            return EncodedImage(name, "image/png", ".png", data=self._encode_to_bytes(encode))
+        path = os.path.join(self.cache_dir, key + ".png")
+        if os.path.isfile(path):
+            self.hits += 1
+            os.utime(path)  # mtime is the LRU order
+            return EncodedImage(name, "image/png", ".png", path=path)
+
+        self.misses += 1
+        # Written under a temp name and renamed, parallel workers never see half a PNG
+        temp_path = f"{path}.{os.getpid()}.tmp.png"
+        encode(temp_path)
+        os.replace(temp_path, path)
+        utils.kimjafasu_evict_lru(self.cache_dir, self.cache_limit_bytes)
+        if not os.path.isfile(path):
+            # Bigger than the whole cache, evicted right away
+            self.misses -= 1
+            return EncodedImage(name, "image/png", ".png", data=self._encode_to_bytes(encode))
+        return EncodedImage(name, "image/png", ".png", path=path)
+
+    def _encode_to_bytes(self, encode):
+        handle, temp_path = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+        try:
+            encode(temp_path)
+            with open(temp_path, 'rb') as file:
+                return file.read()
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _cache_key(self, *parts):
+        h = hashlib.blake2b(digest_size=16)
+        for part in (TEXTURE_CACHE_VERSION, "PNG") + parts:
+            h.update(str(part).encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def _encoded(self, image):
+        raw = _raw_image(image)
+        if raw is not None:
+            return raw
+        width, height = image.size
+        key = self._cache_key(image.name, _content_key(image))
+        return self._cached_png(image.name, key, lambda path: _encode_png(_rgba_pixels(image), width, height, path))
+
+    def _add_image(self, key, encoded):
+        if key not in self._images:
+            self.builder.add_image(encoded)
+            self._images[key] = len(self.builder.gltf["images"]) - 1
+        return self._images[key]
+
+    def _add_sampler(self, node):
+        key = (node.interpolation, node.extension)
+        if key not in self._samplers:
+            sampler = {}
+            if node.interpolation == 'Closest':
+                sampler["magFilter"], sampler["minFilter"] = NEAREST, NEAREST_MIPMAP_NEAREST
+            else:
+                sampler["magFilter"], sampler["minFilter"] = LINEAR, LINEAR_MIPMAP_LINEAR
+            if node.extension in WRAP_MODES:
+                sampler["wrapS"] = sampler["wrapT"] = WRAP_MODES[node.extension]
+            self.builder.gltf.setdefault("samplers", []).append(sampler)
+            self._samplers[key] = len(self.builder.gltf["samplers"]) - 1
+        return self._samplers[key]
+
+    def _add_texture(self, image_index, node):
+        sampler_index = self._add_sampler(node)
+        key = (image_index, sampler_index)
+        if key not in self._textures:
+            self.builder.gltf.setdefault("textures", []).append({"source": image_index, "sampler": sampler_index})
+            self._textures[key] = len(self.builder.gltf["textures"]) - 1
+        return {"index": self._textures[key]}
+
+    def add_image(self, source):
+        """textureInfo for a TextureSource (see materials.py) used as it is"""
+        image_index = self._add_image(('IMAGE', source.image.name), self._encoded(source.image))
+        return self._add_texture(image_index, source.node)
+
+    def add_metallic_roughness(self, metallic, roughness):
+        """textureInfo of roughness in G and metallic in B, either TextureSource may be None"""
+        if metallic and roughness and metallic.image == roughness.image and (roughness.channel, metallic.channel) == (1, 2):
+            # Already laid out the glTF way
+            return self.add_image(roughness)
+
+        sources = [source for source in (metallic, roughness) if source]
+        width, height = sources[0].image.size
+        name = "_".join(dict.fromkeys(source.image.name for source in sources))
+        key = self._cache_key("METALLIC_ROUGHNESS", *[
+            (source.image.name, _content_key(source.image), source.channel) if source else None
+            for source in (metallic, roughness)])
+
+        def encode(path):
+            packed = np.ones((width * height, 4), dtype=np.float32)
+            if roughness:
+                packed[:, 1] = _rgba_pixels(roughness.image)[:, roughness.channel]
+            if metallic:
+                packed[:, 2] = _rgba_pixels(metallic.image)[:, metallic.channel]
+            _encode_png(packed, width, height, path)
+
+        image_index = self._add_image(('METALLIC_ROUGHNESS', key), self._cached_png(name, key, encode))
+        return self._add_texture(image_index, sources[0].node)